@@ -0,0 +1,286 @@
+"""Benchmarks for the display primitives (displayUtils), the transitions
+of the fieldScroller and the navigation in a GameWindowGrid.
+All sleeps are virtualized (the frame schedulers use a VirtualClock),
+so only the real work is measured. The device calls are counted by a
+proxy around the device of the selected backend ('null' by default).
+Results are printed (or written to a file) as JSON.
+The startup benchmark measures in a new interpreter how long it takes
+to import the grid module and to display the first frame of a grid;
+the exit status is 1 if one of them is over its budget.
+
+Run it from the directory above the package (here called games), e.g.:
+    python -m games.benchmark --backend recording --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import time
+import subprocess
+import sys
+from .output import backends
+from .output import clock
+from .output import deviceManager
+from .output import displayUtils
+from .output import fieldScroller
+from .output.displayDriver import DisplayDriver
+from .output.frameScheduler import FrameScheduler
+from .core.game import GameWindow, GameWindowGrid
+
+_n = (0, 0, 0)
+_b = (255, 153, 0)
+_f = (255, 0, 0)
+
+_images = fieldScroller.testImages
+
+_scrollData = [
+    [_n, _n, _n, _b, _f, _b, _n, _n],
+    [_n, _n, _b, _f, _b, _n, _n, _n],
+    [_n, _b, _f, _b, _n, _n, _n, _n],
+    [_b, _f, _b, _n, _n, _n, _n, _n],
+]
+
+
+class _CountingDevice (object):
+    """Proxy around a device that counts the pixel calls"""
+
+    def __init__ (self, device):
+        self.device = device
+        self.calls = {}
+        self.pixelOps = 0
+
+
+    def _count (self, name, pixels):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.pixelOps += pixels
+
+
+    def set_pixel (self, x, y, *color):
+        self._count ('set_pixel', 1)
+        self.device.set_pixel (x, y, *color)
+
+
+    def get_pixel (self, x, y):
+        self._count ('get_pixel', 1)
+        return self.device.get_pixel (x, y)
+
+
+    def set_pixels (self, pixels):
+        self._count ('set_pixels', 64)
+        self.device.set_pixels (pixels)
+
+
+    def get_pixels (self):
+        self._count ('get_pixels', 64)
+        return self.device.get_pixels ()
+
+
+    def __getattr__ (self, name):
+        return getattr(self.device, name)
+
+
+def _virtual_scheduler ():
+    """Return a FrameScheduler on a virtual clock: sleeping only moves
+    the time forward, it does not wait."""
+    return FrameScheduler (clock=clock.VirtualClock())
+
+
+def _result (seconds, steps, device, driver=None):
+    result = {
+        'seconds': seconds,
+        'steps': steps,
+        'stepsPerSec': steps / seconds if seconds else None,
+        'pixelOps': device.pixelOps,
+        'pixelOpsPerSec': device.pixelOps / seconds if seconds else None,
+        'deviceCalls': sum(device.calls.values()),
+        'deviceCallsPerStep': sum(device.calls.values()) / steps,
+        'calls': dict(device.calls),
+    }
+    if driver is not None:
+        result['driver'] = driver.get_stats()
+    return result
+
+
+def bench_display_utils (backend, repeat):
+    """Scroll the rows/columns of the test data into the display"""
+    results = {}
+    for name, scroll in (('scroll_vertical', displayUtils.scroll_vertical),
+            ('scroll_horizontal', displayUtils.scroll_horizontal)):
+        device = _CountingDevice(backends.create_device(backend))
+        device.device.set_pixels(_images[1])
+        scheduler = _virtual_scheduler()
+        start = time.perf_counter()
+        for i in range(repeat):
+            scroll (device, i % 2 == 0, _scrollData, scheduler=scheduler)
+        seconds = time.perf_counter() - start
+        results[name] = _result(seconds, repeat * len(_scrollData), device)
+    return results
+
+
+def bench_field_scroller (backend, repeat, useDriver):
+    """Scroll between the two test images in all directions (the
+    transitions are compiled every time, not taken from the cache)"""
+    results = {}
+    for scroll in (fieldScroller.scrollUp, fieldScroller.scrollDown,
+            fieldScroller.scrollLeft, fieldScroller.scrollRight):
+        device = _CountingDevice(backends.create_device(backend))
+        target = DisplayDriver(device) if useDriver else device
+        target.set_pixels(_images[0])
+        scheduler = _virtual_scheduler()
+        steps = 0
+        start = time.perf_counter()
+        for i in range(repeat):
+            fieldScroller.clear_cache()
+            transition = scroll (target, _images[(i + 1) % 2], scheduler=scheduler)
+            steps += len(transition)
+        seconds = time.perf_counter() - start
+        results[scroll.__name__] = _result(seconds, steps, device,
+            target if useDriver else None)
+    return results
+
+
+def bench_grid (backend, sizes):
+    """Walk through all windows of grids of the given sizes (snake path:
+    right along the first row, down, left along the next row, ...)"""
+    results = {}
+    for size in sizes:
+        # start with a new shared device of the backend
+        backends.set_backend(backend)
+        deviceManager.shutdown()
+        grid = GameWindowGrid(size, size, scheduler=_virtual_scheduler())
+        device = _CountingDevice(grid.sense.sense)
+        grid.sense.sense = device
+        for y in range(size):
+            for x in range(size):
+                grid.set_game(x, y, GameWindow('{}/{}'.format(x, y)))
+        moves = 0
+        start = time.perf_counter()
+        for y in range(size):
+            for x in range(size - 1):
+                moves += grid.go_right() if y % 2 == 0 else grid.go_left()
+            moves += grid.go_down()
+        seconds = time.perf_counter() - start
+        results['{0}x{0}'.format(size)] = _result(seconds, moves, device, grid.sense)
+        grid.close()
+    return results
+
+
+# runs in a new interpreter: import the grid module, start a 2x2 grid
+# (which displays the first screen) and print the times as JSON
+_startupScript = """
+import importlib, json, sys, time
+start = time.perf_counter()
+game = importlib.import_module(sys.argv[1] + '.core.game')
+imported = time.perf_counter()
+grid = game.GameWindowGrid(2, 2)
+for y in range(2):
+    for x in range(2):
+        grid.set_game(x, y, game.GameWindow('{}/{}'.format(x, y)))
+grid.start()
+firstFrame = time.perf_counter()
+print(json.dumps({'import': imported - start, 'firstFrame': firstFrame - start,
+    'modules': sorted(sys.modules)}))
+"""
+
+
+def bench_startup (backend, repeat=5):
+    """Measure (in new interpreters) the time to import the grid module
+    and the time until the first frame of a grid is displayed. The
+    best of repeat runs is reported."""
+    package = __package__ or __name__.rpartition('.')[0]
+    packageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env[backends.envVariable] = backend
+    env['PYTHONPATH'] = os.pathsep.join([packageDir] +
+        ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    runs = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.check_output([sys.executable, '-c', _startupScript, package],
+            env=env, universal_newlines=True)
+        run = json.loads(output.strip().split('\n')[-1])
+        run['process'] = time.perf_counter() - start
+        runs.append(run)
+    modules = runs[0]['modules']
+    return {
+        'import': min(r['import'] for r in runs),
+        'firstFrame': min(r['firstFrame'] for r in runs),
+        'process': min(r['process'] for r in runs),
+        'modules': len(modules),
+        'deviceModulesLoaded': [m for m in ('sense_hat', 'sense_emu') if m in modules],
+    }
+
+
+def check_startup (startup, importBudget, firstFrameBudget):
+    """Return a list of messages for the startup times that are over
+    their budget (in seconds)"""
+    failures = []
+    if startup['import'] > importBudget:
+        failures.append('import took {:.3f} s, budget is {:.3f} s'.format(
+            startup['import'], importBudget))
+    if startup['firstFrame'] > firstFrameBudget:
+        failures.append('first frame took {:.3f} s, budget is {:.3f} s'.format(
+            startup['firstFrame'], firstFrameBudget))
+    return failures
+
+
+def run (backend='null', repeat=50, gridSizes=(5, 20, 50)):
+    """Run all benchmarks and return the results as a dictionary"""
+    previous = backends.get_selected_backend()
+    try:
+        return {
+            'backend': backend,
+            'python': platform.python_version(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': repeat,
+            'displayUtils': bench_display_utils(backend, repeat),
+            'fieldScroller': bench_field_scroller(backend, repeat, False),
+            'fieldScrollerDriver': bench_field_scroller(backend, repeat, True),
+            'grid': bench_grid(backend, gridSizes),
+            'startup': bench_startup(backend),
+        }
+    finally:
+        backends.set_backend(previous)
+
+
+def main (argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--backend', default='null',
+        help='device backend (default: null)')
+    parser.add_argument('--repeat', type=int, default=50,
+        help='repetitions of each display benchmark')
+    parser.add_argument('--grid', type=int, nargs='+', default=[5, 20, 50],
+        help='sizes of the grids to walk through')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--startup-only', action='store_true',
+        help='only measure the startup time')
+    parser.add_argument('--budget-import', type=float, default=.5,
+        help='maximal time (sec) for importing the grid module')
+    parser.add_argument('--budget-first-frame', type=float, default=1.0,
+        help='maximal time (sec) until the first frame is displayed')
+    args = parser.parse_args(argv)
+
+    if args.startup_only:
+        results = {'backend': args.backend, 'startup': bench_startup(args.backend)}
+    else:
+        results = run(args.backend, args.repeat, args.grid)
+    failures = check_startup(results['startup'], args.budget_import,
+        args.budget_first_frame)
+    results['startupBudgetFailures'] = failures
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    for failure in failures:
+        logging.error(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.exit(main())
@@ -1,77 +1,87 @@
-#from sense_hat import SenseHat
-from sense_emu import SenseHat
-import time
-import colorsys
+from .output import clock
+from .output import deviceManager
+from .output import palette
 
 # Mögliche Farben sind im RGB-565-Raum (rot 5 Bits, grün 6 Bits, blau 5 Bits).
 # Also: Rot- und Blau-Anteil durch 8 teilbar, Grün-Anteil durch 4 teilbar
 
-s = SenseHat()
-#s.low_light = True
-s.low_light = False
-
-def listColors(f):
-    for i in range(1,256,4):
-        color = f(i)
-        pos = i // 4
-        x = pos // 8
-        y = pos % 8
-        s.set_pixel(x, y, color)
+_s = None
+
+def _sense():
+    """Return the (shared) SenseHAT - it is only acquired when needed,
+    not when the module is imported."""
+    global _s
+    if _s is None:
+        _s = deviceManager.acquire()
+        #_s.low_light = True
+        _s.low_light = False
+    return _s
+
+def listColors(kind):
+    """display the 64 colors of the palette of the given kind (e.g.
+    'red' or 'red2green', see palette), column by column.
+    kind can also be a function as getColorRed: then its colors for
+    i = 1, 5, 9, ... 253 are displayed (as before the palettes)"""
+    if callable(kind):
+        colors = [kind(i) for i in range(1, 256, 4)]
+    else:
+        colors = palette.get_palette(kind, 64)
+    _sense().set_pixels(palette.to_screen(colors, columnMajor=True))
+
+# the colors of the ramps, for i = 0..255 (taken from the palettes,
+# larger values wrap around)
 
 def getColorRed(i):
-    return (i, 0, 0)
+    return palette.get_color('red', i)
 
 def getColorYellow(i):
-    return (i, i, 0)
+    return palette.get_color('yellow', i)
 
 def getColorGreen(i):
-    return (0, i, 0)
+    return palette.get_color('green', i)
 
 def getColorBlue(i):
-    return (0, 0, i)
+    return palette.get_color('blue', i)
 
 def getColorViolet(i):
-    return (i, 0, i)
+    return palette.get_color('violet', i)
 
 def getColorRed2Green(i):
-    return (i, 256-i, 0)
+    return palette.get_color('red2green', i)
 
 def getColorGreen2Blue(i):
-    return (0, i, 256-i)
+    return palette.get_color('green2blue', i)
 
 def getColorBlue2Red(i):
-    return (256-i, 0, i)
+    return palette.get_color('blue2red', i)
 
 
 def listColorsRainbow():
-    for i in range(1,256,4):
-        c = i/256
-        col = colorsys.hls_to_rgb(c, 0.5, 1)
-        color = (int(col[0]*255), int(col[1]*255), int(col[2]*255))
-        pos = i // 4
-        x = pos // 8
-        y = pos % 8
-        #print('(x,y) = ({}/{}), c is {}, color is {}, col2 is {}'.format(x, y, c, col, color)) 
-        s.set_pixel(x, y, color)
-
-    #c = i/256
-    return color
+    """display the rainbow, column by column; returns its last color"""
+    colors = palette.get_palette('rainbow', 64)
+    _sense().set_pixels(palette.to_screen(colors, columnMajor=True))
+    return colors[-1]
     
 
 
-s.clear()
-time.sleep(2)
-#listColors(getColorRed)
-listColors(getColorRed2Green)
-time.sleep(2)
-#listColors(getColorGreen2Blue)
-#time.sleep(2)
-#listColors(getColorBlue2Red)
+def _test():
+    _sense().clear()
+    clock.get_clock().sleep(2)
+    #listColors('red')
+    listColors('red2green')
+    clock.get_clock().sleep(2)
+    #listColors('green2blue')
+    #time.sleep(2)
+    #listColors('blue2red')
+
+    #listColors('yellow')
+    #listColors('green')
+    #listColors('blue')
+    #listColors('violet')
+
+    listColorsRainbow()
 
-#listColors(getColorYellow)
-#listColors(getColorGreen)
-#listColors(getColorBlue)
-#listColors(getColorViolet)
 
-listColorsRainbow()
+if __name__ == "__main__":
+    _test()
 
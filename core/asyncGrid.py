@@ -0,0 +1,136 @@
+# asyncio runtime for a GameWindowGrid
+
+import asyncio
+from ..output import textScroller
+
+
+class AsyncGridRuntime (object):
+    """Runs a GameWindowGrid on asyncio: the transitions between the
+    games, the text scrolls and the game logic are coroutines, and the
+    joystick is read all the time (also during animations), so display,
+    input and timers of the games can run in one thread.
+    Games take part by overwriting _start_game_async() and
+    _continue_game_async() (see GameWindow) and awaiting timers
+    (asyncio.sleep) and show_message() instead of blocking.
+
+    Usage:  asyncio.run(AsyncGridRuntime(grid).run())
+    """
+
+    # joystick direction -> navigation in the grid
+    _navigation = ('up', 'down', 'left', 'right')
+
+
+    def __init__ (self, grid, scheduler=None, pollInterval=.02):
+        """Init the runtime for the given grid.
+
+        - scheduler: the FrameScheduler for the transitions (default:
+          the one of the grid)
+
+        - pollInterval: time between two reads of the joystick events
+        """
+        self.grid = grid
+        self.scheduler = scheduler or grid.scheduler
+        self.pollInterval = pollInterval
+        self.running = False
+        self.events = None
+        self._gameTask = None
+        self._game = None
+
+
+    async def run (self):
+        """Start the grid (display the first game and resume it), then
+        read the joystick and react to it, until stop() is called."""
+        self.events = asyncio.Queue()
+        self.running = True
+        game = self.grid.get_game (self.grid.posX, self.grid.posY)
+        self.grid.sense.set_pixels (game.get_screen ())
+        self.grid.prefetch ()
+        self._resume (game)
+
+        inputTask = asyncio.ensure_future(self._read_input())
+        try:
+            while self.running:
+                event = await self.events.get()
+                if event is None:
+                    break
+                await self.handle_event (event)
+        finally:
+            inputTask.cancel()
+            await self._stop_game ()
+
+
+    def stop (self):
+        """Stop run() (after the current event is handled)"""
+        self.running = False
+        if self.events is not None:
+            self.events.put_nowait(None)
+
+
+    async def _read_input (self):
+        """Put all joystick events into the event queue"""
+        stick = self.grid.sense.stick
+        while True:
+            for event in stick.get_events():
+                self.events.put_nowait(event)
+            await self.scheduler.clock.sleep_async(self.pollInterval)
+
+
+    async def handle_event (self, event):
+        """Give the direction to the current game (see handle_input_async
+        of GameWindow); if the game does not use it, navigate in the grid
+        (direction pressed) or resume the game (middle pressed)."""
+        if event.action != 'pressed':
+            return
+        game = self.grid.get_game (self.grid.posX, self.grid.posY)
+        if await game.handle_input_async (event.direction):
+            return
+        if event.direction in self._navigation:
+            await self.go (event.direction)
+        elif event.direction == 'middle':
+            if self._gameTask is None or self._gameTask.done():
+                self._resume (game)
+
+
+    async def go (self, direction):
+        """Move in the given direction (if possible): the running game
+        is stopped (see _stop_game), the transition is played without
+        blocking, then the game there is resumed (as a task).
+        Returns False if there is no game in that direction."""
+        if not self.grid.can_go (direction):
+            return False
+        await self._stop_game ()
+        transition, nextGame = self.grid.begin_move (direction)
+        await self.scheduler.play_async (transition.frames, transition.durations,
+            self.grid.sense.set_pixels)
+        self.grid.prefetch ()
+        self._resume (nextGame)
+        return True
+
+
+    def _resume (self, game):
+        self._game = game
+        self._gameTask = asyncio.ensure_future(game.resume_game_async())
+
+
+    async def _stop_game (self):
+        """Cancel the task of the running game, ask its blocking hook in
+        the executor (if any) to stop, and wait until it has returned,
+        so it does not draw over the transition."""
+        if self._gameTask is not None and not self._gameTask.done():
+            self._gameTask.cancel()
+        self._gameTask = None
+        if self._game is not None:
+            self._game.request_stop ()
+            await self._game.join_async ()
+            self._game = None
+
+
+    def __str__(self):
+        return 'AsyncGridRuntime for {}'.format(self.grid)
+
+
+async def show_message (sense, text, **kwargs):
+    """Scroll a text message over the display without blocking the
+    event loop (arguments as for SenseHAT.show_message).
+    The frames come from the cache of the textScroller."""
+    await textScroller.show_message_async (sense, text, **kwargs)
@@ -1,11 +1,15 @@
 # basic game "window" and"window collection" module
 
-#from sense_hat import SenseHat
-from sense_emu import SenseHat
+import asyncio
 import logging
-import time
+import threading
 from . import exceptions
+from ..output import deviceManager
 from ..output import fieldScroller
+from ..output.frameScheduler import FrameScheduler
+from ..output.tiledCanvas import TiledCanvas
+from .joystick import JoystickDispatcher
+from .prefetch import NeighborPrefetcher
 
     
 class GameWindow (object):
@@ -13,12 +17,26 @@ class GameWindow (object):
     Subclasses should overwrite:
     - _init_game()
     - get_name()
+    - _render_screen()
     - get_border_color()
     - _start_game()
     - _continue_game()
     - is_solved()
     Optionally, subclasses can overwrite:
     - stop_game()
+    - _start_game_async() and _continue_game_async() (for asyncGrid)
+    - handle_input() and handle_input_async() (to use the joystick)
+
+    On asyncio, the blocking _start_game() and _continue_game() run in a
+    thread of the executor. When the game is left, request_stop() sets
+    stopRequested: long running hooks should check it (e.g. between two
+    frames) and return; join_async() waits until they have returned.
+
+    The screen of the game is cached: get_screen() renders it (with
+    _render_screen()) only if invalidate_screen() was called since it
+    was rendered last. Subclasses must call invalidate_screen() whenever
+    their screen changes. The screenVersion is counted up each time, so
+    users of the screen can check cheaply whether it has changed.
     """
 
 
@@ -30,7 +48,12 @@ class GameWindow (object):
         """
         self.name = name
         self.isStarted = False
-        self.sense = SenseHat()
+        self.screenVersion = 0
+        self._screen = None
+        self._screenVersion = None
+        self.stopRequested = threading.Event()
+        self._worker = None
+        self.sense = deviceManager.acquire()
         self._init_game()
 
  
@@ -47,9 +70,26 @@ class GameWindow (object):
 
 
     def get_screen (self):
-        """ Return the data for the (current) display of the game."""
-        return (96, 96, 96) * 64
+        """ Return the data for the (current) display of the game
+        (a tuple of 64 color tuples, which must not be changed).
+        It is rendered again only if the screen has been invalidated."""
+        if self._screenVersion != self.screenVersion:
+            self._screen = tuple(tuple(p) for p in self._render_screen())
+            self._screenVersion = self.screenVersion
+        return self._screen
+
+
+    def _render_screen (self):
+        """ Return the data for the (current) display of the game
+        (64 color tuples). Called by get_screen() when necessary."""
+        return [(96, 96, 96)] * 64
         # should be overwritten by subclasses 
+
+
+    def invalidate_screen (self):
+        """Mark the screen as changed: the next get_screen() renders it
+        again. Must be called by subclasses when their screen changes."""
+        self.screenVersion += 1
         
 
     def get_border_color (self):
@@ -75,6 +115,21 @@ class GameWindow (object):
             self._start_game()
 
 
+    async def resume_game_async (self):
+        """Same as resume_game(), but as coroutine (used when the grid
+        runs on asyncio, see asyncGrid): _start_game_async() or
+        _continue_game_async() is called."""
+        if self.is_solved ():
+            logging.info('resume_game {}: already solved'.format(self.name))
+        elif self.isStarted:
+            logging.info('resume_game {}: continue game'.format(self.name))
+            await self._continue_game_async()
+        else:
+            logging.info('resume_game {}: start game'.format(self.name))
+            self.isStarted = True
+            await self._start_game_async()
+
+
     def _start_game (self):
         """Start the game. Will be called when resume_game() is 
         called for the first time."""
@@ -82,6 +137,16 @@ class GameWindow (object):
         # should be overwritten by subclasses 
 
 
+    async def _start_game_async (self):
+        """Coroutine version of _start_game(). By default it runs
+        _start_game() in a thread of the loop's executor, so the loop
+        goes on reading the joystick. When the coroutine is cancelled, the
+        thread goes on until _start_game() checks stopRequested (see
+        request_stop). Subclasses should overwrite it to await timers and
+        animations instead of sleeping."""
+        await self._run_in_executor (self._start_game)
+
+
     def _continue_game (self):
         """Continue the game. Will be called when resume_game() is 
         called not for the first time, but the game is not yet solved."""
@@ -89,6 +154,51 @@ class GameWindow (object):
         # should be overwritten by subclasses 
 
 
+    async def _continue_game_async (self):
+        """Coroutine version of _continue_game(). By default it runs
+        _continue_game() in the executor (as _start_game_async());
+        subclasses should overwrite it."""
+        await self._run_in_executor (self._continue_game)
+
+
+    async def _run_in_executor (self, function):
+        """Run the blocking function in the executor and wait for it.
+        Cancelling only stops the waiting: the thread is kept as
+        worker, so join_async() can wait for its end."""
+        self.stopRequested.clear()
+        self._worker = asyncio.get_event_loop().run_in_executor(None, function)
+        await asyncio.shield(self._worker)
+
+
+    def request_stop (self):
+        """Ask a blocking _start_game() or _continue_game() that runs in
+        the executor to return soon (sets stopRequested)."""
+        self.stopRequested.set()
+
+
+    async def join_async (self):
+        """Wait until the blocking hook that runs in the executor (if
+        any) has returned."""
+        worker = self._worker
+        self._worker = None
+        if worker is not None and not worker.done():
+            await asyncio.wait([worker])
+
+
+    def handle_input (self, direction):
+        """Called with the direction of the joystick ('up', 'down', 'left',
+        'right' or 'middle') while the game is displayed, before the grid
+        uses it. Return True if the game has used the direction (then the
+        grid does not). Subclasses can overwrite."""
+        return False
+
+
+    async def handle_input_async (self, direction):
+        """Coroutine version of handle_input(). By default it just calls
+        handle_input(); subclasses can overwrite it."""
+        return self.handle_input (direction)
+
+
     def stop_game (self):
         """Do some saving or cleanup (if necessary) before leaving the
         game. Subclasses can overwrite if necessary."""
@@ -110,98 +220,220 @@ class GameWindow (object):
         self.sense.show_letter ("X")
 
 
+    def close (self):
+        """Give back the (shared) SenseHAT when the game is not used 
+        anymore."""
+        if self.sense is not None:
+            self.sense = None
+            deviceManager.release()
+
+
     def __str__(self):
-        return 'Game "{sf.name}", border color {sf.borderColor}'.format(sf=self)
+        return 'Game "{}", border color {}'.format(self.name, self.get_border_color())
 
 
 
 class GameWindowGrid (object):
     """Base class for a grid of GameWindows, ordered in a rectangle
     of the given width and height.
+    Besides the scrolling between neighbors (go_up() etc.), the grid can
+    pan over all games as one large canvas (see pan() and TiledCanvas).
     """
 
-    def __init__ (self, width, height):
+    # direction -> change of the position (x, y)
+    moves = {'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+
+    def __init__ (self, width, height, scheduler=None, prefetch=False, wrap=False):
         """Init the GameWindowCGrid. Each place of the grid must
         then be initialized with a game.
         
         - width: width of the games grid
         - height: height of the games grid
+        - scheduler: the FrameScheduler for the scrolling between
+          the games (optional)
+        - prefetch: if True, the screens of the neighbors and the
+          transitions to them are prepared in the background (see
+          NeighborPrefetcher)
+        - wrap: if True, pan() goes over the edges of the grid to the
+          other side
         """
         # TODO change constructor to take 2-dim-array of GameWindow?
         
-        self.sense = SenseHat()
+        self.sense = deviceManager.acquire()
         self.w = width
         self.h = height
         self.games = [[None for x in range(self.w)] for y in range(self.h)]
         self.posX = 0
         self.posY = 0
+        self.scheduler = scheduler or FrameScheduler()
+        self.prefetcher = NeighborPrefetcher(self) if prefetch else None
+        self.wrap = wrap
+        self.canvas = None
         
         
     def set_game (self, x, y, game):
         """Set a game to a position in the game Init game"""
         if x >= self.w:
-            raise ArgumentError (x, "x must be 0 < x <= width")
+            raise exceptions.ArgumentError (x, "x must be 0 < x <= width")
         if y >= self.h:
-            raise ArgumentError (y, "y must be 0 < y <= height")
+            raise exceptions.ArgumentError (y, "y must be 0 < y <= height")
 
-        self.games[x][y] = game
+        self.games[y][x] = game
 
 
     def start (self):
         """Start: after all the games have been initialized, call this
         method to start the first game (the one at position 0,0). 
+        Its screen is displayed before it is resumed.
         """
-        nextGame = get_game (self.posX, self.posY)
+        nextGame = self.get_game (self.posX, self.posY)
+        self.sense.set_pixels (nextGame.get_screen ())
+        self.prefetch ()
         nextGame.resume_game ()
+        self.prefetch ()
         
 
     def get_game (self, x, y):
         """ Return the game at the position x, y"""
-        if x >= self.width:
-            raise ArgumentError (x, "x must be 0 < x <= width")
-        if y >= self.height:
-            raise ArgumentError (y, "y must be 0 < y <= height")
+        if x >= self.w:
+            raise exceptions.ArgumentError (x, "x must be 0 < x <= width")
+        if y >= self.h:
+            raise exceptions.ArgumentError (y, "y must be 0 < y <= height")
+
+        return self.games[y][x]
 
-        return self.games[x][y]
+
+    def can_go (self, direction):
+        """Return True if there is a game in the given direction
+        ('up', 'down', 'left' or 'right') of the current position"""
+        dx, dy = self.moves[direction]
+        return 0 <= self.posX + dx < self.w and 0 <= self.posY + dy < self.h
 
 
     def go_up (self):
         """Moves the current position up and returns True.
         Returns False if the current position is already in the topmost row.
         """
-        if self.posY == 0:
-            return False
-        else:
-            thisGame = get_game (self.posX, self.posY) 
-            thisGame.stop_game ()
-            
-            self.position.y -= 1
-            nextGame = get_game (self.posX, self.posY)
-            data = nextGame.get_data ()
-            color = nextGame.get_border_color ()
-            fieldScroller.scrollUp (self.sense, data, color)
-            nextGame.resume_game ()
+        return self._move ('up')
 
 
     def go_down (self):
         """Moves the current position down and returns True.
         Returns False if the current position is already in the last row.
         """
-        if self.posY == self.height - 1:
-            return False
-        else:
-            thisGame = get_game (self.posX, self.posY) 
-            thisGame.stop_game ()
-            
-            self.posY += 1
-            nextGame = get_game (self.posX, self.posY)
-            data = nextGame.get_data ()
-            color = nextGame.get_border_color ()
-            fieldScroller.scrollDown (self.sense, data, color)
-            nextGame.resume_game ()
+        return self._move ('down')
+
+
+    def go_left (self):
+        """Moves the current position left and returns True.
+        Returns False if the current position is already in the first column.
+        """
+        return self._move ('left')
 
 
-    #TODO go_left, go_right            
+    def go_right (self):
+        """Moves the current position right and returns True.
+        Returns False if the current position is already in the last column.
+        """
+        return self._move ('right')
+
+
+    def _move (self, direction):
+        """Move in the given direction (if possible): scroll to the 
+        game there and resume it."""
+        if not self.can_go (direction):
+            return False
+        transition, nextGame = self.begin_move (direction)
+        fieldScroller.playTransition (self.sense, transition, self.scheduler)
+        self.prefetch ()
+        nextGame.resume_game ()
+        # the game may have changed the display
+        self.prefetch ()
+        return True
+
+
+    def get_canvas (self):
+        """Return the TiledCanvas over all games of the grid (created
+        the first time; the tiles are the cached game screens)"""
+        if self.canvas is None:
+            self.canvas = TiledCanvas (self.w, self.h,
+                lambda x, y: self.get_game (x, y).get_screen (),
+                lambda x, y: self.get_game (x, y).screenVersion,
+                wrap=self.wrap)
+        return self.canvas
+
+
+    def pan (self, dx, dy, speed=.05):
+        """Pan pixel by pixel to the game dx, dy windows away (each -1,
+        0 or 1, so also diagonally) and resume it. With wrap, the grid
+        continues on the other side. Returns False if there is no game
+        in that direction."""
+        if dx not in (-1, 0, 1) or dy not in (-1, 0, 1) or dx == dy == 0:
+            raise exceptions.DataError ((dx, dy),
+                "dx and dy must be -1, 0 or 1, and not both 0")
+        x = self.posX + dx
+        y = self.posY + dy
+        if self.wrap:
+            x %= self.w
+            y %= self.h
+        elif not (0 <= x < self.w and 0 <= y < self.h):
+            return False
+        self.get_game (self.posX, self.posY).stop_game ()
+
+        canvas = self.get_canvas ()
+        canvas.move_to (self.posX * 8, self.posY * 8)
+        self.posX = x
+        self.posY = y
+        canvas.pan_to (x * 8, y * 8, self.sense, speed, self.scheduler)
+        self.prefetch ()
+        self.get_game (x, y).resume_game ()
+        self.prefetch ()
+        return True
+
+
+    def begin_move (self, direction):
+        """First step of a move (used by go_*() and by the asyncGrid):
+        stop the current game and move the position in the given
+        direction. Returns the compiled transition (see fieldScroller)
+        from the display to the game at the new position, and that game;
+        the caller plays the transition and resumes the game."""
+        thisGame = self.get_game (self.posX, self.posY) 
+        thisGame.stop_game ()
+
+        oldScreen = self.sense.get_pixels ()
+        transition = None
+        if self.prefetcher is not None:
+            transition = self.prefetcher.get (direction, oldScreen)
+
+        dx, dy = self.moves[direction]
+        self.posX += dx
+        self.posY += dy
+        nextGame = self.get_game (self.posX, self.posY)
+        if transition is None:
+            colors = (thisGame.get_border_color (), nextGame.get_border_color ())
+            transition = fieldScroller.compileScroll (oldScreen,
+                nextGame.get_screen (), direction, colors)
+        return transition, nextGame
+
+
+    def prefetch (self):
+        """Start preparing the moves from the current position in the
+        background (only if the grid was created with prefetch=True)"""
+        if self.prefetcher is not None:
+            self.prefetcher.schedule ()
+
+
+    def close (self):
+        """Close all games and give back the (shared) SenseHAT"""
+        if self.prefetcher is not None:
+            self.prefetcher.close ()
+        for row in self.games:
+            for game in row:
+                if game is not None:
+                    game.close ()
+        if self.sense is not None:
+            self.sense = None
+            deviceManager.release()
 
 
     def __str__(self):
@@ -211,7 +443,7 @@ class GameWindowGrid (object):
 
 def _test ():
 
-    sense = SenseHat ()
+    sense = deviceManager.acquire ()
     sense.clear()
 
     game1 = GameWindow ("A")
@@ -227,27 +459,13 @@ def _test ():
     grid.set_game (1, 1, game4)
     print ("Have {}".format(grid))
     
-    while True:
-        for event in sense.stick.get_events():
-            # Check if the joystick was pressed
-            if event.action == "pressed":
-                # Check which direction
-                if event.direction == "up":
-                    sense.show_letter("U")      # Up arrow
-                elif event.direction == "down":
-                    sense.show_letter("D")      # Down arrow
-                elif event.direction == "left": 
-                    sense.show_letter("L")      # Left arrow
-                elif event.direction == "right":
-                    sense.show_letter("R")      # Right arrow
-                elif event.direction == "middle":
-                    sense.show_letter("M")      # Enter key
-
-                # Wait a while and then clear the screen
-                time.sleep(0.5)
-                sense.clear()
-            else:
-                print ("other event")
+    # blocks on the joystick and navigates in the grid
+    grid.start ()
+    dispatcher = JoystickDispatcher (grid)
+    try:
+        dispatcher.run ()
+    finally:
+        print ("Have {}".format(dispatcher))
     
 
 if __name__ == "__main__":
@@ -1,7 +1,5 @@
 # basic game "window" and"window collection" module
 
-#from sense_hat import SenseHat
-from sense_emu import SenseHat
 import logging
 #import time
 from .game import GameWindow, GameWindowGrid
@@ -0,0 +1,170 @@
+# event-driven joystick input for a GameWindowGrid
+
+import collections
+import logging
+import time
+from ..output import clock as _clock
+
+
+class JoystickDispatcher (object):
+    """Reads the joystick of the SenseHAT and dispatches the direction
+    events to the current game of a GameWindowGrid (see handle_input of
+    GameWindow) and, if the game does not use them, to the navigation
+    (up/down/left/right move in the grid, middle resumes the game).
+    Instead of polling, it blocks on the joystick device (with a timeout,
+    so that stop() is noticed). Events are debounced and coalesced:
+    - 'released' events are ignored
+    - a second 'pressed' of the same direction within debounceTime is
+      ignored (also if it was released in between: a bouncing contact)
+    - 'held' events repeat the direction at most every repeatDelay
+    The dispatcher counts the events and measures the queue depth and
+    the dispatch latency (time from the event to its dispatch).
+    """
+
+    def __init__ (self, grid, stick=None, timeout=.5, debounceTime=.05,
+            repeatDelay=.5, pollInterval=.05, clock=None):
+        """Init the dispatcher.
+
+        - grid: the GameWindowGrid to navigate
+
+        - stick: the joystick (default: the one of the grid's SenseHAT)
+
+        - timeout: maximal time to block on the joystick
+
+        - debounceTime, repeatDelay: see class description
+
+        - pollInterval: time between reads if the joystick can not block
+          (only used for joysticks without _wait)
+
+        - clock: the clock for these waits (default: the process-wide clock)
+        """
+        self.grid = grid
+        self.stick = stick if stick is not None else grid.sense.stick
+        self.timeout = timeout
+        self.debounceTime = debounceTime
+        self.repeatDelay = repeatDelay
+        self.pollInterval = pollInterval
+        self.clock = clock or _clock.get_clock()
+        self.queue = collections.deque()
+        self.running = False
+        # direction -> time of the last press that was dispatched
+        self._lastPress = {}
+        # direction -> time of the last press or repeat, while it is held
+        self._held = {}
+        self.reset_stats()
+
+
+    def reset_stats (self):
+        """Set all counters to 0"""
+        self.received = 0
+        self.dispatched = 0
+        self.coalesced = 0
+        self.maxQueueDepth = 0
+        self.latencySum = 0.0
+        self.latencyMax = 0.0
+
+
+    def get_stats (self):
+        """Return the counters as a dictionary (times in seconds)"""
+        return {
+            'received': self.received,
+            'dispatched': self.dispatched,
+            'coalesced': self.coalesced,
+            'queueDepth': len(self.queue),
+            'maxQueueDepth': self.maxQueueDepth,
+            'latencyMean': self.latencySum / self.dispatched if self.dispatched else 0.0,
+            'latencyMax': self.latencyMax,
+        }
+
+
+    def wait_for_events (self, timeout):
+        """Block until there are joystick events (or the timeout is over)
+        and return them (a list, empty after a timeout)."""
+        wait = getattr(self.stick, '_wait', None)
+        if wait is not None:
+            if not wait (timeout):
+                return []
+            return self.stick.get_events()
+
+        # this joystick can not block: poll it, but slowly
+        events = self.stick.get_events()
+        if not events:
+            self.clock.sleep(min(timeout, self.pollInterval))
+        return events
+
+
+    def coalesce (self, events):
+        """Return the events that are left after debouncing and
+        coalescing (see class description)."""
+        result = []
+        for event in events:
+            self.received += 1
+            direction = event.direction
+            if event.action == 'released':
+                # the time of the last press is kept, so that a bounce
+                # (pressed, released, pressed) is still debounced
+                self._held.pop(direction, None)
+                self.coalesced += 1
+                continue
+            if event.action == 'held':
+                last = self._held.get(direction, self._lastPress.get(direction))
+                if last is not None and event.timestamp - last < self.repeatDelay:
+                    self.coalesced += 1
+                    continue
+            else:
+                last = self._lastPress.get(direction)
+                if last is not None and event.timestamp - last < self.debounceTime:
+                    self.coalesced += 1
+                    continue
+                self._lastPress[direction] = event.timestamp
+            self._held[direction] = event.timestamp
+            result.append(event)
+        return result
+
+
+    def dispatch (self, event):
+        """Give the direction to the current game, or navigate in the
+        grid or resume the current game"""
+        latency = time.time() - event.timestamp
+        self.dispatched += 1
+        self.latencySum += latency
+        self.latencyMax = max(self.latencyMax, latency)
+        logging.debug('dispatch {} ({} sec after the event)'.format(event.direction, latency))
+
+        game = self.grid.get_game (self.grid.posX, self.grid.posY)
+        if game.handle_input (event.direction):
+            return
+        if event.direction == 'middle':
+            game.resume_game ()
+        elif event.direction in self.grid.moves:
+            getattr(self.grid, 'go_' + event.direction) ()
+
+
+    def run_once (self, timeout=None):
+        """Wait for events (at most timeout, default: self.timeout) and
+        dispatch all of them. Returns the number of dispatched events."""
+        events = self.coalesce(self.wait_for_events(
+            self.timeout if timeout is None else timeout))
+        self.queue.extend(events)
+        self.maxQueueDepth = max(self.maxQueueDepth, len(self.queue))
+        count = 0
+        while self.queue:
+            self.dispatch (self.queue.popleft())
+            count += 1
+        return count
+
+
+    def run (self):
+        """Dispatch events until stop() is called"""
+        self.running = True
+        while self.running:
+            self.run_once ()
+
+
+    def stop (self):
+        """Stop run() (at the latest after the timeout)"""
+        self.running = False
+
+
+    def __str__(self):
+        return 'JoystickDispatcher ({sf.dispatched} of {sf.received} events dispatched)'.format(sf=self)
@@ -0,0 +1,143 @@
+# background prefetch of the neighbors in a GameWindowGrid
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+from ..output import fieldScroller
+
+
+class NeighborPrefetcher (object):
+    """Prepares in the background, for the current position of a
+    GameWindowGrid, the screens of the (up to four) neighbors and the
+    compiled transitions from the display to them. When the player
+    moves, the transition is ready and can start at once.
+    A prefetched transition is only used if the display still shows
+    the screen it was compiled from; otherwise it is compiled again
+    from the prefetched screen of the neighbor. If the screen of the
+    neighbor has changed since (its screenVersion, see GameWindow),
+    nothing prefetched for it is used.
+    The prefetcher counts hits (transition ready), partial hits (only
+    the screen ready) and misses (nothing ready).
+    """
+
+    def __init__ (self, grid):
+        self.grid = grid
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._pos = None
+        self._oldScreen = None
+        self._versions = None
+        self._cache = {}
+        self.reset_stats()
+
+
+    def reset_stats (self):
+        """Set all counters to 0"""
+        self.hits = 0
+        self.partialHits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+
+    def get_stats (self):
+        """Return the counters as a dictionary"""
+        lookups = self.hits + self.partialHits + self.misses
+        return {
+            'hits': self.hits,
+            'partialHits': self.partialHits,
+            'misses': self.misses,
+            'prefetched': self.prefetched,
+            'hitRate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+    def schedule (self):
+        """Start prefetching the neighbors of the current position of
+        the grid (from the current display). Nothing is done if they
+        are already prefetched for this position and display."""
+        pos = (self.grid.posX, self.grid.posY)
+        oldScreen = tuple(tuple(p) for p in self.grid.sense.get_pixels())
+        versions = self._neighbor_versions (pos)
+        with self._lock:
+            if (pos == self._pos and oldScreen == self._oldScreen
+                    and versions == self._versions):
+                return
+            self._pos = pos
+            self._oldScreen = oldScreen
+            self._versions = versions
+            self._cache = {}
+        self._executor.submit(self._prefetch, pos, oldScreen)
+
+
+    def _neighbors (self, pos):
+        """Yield direction and position of the neighbors of pos"""
+        for direction, (dx, dy) in self.grid.moves.items():
+            x = pos[0] + dx
+            y = pos[1] + dy
+            if 0 <= x < self.grid.w and 0 <= y < self.grid.h:
+                yield direction, (x, y)
+
+
+    def _neighbor_versions (self, pos):
+        return tuple((direction, _version (self.grid.get_game (*p)))
+            for direction, p in self._neighbors (pos))
+
+
+    def _prefetch (self, pos, oldScreen):
+        try:
+            thisGame = self.grid.get_game (*pos)
+            for direction, p in self._neighbors (pos):
+                nextGame = self.grid.get_game (*p)
+                version = _version (nextGame)
+                screen = nextGame.get_screen ()
+                colors = (thisGame.get_border_color (), nextGame.get_border_color ())
+                transition = fieldScroller.compileScroll (oldScreen, screen,
+                    direction, colors)
+                with self._lock:
+                    if (pos, oldScreen) != (self._pos, self._oldScreen):
+                        # the player has moved on in the meantime
+                        return
+                    self._cache[direction] = (version, screen, colors, transition)
+                    self.prefetched += 1
+        except Exception:
+            logging.exception('prefetch for position {} failed'.format(pos))
+
+
+    def get (self, direction, oldScreen):
+        """Return the transition from oldScreen (the display) to the
+        neighbor in the given direction of the current position, or None
+        if nothing is prefetched for it."""
+        pos = (self.grid.posX, self.grid.posY)
+        with self._lock:
+            entry = self._cache.get(direction) if pos == self._pos else None
+            cachedScreen = self._oldScreen
+        if entry is not None:
+            dx, dy = self.grid.moves[direction]
+            nextGame = self.grid.get_game (pos[0] + dx, pos[1] + dy)
+            if entry[0] is None or entry[0] != _version (nextGame):
+                # the screen of the neighbor has changed (or has no version)
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+
+        version, screen, colors, transition = entry
+        if tuple(tuple(p) for p in oldScreen) == cachedScreen:
+            self.hits += 1
+            return transition
+        self.partialHits += 1
+        return fieldScroller.compileScroll (oldScreen, screen, direction, colors)
+
+
+    def close (self):
+        """Stop the background thread"""
+        self._executor.shutdown(wait=False)
+
+
+    def __str__(self):
+        return 'NeighborPrefetcher ({sf.hits} hits, {sf.partialHits} partial hits, {sf.misses} misses)'.format(sf=self)
+
+
+def _version (game):
+    """Return the screenVersion of the game (None if it has none)"""
+    return getattr(game, 'screenVersion', None)
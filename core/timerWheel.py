@@ -0,0 +1,244 @@
+"""The timerWheel runs timers (countdowns, blink phases, timeouts of
+games, ...) without a thread per timer and without recursion: all
+timers of a TimerWheel run on one thread (or on the asyncio loop).
+The timers are kept in a hashed timing wheel: a ring of slots, one per
+tick, so adding and cancelling a timer costs O(1), however many timers
+there are. The callbacks are called in the thread of the wheel, so they
+should be short (a callback can schedule the next timer itself).
+"""
+
+import asyncio
+import logging
+import threading
+from ..output import clock as _clock
+
+
+class Timer (object):
+    """Handle of a scheduled timer (returned by TimerWheel.schedule)"""
+
+    def __init__ (self, wheel, tick, deadline, callback, args):
+        self.wheel = wheel
+        self.tick = tick
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.done = False
+
+
+    def cancel (self):
+        """Cancel the timer (nothing happens if it has already run)"""
+        self.wheel.cancel (self)
+
+
+    def __str__(self):
+        return 'Timer at {sf.deadline} ({state})'.format(sf=self,
+            state='cancelled' if self.cancelled else 'done' if self.done else 'pending')
+
+
+class TimerWheel (object):
+    """Hashed timing wheel with slots of tickLength seconds.
+    Timers run at the earliest at their deadline, at the latest one
+    tick later (when the wheel is running).
+    """
+
+    def __init__ (self, tickLength=.01, slots=512, timer=None, clock=None):
+        """Init the wheel.
+
+        - tickLength: length (sec) of one slot (the resolution)
+
+        - slots: number of slots (timers further away than one turn of
+          the wheel stay in their slot for more turns)
+
+        - timer: function returning the current time in seconds
+          (default: the time of the clock)
+
+        - clock: the clock (default: the process-wide clock)
+        """
+        self.tickLength = tickLength
+        self.slots = [dict() for i in range(slots)]
+        self.clock = clock or _clock.get_clock()
+        self.timer = timer or self.clock.now
+        self.origin = self.timer()
+        self.currentTick = 0
+        self.count = 0
+        self.running = False
+        self.fired = 0
+        self._lock = threading.Condition()
+        self._wakeup = None
+        self._thread = None
+
+
+    @property
+    def lock (self):
+        """The (reentrant) lock of the wheel: a callback can hold it to
+        check its state and set its next timers in one step."""
+        return self._lock
+
+
+    def _tick_of (self, when):
+        return max(int((when - self.origin) // self.tickLength), self.currentTick)
+
+
+    def schedule (self, delay, callback, *args):
+        """Call callback(*args) after delay seconds. Returns a Timer."""
+        return self.schedule_at (self.timer() + delay, callback, *args)
+
+
+    def schedule_at (self, deadline, callback, *args):
+        """Call callback(*args) at the given time (of the wheel's timer).
+        Returns a Timer."""
+        with self._lock:
+            t = Timer(self, self._tick_of (deadline), deadline, callback, args)
+            self.slots[t.tick % len(self.slots)][t] = None
+            self.count += 1
+            self._notify ()
+        return t
+
+
+    def cancel (self, t):
+        """Cancel the timer t (see Timer.cancel)"""
+        with self._lock:
+            if t.done or t.cancelled:
+                return
+            t.cancelled = True
+            slot = self.slots[t.tick % len(self.slots)]
+            if t in slot:
+                del slot[t]
+                self.count -= 1
+
+
+    def _notify (self):
+        # wake up the waiting run() or run_async() (called with the lock)
+        self._lock.notify()
+        if self._wakeup is not None:
+            event, loop = self._wakeup
+            loop.call_soon_threadsafe(event.set)
+
+
+    def advance (self, now=None):
+        """Run all timers which are due at the time now (default: the
+        current time of the timer). Returns the number of timers run."""
+        if now is None:
+            now = self.timer()
+        lastTick = max(int((now - self.origin) // self.tickLength), self.currentTick)
+        fired = 0
+        while True:
+            with self._lock:
+                if self.count == 0:
+                    self.currentTick = lastTick
+                    break
+                slot = self.slots[self.currentTick % len(self.slots)]
+                due = [t for t in slot if t.tick <= self.currentTick and t.deadline <= now]
+                for t in due:
+                    del slot[t]
+                    t.done = True
+                self.count -= len(due)
+                if not due:
+                    if self.currentTick >= lastTick:
+                        break
+                    self.currentTick += 1
+                    continue
+            # outside of the lock, the callbacks may add timers (also
+            # for this tick, so the slot is checked again)
+            for t in due:
+                fired += 1
+                try:
+                    t.callback (*t.args)
+                except Exception:
+                    logging.exception('timer callback {} failed'.format(t.callback))
+        self.fired += fired
+        return fired
+
+
+    def time_to_next (self, now=None):
+        """Return the time (sec) until the next timer is due (at most one
+        turn of the wheel), or None if there are no timers."""
+        if now is None:
+            now = self.timer()
+        with self._lock:
+            if self.count == 0:
+                return None
+            for i in range(len(self.slots)):
+                slot = self.slots[(self.currentTick + i) % len(self.slots)]
+                deadlines = [t.deadline for t in slot if t.tick <= self.currentTick + i]
+                if deadlines:
+                    return max(min(deadlines) - now, 0.0)
+        return len(self.slots) * self.tickLength
+
+
+    def run (self):
+        """Run the timers until stop() is called (blocks; waits on the
+        clock, without polling when there are no timers)."""
+        self.running = True
+        while self.running:
+            with self._lock:
+                delay = self.time_to_next ()
+                if delay is None or delay > 0:
+                    self.clock.wait(self._lock, delay)
+            if self.running:
+                self.advance ()
+
+
+    def run_until_idle (self, limit=None):
+        """Run the timers (sleeping on the clock between them) until there
+        are no more timers, or until the time limit (of the timer) is
+        reached. On a VirtualClock, this takes no real time.
+        Returns the number of timers run."""
+        fired = 0
+        while True:
+            delay = self.time_to_next ()
+            if delay is None:
+                break
+            if limit is not None and self.timer() + delay > limit:
+                self.clock.sleep (max(limit - self.timer(), 0))
+                fired += self.advance ()
+                break
+            self.clock.sleep (delay)
+            fired += self.advance ()
+        return fired
+
+
+    def start_thread (self):
+        """Run the timers in a new (daemon) thread, which is returned"""
+        self._thread = threading.Thread(target=self.run, name='TimerWheel')
+        self._thread.daemon = True
+        self._thread.start()
+        return self._thread
+
+
+    async def run_async (self):
+        """Run the timers on the asyncio loop until stop() is called"""
+        event = asyncio.Event()
+        self._wakeup = (event, asyncio.get_event_loop())
+        self.running = True
+        try:
+            while self.running:
+                event.clear()
+                delay = self.time_to_next ()
+                if delay is None or delay > 0:
+                    if delay is not None and isinstance(self.clock, _clock.VirtualClock):
+                        await self.clock.sleep_async(delay)
+                    else:
+                        try:
+                            await asyncio.wait_for(event.wait(), delay)
+                        except asyncio.TimeoutError:
+                            pass
+                self.advance ()
+        finally:
+            self._wakeup = None
+
+
+    def stop (self):
+        """Stop run() or run_async() (the timers are kept)"""
+        with self._lock:
+            self.running = False
+            self._notify ()
+
+
+    def __len__ (self):
+        return self.count
+
+
+    def __str__(self):
+        return 'TimerWheel ({} timers, {} fired)'.format(self.count, self.fired)
@@ -1,10 +1,9 @@
-from sense_hat import SenseHat
-import time
-#import logging
+import logging
 #from threading import Timer
-
-sense = SenseHat()
-sense.low_light = True
+import functools
+from .output import deviceManager
+from .output import palette
+from .output.frameScheduler import FrameScheduler
 
 green = (0, 255, 0)
 yellow = (255, 255, 0)
@@ -16,30 +15,77 @@ pink = (255,105, 180)
 
 # where I test a lot of things
 
+class CountdownTable(object):
+    """Precomputed display of a countdown over the given pixels and
+    colors: for each remaining time t, the pixels that change when the
+    countdown goes from t+1 to t (after the blinking), and the pixel
+    that blinks. So a tick does not compute any colors, it only sets
+    the few changed pixels.
+    """
+
+    def __init__(self, pixels, colors, offColor):
+        self.pixels = pixels
+        self.colors = colors
+        self.offColor = offColor
+        n = len(colors)
+        self.maxDuration = n * len(pixels)
+        self.deltas = []
+        self.blinks = []
+        for t in range(self.maxDuration):
+            oldPixel = (t + 1) // n
+            curPixel = t // n
+            delta = []
+            if oldPixel != curPixel and oldPixel < len(pixels):
+                delta.append((pixels[oldPixel], offColor))
+            delta.append((pixels[curPixel], colors[t % n]))
+            self.deltas.append(tuple(delta))
+            self.blinks.append(pixels[curPixel])
+
+    def initial(self, t):
+        """return (pixel, color) for all pixels at the time t"""
+        n = len(self.colors)
+        curPixel = t // n
+        result = []
+        for iPixel, pixel in enumerate(self.pixels):
+            if iPixel < curPixel:
+                # full pixel remaining -> highest color
+                result.append((pixel, self.colors[n - 1]))
+            elif iPixel > curPixel:
+                # pixel used -> off color
+                result.append((pixel, self.offColor))
+            else:
+                # partially used pixel -> display correct color
+                result.append((pixel, self.colors[t % n]))
+        return result
+
+    def __str__(self):
+        return 'CountdownTable ({} pixels, {} colors, maxDuration {})'.format(
+            len(self.pixels), len(self.colors), self.maxDuration)
+
+@functools.lru_cache(maxsize=16)
+def _countdownTable(pixels, colors, offColor):
+    return CountdownTable(pixels, colors, offColor)
+
+
 class PixelCountdown(object):
     """
     Class for a countdown displayed by LEDs that blink and change their color.
     Each LED will "count" down for 10 sec by displaying 10 colors (from violet
     over blue, green, yellow, orange, red to dark red).
     To display a countdown of 50 sec, you need 5 LED.
+    Without a TimerWheel, start() blocks until the countdown has expired.
+    With a TimerWheel, start() returns at once and the countdown runs on
+    the timers of the wheel (many countdowns can share one wheel).
+    The pixels of each tick are taken from a precomputed CountdownTable,
+    so also countdowns over many pixels (e.g. a whole-screen bar) are
+    cheap. With setGradient(), each pixel goes smoothly through colors
+    interpolated between the defaultColors.
     """
 
     onTime = 0.8
     offTime = 1 - onTime
     offColor = (56, 0, 0)  # 0 = dark red
-    defaultColors = [
-        (255,   0,   0),  # 1 = red
-        (255,  30,   0),  # 2 = red-orange
-        (255,  82,   0),  # 3 = yellow-orange
-        (255, 255,   0),  # 4 = yellow
-        #( 64, 255,   0),  # 4 = light green
-        (  0, 255,   0),  # 5 = green
-        (  0, 140,   0),  # 6 = dark green
-        (  0,  82,  82),  # 7 = blue-green
-        (  0,   0, 255),  # 8 = blue
-        (  0,   0,  82),  # 9 = navy
-        (140,   0, 164),  #10 = indigo
-    ]
+    defaultColors = palette.countdownColors
     numColors = len(defaultColors)
 
     defaultPixels = [
@@ -47,84 +93,108 @@ class PixelCountdown(object):
     ]
 
 
-    def __init__(self):
-        """init the countdown with default pixel positions (4 pixels)"""
-#        self.__init__(defaultPixels)
-        #TODO nicht möglich mehrere Konstruktoren zu haben?
-        #def __init__(self, pixels):
-        #"""init the countdown with pixel positions (a list of (x, y) tuples)"""
-        #self.pixels = pixels
-        self.pixels = self.defaultPixels
+    def __init__(self, scheduler=None, wheel=None, pixels=None):
+        """init the countdown with pixel positions (a list of (x, y)
+        tuples, default: defaultPixels, 4 pixels).
+        The blinking is paced by the given FrameScheduler (a new one on
+        the process-wide clock if not given, see output.clock), or by
+        the timers of the given TimerWheel."""
+        self.pixels = pixels or self.defaultPixels
+        self.scheduler = scheduler or FrameScheduler()
+        self.wheel = wheel
+        self._timers = []
+        self._cancelled = False
         self.initColors()
         self.t = 0
 
     def setColors(self, colors):
-        self.colors = self.defaultColors
+        self.colors = colors
         self.numColors = len(self.colors)
-        self.maxDuration = self.numColors * len(self.pixels)
-        print("initialized {0} pixels with {1} colors each (so maxDuration={2})"
-            .format(len(self.pixels), self.numColors, self.maxDuration))
+        self.table = _countdownTable(tuple(self.pixels),
+            tuple(tuple(c) for c in colors), self.offColor)
+        self.maxDuration = self.table.maxDuration
+        logging.debug("initialized %s pixels with %s colors each (so maxDuration=%s)",
+            len(self.pixels), self.numColors, self.maxDuration)
 
 
     def initColors(self):
         self.setColors(self.defaultColors)
 
+    def setGradient(self, steps):
+        """use steps colors (interpolated) from each of the defaultColors
+        to the next one: the countdown takes about steps times longer"""
+        self.setColors(palette.interpolate(self.defaultColors, steps))
+
     def initPixels(self, duration):
         # TODO throw exeption if duration is longer than self.maxDuration
         self.t = duration
         # display all pixels in the correct color (first color or offColor)
-        self.curPixel = self.t // self.numColors;
-        self.curColor = self.t % self.numColors;
-        for iPixel in range(len(self.pixels)):
-            pixel = self.pixels[iPixel]
-            if iPixel < self.curPixel:
-                # full pixel remaining -> highest color
-                self.showPixel(pixel, self.colors[self.numColors - 1])
-            elif iPixel > self.curPixel:
-                # pixel used -> off color
-                self.showPixel(pixel, self.offColor)
-            else:
-                # partially used pixel -> display correct color
-                self.showPixel(pixel, self.colors[self.curColor])
-
-        print("initialized for duration ", duration)
+        self.curPixel = self.t // self.numColors
+        self.showPixels(self.table.initial(self.t))
+        logging.debug("initialized for duration %s", duration)
 
 
     def update(self):
+        """count down until the countdown has expired (blocks)"""
+        while self._step():
+            # the pixel is on for onTime, then off for offTime (together 1 sec)
+            self.scheduler.wait(self.onTime)
+            self.blink()
+            self.scheduler.wait(self.offTime)
+
+    def _step(self):
+        """count down by one second: display the next color. Returns
+        False if the countdown has expired."""
         if self.t == 0:
-            print("expired!")
-            return
+            self.expired()
+            return False
 
-        # TODO set timer to update after 1 sec
-        #t = Timer(3.0, self.update)
-        #t.start() # after 3 seconds, update will be called again
-
-        oldPixel = self.t // self.numColors
         self.t -= 1
-        print "time=", self.t
+        logging.debug("time=%s", self.t)
         self.curPixel = self.t // self.numColors
-        self.curColor = self.t % self.numColors
-        if oldPixel != self.curPixel and oldPixel < len(self.pixels):
-            # display old pixel in dark red (if there is an old pixel)
-            self.showPixel(self.pixels[oldPixel], self.offColor)
+        self.showPixels(self.table.deltas[self.t])
+        return True
+
+    def _tick(self, deadline):
+        """one second of the countdown on the TimerWheel: the timers for
+        the blinking and the next second are set (from the deadline of
+        this one, so there is no drift). The lock of the wheel is held,
+        so a cancel() from another thread comes before or after it."""
+        with self.wheel.lock:
+            if self._cancelled:
+                return
+            if self._step():
+                self._timers = [
+                    self.wheel.schedule_at(deadline + self.onTime, self._blinkOnWheel),
+                    self.wheel.schedule_at(deadline + 1, self._tick, deadline + 1),
+                ]
+            else:
+                self._timers = []
 
-        # display current pixel in current color
-        self.showPixel(self.pixels[self.curPixel], self.colors[self.curColor])
+    def _blinkOnWheel(self):
+        with self.wheel.lock:
+            if not self._cancelled:
+                self.blink()
 
-        time.sleep(0.9)
-        # TODO set timer after onTime: self.blink()
-        #t2 = Timer(3 * self.onTime, self.blink)
-        #t2.start()
-        self.blink()
-        time.sleep(0.1)
+    def cancel(self):
+        """stop a countdown that runs on a TimerWheel (also when a timer
+        of it is just running)"""
+        if self.wheel is None:
+            return
+        with self.wheel.lock:
+            self._cancelled = True
+            for timer in self._timers:
+                timer.cancel()
+            self._timers = []
 
-        self.update()
+    def expired(self):
+        """the countdown has expired - subclasses can overwrite this"""
+        print("expired!")
 
 
     def blink(self):
         """ switch the current pixel off (will be switched on with the next color)"""
-        p = self.pixels[self.curPixel]
-        self.clearPixel(p)
+        self.clearPixel(self.table.blinks[self.t])
 
     def clearPixel(self, pixel):
         """swtich pixel given pixel off - pixel is tople (x, y)"""
@@ -137,6 +207,11 @@ class PixelCountdown(object):
         #print("show pixel {0} in color {1} ", pixel)
         #print("pixel {0}/{1} is on in color {2}".format(pixel[0], pixel[1], color))
 
+    def showPixels(self, changes):
+        """switch the pixels on - changes is a list of (pixel, color)"""
+        for pixel, color in changes:
+            self.showPixel(pixel, color)
+
 
     def getMaxDuration(self):
         return self.maxDuration
@@ -148,40 +223,67 @@ class PixelCountdown(object):
 
     def start(self, duration):
         if duration > self.maxDuration:
-            print "duration too long, will use maxDuration ", self.maxDuration
+            logging.warning("duration too long, will use maxDuration %s", self.maxDuration)
             self.t = self.maxDuration
         else:
             self.t = duration
-        print "started countdown: ", self.t
-        self.initPixels(self.t)
-        self.update()
+        logging.debug("started countdown: %s", self.t)
+        if self.wheel is not None:
+            with self.wheel.lock:
+                self.cancel()
+                self.initPixels(self.t)
+                self._cancelled = False
+                self._tick(self.wheel.timer())
+        else:
+            self.initPixels(self.t)
+            self.scheduler.start()
+            self.update()
 
 # class DerivedClassName(modname.BaseClassName):
 class SensePixelCountdown (PixelCountdown):
 
+    def __init__(self, scheduler=None, wheel=None, pixels=None):
+        """init the countdown on the (shared) SenseHAT"""
+        PixelCountdown.__init__(self, scheduler, wheel, pixels)
+        self.sense = deviceManager.acquire()
+        self.sense.low_light = True
+
+    def close(self):
+        """cancel the countdown and give back the (shared) SenseHAT"""
+        self.cancel()
+        if self.sense is not None:
+            self.sense = None
+            deviceManager.release()
+
     def clearPixel(self, pixel):
         """swich given pixel off - pixel is tuple (x, y)"""
-        #print("pixel {0}/{1} is off".format(pixel[0], pixel[1]))
-        print "pixel", pixel[0], "/", pixel[1], "is off"
-        sense.set_pixel(pixel[0], pixel[1], nothing)
+        logging.debug("pixel %s/%s is off", pixel[0], pixel[1])
+        self.sense.set_pixel(pixel[0], pixel[1], nothing)
 
 
     def showPixel(self, pixel, color):
         """switch given pixel on in the given color - pixel is tuple (x, y)"""
-        print "pixel", pixel[0], "/", pixel[1], "is on in color", color
-        sense.set_pixel(pixel[0], pixel[1], color)
+        logging.debug("pixel %s/%s is on in color %s", pixel[0], pixel[1], color)
+        self.sense.set_pixel(pixel[0], pixel[1], color)
 
-    # BaseClassName.methodname(self, arguments).
-
-sense.clear()
-cnt = SensePixelCountdown()
-cnt.start(35)
+    def showPixels(self, changes):
+        """switch the pixels on - changes is a list of (pixel, color);
+        only these (one or two per tick) are written, the rest of the
+        display is not read or written"""
+        logging.debug("%s pixels changed", len(changes))
+        for (x, y), color in changes:
+            self.sense.set_pixel(x, y, color)
 
+    # BaseClassName.methodname(self, arguments).
 
 # Initialize
 def init():
     print ("in init")
+    cnt = SensePixelCountdown()
+    cnt.sense.clear()
+    cnt.start(35)
     cnt.state()
+    cnt.close()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,9 @@
 # dummy game in a "window"
 
-#from sense_hat import SenseHat
-from sense_emu import SenseHat
 import logging
 import time
-import game.GameWindow
+from .core.game import GameWindow
+from .output import textScroller
 #from exceptions import ArgumentError
 #from output import fieldScroller
 
@@ -13,6 +12,9 @@ class DummyGame (GameWindow):
     and then its name.
     """
 
+    messageArgs = {'scroll_speed': 0.05, 'text_colour': (255, 255, 0),
+        'back_colour': (0, 0, 0)}
+
  
     def _init_game (self):
         """Init game"""
@@ -26,9 +28,9 @@ class DummyGame (GameWindow):
         return self.name
 
 
-    def get_screen (self):
+    def _render_screen (self):
         """ Return the data for the (current) display of the game."""
-        return (144, 96, 144) * 64
+        return [(144, 96, 144)] * 64
         
 
     def get_border_color (self):
@@ -40,19 +42,38 @@ class DummyGame (GameWindow):
     def _start_game (self):
         """Start the game. Will be called when resume_game() is 
         called for the first time."""
-        msg = "{} is the first letter of my name {} !".format(self.letter, self.name)
-        self.sense.show_message(msg, scroll_speed=0.05, text_colour=[255, 255, 0], back_colour=[0, 0, 0])
+        textScroller.show_message(self.sense, self._start_message(), **self.messageArgs)
         self.solved = True
-        
+
+
+    async def _start_game_async (self):
+        """Same as _start_game(), but the message scrolls without blocking
+        the event loop"""
+        await textScroller.show_message_async(self.sense, self._start_message(), **self.messageArgs)
+        self.solved = True
+
+
+    def _start_message (self):
+        return "{} is the first letter of my name {} !".format(self.letter, self.name)
+
 
     def _continue_game (self):
         """Continue the game. Will be called when resume_game() is 
         called not for the first time, but the game is not yet solved."""
-        msg = "the first letter of my name {} !".format(self.name)
-        self.sense.show_message(msg, scroll_speed=0.05, text_colour=[255, 255, 0], back_colour=[0, 0, 0])
+        textScroller.show_message(self.sense, self._continue_message(), **self.messageArgs)
+        self.solved = True
+
+
+    async def _continue_game_async (self):
+        """Same as _continue_game(), but without blocking the event loop"""
+        await textScroller.show_message_async(self.sense, self._continue_message(), **self.messageArgs)
         self.solved = True
 
 
+    def _continue_message (self):
+        return "the first letter of my name {} !".format(self.name)
+
+
     def is_solved (self):
         """Return true if the game is solved"""
         return self.solved
@@ -0,0 +1,84 @@
+"""The backends module selects which device is used as SenseHAT, so
+that switching between hardware, emulator and tests does not need any
+change in the source. Available backends:
+- 'sense_hat': the real SenseHAT
+- 'sense_emu': the SenseHAT emulator (default)
+- 'null': a device that does nothing (see headlessHat.NullSenseHat)
+- 'recording': an in-memory device that records all calls
+  (see headlessHat.RecordingSenseHat)
+The backend is selected with set_backend(name), or else with the
+environment variable SENSEHAT_BACKEND. The module of a backend is
+only imported when a device of that backend is created.
+"""
+
+import importlib
+import os
+from .exceptions import OutputError
+
+envVariable = 'SENSEHAT_BACKEND'
+defaultBackend = 'sense_emu'
+
+# backend name -> (module name, class name)
+_backends = {
+    'sense_hat': ('sense_hat', 'SenseHat'),
+    'sense_emu': ('sense_emu', 'SenseHat'),
+    'null': ('.headlessHat', 'NullSenseHat'),
+    'recording': ('.headlessHat', 'RecordingSenseHat'),
+}
+
+_selected = None
+
+
+def register_backend (name, moduleName, className):
+    """Add (or replace) a backend: devices are created by calling the
+    class className from the module moduleName (a module name starting
+    with '.' is relative to this package)."""
+    _backends[name] = (moduleName, className)
+
+
+def available_backends ():
+    """Return the names of all registered backends"""
+    return sorted(_backends)
+
+
+def set_backend (name):
+    """Select the backend to use (None: use the environment variable
+    or the default)"""
+    if name is not None and name not in _backends:
+        raise OutputError ("unknown backend '{}', must be one of {}".format(
+            name, available_backends()))
+    global _selected
+    _selected = name
+
+
+def get_selected_backend ():
+    """Return the backend selected with set_backend (None if none is
+    selected), so it can be restored later"""
+    return _selected
+
+
+def get_backend_name ():
+    """Return the name of the selected backend"""
+    name = _selected or os.environ.get(envVariable) or defaultBackend
+    if name not in _backends:
+        raise OutputError ("unknown backend '{}' (from {}), must be one of {}".format(
+            name, envVariable, available_backends()))
+    return name
+
+
+def get_backend_class (name=None):
+    """Import the module of the backend (selected one if name is None)
+    and return the class for its devices"""
+    if name is None:
+        name = get_backend_name()
+    elif name not in _backends:
+        raise OutputError ("unknown backend '{}', must be one of {}".format(
+            name, available_backends()))
+    moduleName, className = _backends[name]
+    module = importlib.import_module(moduleName, __package__)
+    return getattr(module, className)
+
+
+def create_device (name=None):
+    """Create a new device of the backend (selected one if name is None)"""
+    return get_backend_class(name)()
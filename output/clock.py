@@ -0,0 +1,118 @@
+"""The clock module is the one place where time is read and waited
+for: the FrameScheduler (and with it the scrolling, the transitions
+and the countdowns), the TimerWheel and the joystick dispatcher use
+the process-wide clock (or a clock given to them).
+The SystemClock is the real (monotonic) time. A VirtualClock only
+pretends to wait: sleeping (or waiting with a timeout) moves its time
+forward at once, so tests and simulations of whole game sessions run
+much faster than real time, and always with the same timing.
+
+    clock.set_clock(clock.VirtualClock())   # before creating schedulers
+"""
+
+import asyncio
+import contextlib
+import time
+
+
+class SystemClock (object):
+    """The real time (time.monotonic) and real waiting"""
+
+    def now (self):
+        """Return the current time in seconds"""
+        return time.monotonic()
+
+
+    def sleep (self, seconds):
+        """Wait for the given number of seconds"""
+        time.sleep(seconds)
+
+
+    async def sleep_async (self, seconds):
+        """Same as sleep(), but as coroutine"""
+        await asyncio.sleep(seconds)
+
+
+    def wait (self, condition, timeout=None):
+        """Wait on the threading.Condition (which the caller holds) until
+        it is notified or the timeout is over"""
+        condition.wait(timeout)
+
+
+    def __str__(self):
+        return 'SystemClock'
+
+
+class VirtualClock (object):
+    """A clock whose time only moves when somebody sleeps (or calls
+    advance()): sleeping takes no real time."""
+
+    def __init__ (self, start=0.0):
+        self.time = start
+        self.sleeps = 0
+        self.slept = 0.0
+
+
+    def now (self):
+        """Return the current (virtual) time in seconds"""
+        return self.time
+
+
+    def advance (self, seconds):
+        """Move the time forward"""
+        if seconds > 0:
+            self.time += seconds
+
+
+    def sleep (self, seconds):
+        """Move the time forward instead of waiting"""
+        self.sleeps += 1
+        self.slept += max(seconds, 0)
+        self.advance (seconds)
+
+
+    async def sleep_async (self, seconds):
+        """Same as sleep(), but as coroutine (lets the other tasks run)"""
+        self.sleep (seconds)
+        await asyncio.sleep(0)
+
+
+    def wait (self, condition, timeout=None):
+        """Wait on the threading.Condition (which the caller holds): with
+        a timeout, the time moves forward by it at once; without one,
+        it really waits until the condition is notified"""
+        if timeout is None:
+            condition.wait()
+        else:
+            self.sleep (timeout)
+
+
+    def __str__(self):
+        return 'VirtualClock at {sf.time:.3f} sec ({sf.sleeps} sleeps)'.format(sf=self)
+
+
+_clock = SystemClock()
+
+
+def get_clock ():
+    """Return the process-wide clock"""
+    return _clock
+
+
+def set_clock (clock):
+    """Replace the process-wide clock (objects that already got the
+    clock keep it). Returns the previous clock."""
+    global _clock
+    previous = _clock
+    _clock = clock
+    return previous
+
+
+@contextlib.contextmanager
+def use_clock (clock):
+    """Use the clock as process-wide clock in a with block"""
+    previous = set_clock (clock)
+    try:
+        yield clock
+    finally:
+        set_clock (previous)
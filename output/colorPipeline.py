@@ -0,0 +1,123 @@
+"""The colorPipeline converts frames to the colors the LEDs can really
+show, before they are sent to the display. The SenseHAT stores colors
+as RGB565 (red 5 bits, green 6 bits, blue 5 bits), so e.g. (255, 0, 0)
+and (250, 1, 2) are the same color on the LEDs. Optionally, a gamma
+correction and a dimming (a low_light done in software) are applied
+first. All of it is done with one lookup table of 256 entries per
+channel, computed once; the frames are converted when they are
+committed (see DisplayDriver). With numpy (optional), whole arrays of
+pixels can be converted at once.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# bits kept by the RGB565 format (as read back from the SenseHAT)
+_masks = (0xF8, 0xFC, 0xF8)
+
+# the converted colors are cached, up to this number of colors
+_maxCachedColors = 4096
+
+
+class ColorPipeline (object):
+    """Quantization (RGB565), gamma correction and dimming of colors
+    with precomputed lookup tables."""
+
+    def __init__ (self, quantize=True, gamma=1.0, lowLight=False,
+            lowLightScale=.25, softLowLight=False, useNumpy=False):
+        """Init the pipeline.
+
+        - quantize: reduce the colors to RGB565
+
+        - gamma: exponent of the gamma correction (1.0: none)
+
+        - lowLight: dim the colors by lowLightScale
+
+        - softLowLight: if True, the DisplayDriver sets lowLight of the
+          pipeline instead of low_light of the SenseHAT (for displays
+          without their own low_light)
+
+        - useNumpy: convert frames with numpy (only if it is installed)
+        """
+        self.quantize = quantize
+        self.gamma = gamma
+        self.lowLight = lowLight
+        self.lowLightScale = lowLightScale
+        self.softLowLight = softLowLight
+        self.useNumpy = useNumpy and numpy is not None
+        self.build ()
+
+
+    def build (self):
+        """(Re)compute the lookup tables (after changing the settings)"""
+        scale = self.lowLightScale if self.lowLight else 1.0
+        luts = []
+        for mask in _masks:
+            lut = []
+            for v in range(256):
+                if self.gamma != 1.0:
+                    v = round(255 * (v / 255) ** self.gamma)
+                v = round(v * scale)
+                lut.append(v & mask if self.quantize else v)
+            luts.append(tuple(lut))
+        self.luts = tuple(luts)
+        self._colors = {}
+        self._arrays = numpy.array(self.luts, dtype=numpy.uint8) if self.useNumpy else None
+
+
+    def set_low_light (self, value):
+        """Switch the dimming on or off"""
+        if value != self.lowLight:
+            self.lowLight = value
+            self.build ()
+
+
+    def apply_color (self, color):
+        """Return the color as it is shown on the LEDs"""
+        color = tuple(color)
+        result = self._colors.get(color)
+        if result is None:
+            lr, lg, lb = self.luts
+            r, g, b = color
+            result = (lr[r], lg[g], lb[b])
+            if len(self._colors) >= _maxCachedColors:
+                self._colors = {}
+            self._colors[color] = result
+        return result
+
+
+    def apply (self, pixels):
+        """Return the frame (64 color tuples) as it is shown on the LEDs
+        (a list of color tuples)"""
+        if self._arrays is not None:
+            return [tuple(p) for p in self.apply_array (pixels).tolist()]
+        get = self._colors.get
+        result = []
+        for p in pixels:
+            if type(p) is not tuple:
+                # colors may also be lists (as for the SenseHAT)
+                p = tuple(p)
+            c = get(p)
+            result.append(c if c is not None else self.apply_color (p))
+        return result
+
+
+    def apply_array (self, pixels):
+        """Convert an array of colors (n x 3, values 0..255) with numpy
+        and return the new array"""
+        if numpy is None:
+            raise ImportError ("apply_array needs numpy")
+        arrays = self._arrays
+        if arrays is None:
+            arrays = numpy.array(self.luts, dtype=numpy.uint8)
+        pixels = numpy.asarray(pixels, dtype=numpy.uint8)
+        result = numpy.empty_like(pixels)
+        for channel in range(3):
+            result[:, channel] = arrays[channel][pixels[:, channel]]
+        return result
+
+
+    def __str__(self):
+        return 'ColorPipeline (quantize {sf.quantize}, gamma {sf.gamma}, lowLight {sf.lowLight})'.format(sf=self)
@@ -0,0 +1,115 @@
+"""The deviceManager hands out one shared device for the whole process,
+instead of each window or module creating its own SenseHAT (each of
+which opens the framebuffer, the joystick and the IMU).
+The device is created (with the selected backend, see backends) when
+it is acquired for the first time, and it is wrapped in one shared
+DisplayDriver, so that the driver always knows what is on the display
+(its frames go through a ColorPipeline that reduces them to the RGB565
+colors of the LEDs).
+Users call acquire() to get it and release() when they are done; when
+the last user has released it (or at the latest when the program ends),
+the display is cleared and the device is closed.
+"""
+
+import atexit
+import logging
+import threading
+from . import backends
+from .colorPipeline import ColorPipeline
+from .displayDriver import DisplayDriver
+
+
+class DeviceManager (object):
+    """Reference-counted owner of one shared device."""
+
+    def __init__ (self, factory=backends.create_device, pipeline=None):
+        """Init the manager (no device is created yet).
+
+        - factory: function that creates a new device
+
+        - pipeline: the ColorPipeline of the DisplayDriver (default: a
+          new one that only quantizes to RGB565)
+        """
+        self.factory = factory
+        self.pipeline = pipeline or ColorPipeline()
+        self.refCount = 0
+        self._driver = None
+        self._lock = threading.Lock()
+
+
+    def acquire (self):
+        """Return the shared device (a DisplayDriver around it), create
+        it if necessary. Each call must be matched by a call of release()."""
+        with self._lock:
+            if self._driver is None:
+                logging.debug('creating shared device')
+                self._driver = DisplayDriver(self.factory(), pipeline=self.pipeline)
+            self.refCount += 1
+            return self._driver
+
+
+    def release (self):
+        """Give back the shared device. When nobody uses it anymore,
+        it is shut down."""
+        with self._lock:
+            if self.refCount > 0:
+                self.refCount -= 1
+            if self.refCount == 0:
+                self._close()
+
+
+    def shutdown (self):
+        """Shut down the shared device, even if it is still used (e.g.
+        when the program ends). A later acquire() creates a new one."""
+        with self._lock:
+            self.refCount = 0
+            self._close()
+
+
+    def is_open (self):
+        """Return True if the shared device exists"""
+        return self._driver is not None
+
+
+    def _close (self):
+        driver = self._driver
+        if driver is None:
+            return
+        self._driver = None
+        logging.debug('closing shared device')
+        try:
+            driver.clear()
+            stick = getattr(driver.sense, 'stick', None)
+            if hasattr(stick, 'close'):
+                stick.close()
+        except Exception as e:
+            logging.warning('error when closing device: {}'.format(e))
+
+
+    def __str__(self):
+        return 'DeviceManager ({} users, device {})'.format(self.refCount,
+            'open' if self.is_open() else 'closed')
+
+
+_manager = DeviceManager()
+atexit.register(_manager.shutdown)
+
+
+def get_manager ():
+    """Return the process-wide DeviceManager"""
+    return _manager
+
+
+def acquire ():
+    """Return the shared device of the process-wide DeviceManager"""
+    return _manager.acquire()
+
+
+def release ():
+    """Give back the shared device of the process-wide DeviceManager"""
+    _manager.release()
+
+
+def shutdown ():
+    """Shut down the shared device of the process-wide DeviceManager"""
+    _manager.shutdown()
@@ -0,0 +1,195 @@
+"""The displayDriver is a layer over the SenseHAT which remembers the
+last frame that was sent to the display. When a new frame is committed,
+only the pixels that changed are pushed, in the cheapest way: no write
+at all if nothing changed, a few set_pixel calls if only some pixels
+changed, or one set_pixels call otherwise.
+
+With a ColorPipeline, the frames are first converted to the colors the
+LEDs really show (RGB565), so frames that look the same on the LEDs
+are equal and not written again. The driver keeps both frames: the
+converted one to find the changes, and the one before the conversion,
+which get_pixels() returns (so a frame that is read, changed and
+written back is not converted twice).
+With a recorder (e.g. a FrameLogWriter), every frame that is committed
+is also written to it.
+
+A DisplayDriver can be used everywhere instead of the SenseHAT object:
+it has the same pixel methods, and everything else (stick, low_light,
+show_message etc.) is passed to the SenseHAT.
+"""
+
+from .exceptions import DataError
+
+_black = (0, 0, 0)
+
+
+class DisplayDriver (object):
+    """Diff-based driver for the display of a SenseHAT."""
+
+    # up to this number of changed pixels, set_pixel is used
+    # for each of them, above it one set_pixels for the whole frame
+    maxSinglePixels = 4
+
+    # methods of the SenseHAT that change the display in a way
+    # the driver can not follow (the last frame is forgotten)
+    _drawingMethods = ('show_message', 'show_letter', 'load_image',
+        'flip_h', 'flip_v', 'set_rotation')
+
+
+    def __init__ (self, sense, maxSinglePixels=None, pipeline=None, recorder=None):
+        """Init the driver for the given SenseHAT.
+
+        - maxSinglePixels: number of changed pixels up to which the
+          pixels are written one by one (default: class attribute)
+
+        - pipeline: the ColorPipeline for the frames (optional)
+
+        - recorder: object with a method write(frame) that records the
+          committed frames (optional, see frameLog)
+        """
+        self.sense = sense
+        if maxSinglePixels is not None:
+            self.maxSinglePixels = maxSinglePixels
+        self.pipeline = pipeline
+        self.recorder = recorder
+        # last committed frame, as converted by the pipeline (as on the
+        # display), and as it was given to commit()
+        self._last = None
+        self._lastInput = None
+        self.reset_stats()
+
+
+    def reset_stats (self):
+        """Set all counters to 0"""
+        self.framesCommitted = 0
+        self.pixelsWritten = 0
+        self.pixelsSkipped = 0
+        self.writesSkipped = 0
+        self.setPixelCalls = 0
+        self.setPixelsCalls = 0
+
+
+    def get_stats (self):
+        """Return the counters as a dictionary"""
+        return {
+            'framesCommitted': self.framesCommitted,
+            'pixelsWritten': self.pixelsWritten,
+            'pixelsSkipped': self.pixelsSkipped,
+            'writesSkipped': self.writesSkipped,
+            'setPixelCalls': self.setPixelCalls,
+            'setPixelsCalls': self.setPixelsCalls,
+        }
+
+
+    def invalidate (self):
+        """Forget the last frame (e.g. after something else has drawn on
+        the display). The next commit will write all pixels."""
+        self._last = None
+        self._lastInput = None
+
+
+    def commit (self, pixels):
+        """Push a frame (64 color tuples) to the display, writing only
+        the pixels that differ from the last committed frame."""
+        if len(pixels) != 64:
+            raise DataError (pixels, "screen data must have 64 elements")
+
+        pixels = [tuple(p) for p in pixels]
+        self._lastInput = pixels
+        if self.pipeline is not None:
+            frame = self.pipeline.apply (pixels)
+        else:
+            frame = pixels
+        last = self._last
+        self.framesCommitted += 1
+        if last is None:
+            changed = range(64)
+        else:
+            changed = [i for i in range(64) if frame[i] != last[i]]
+
+        numChanged = len(changed)
+        if numChanged == 0:
+            self.writesSkipped += 1
+        elif numChanged <= self.maxSinglePixels:
+            for i in changed:
+                self.sense.set_pixel(i % 8, i // 8, frame[i])
+            self.setPixelCalls += numChanged
+        else:
+            self.sense.set_pixels(frame)
+            self.setPixelsCalls += 1
+        self.pixelsWritten += numChanged
+        self.pixelsSkipped += 64 - numChanged
+        self._last = frame
+        if self.recorder is not None and numChanged > 0:
+            self.recorder.write (frame)
+
+
+    def set_pixels (self, pixels):
+        """Same as commit (pixels)"""
+        self.commit (pixels)
+
+
+    def get_pixels (self):
+        """Return the last committed frame, as it was given (before the
+        pipeline). The display is only read if the driver does not know
+        the frame."""
+        if self._lastInput is None:
+            self._last = [tuple(p) for p in self.sense.get_pixels()]
+            self._lastInput = self._last
+        return self._lastInput[:]
+
+
+    def set_pixel (self, x, y, *color):
+        """Set one pixel (color as tuple or as r, g, b), but only
+        write it if it differs from the displayed color."""
+        frame = self.get_pixels()
+        frame[y * 8 + x] = tuple(color[0]) if len(color) == 1 else color
+        self.commit (frame)
+
+
+    def get_pixel (self, x, y):
+        """Return the color of one pixel of the last committed frame"""
+        return self.get_pixels()[y * 8 + x]
+
+
+    def clear (self, *color):
+        """Set all pixels to the given color (black if not given)"""
+        if len(color) == 0:
+            fill = _black
+        else:
+            fill = tuple(color[0]) if len(color) == 1 else color
+        self.commit ([fill] * 64)
+
+
+    def __getattr__ (self, name):
+        # everything else is done by the SenseHAT itself
+        attr = getattr(self.sense, name)
+        if name in self._drawingMethods:
+            def drawing (*args, **kwargs):
+                self.invalidate ()
+                return attr (*args, **kwargs)
+            return drawing
+        return attr
+
+
+    @property
+    def low_light (self):
+        if self.pipeline is not None and self.pipeline.softLowLight:
+            return self.pipeline.lowLight
+        return self.sense.low_light
+
+
+    @low_light.setter
+    def low_light (self, value):
+        if self.pipeline is not None and self.pipeline.softLowLight:
+            # dim in the pipeline and show the last frame again
+            self.pipeline.set_low_light (value)
+            if self._lastInput is not None:
+                self.commit (self._lastInput)
+        else:
+            self.sense.low_light = value
+
+
+    def __str__(self):
+        return ('DisplayDriver ({sf.framesCommitted} frames, {sf.pixelsWritten} '
+            + 'pixels written, {sf.writesSkipped} writes skipped)').format(sf=self)
@@ -1,10 +1,11 @@
-from sense_emu import SenseHat
-#from sense_hat import SenseHat
 #import logging
-import time
+from . import clock
+from . import deviceManager
+from .frameBuffer import FrameBuffer
+from .frameScheduler import FrameScheduler
 
     
-def scroll_vertical (sense, scrollUp, newRows, speed=.1):
+def scroll_vertical (sense, scrollUp, newRows, speed=.1, frame=None, scheduler=None):
     """Scroll the display of the given SenseHAT vertically up or down
     (defined by scrollUp: True/False) by the number of rows given in
     newRows. newRows must be an array of arrays that are each length 8.
@@ -12,22 +13,35 @@ def scroll_vertical (sense, scrollUp, newRows, speed=.1):
     from the array. They will be appended at the bottom when scrolling
     up, and at the top when scrolling down).
     Speed is the time the display waits between scrolling steps.
+    frame is a FrameBuffer with the current content of the display;
+    if it is not given, the display is read back once. Each step is
+    drawn into the frame and sent to the display with one set_pixels.
+    scheduler is the FrameScheduler that paces the steps (a new one
+    if not given; a given one continues its timeline, see resume);
+    steps that are already too late are not displayed.
+    Returns the frame (with the content of the display at the end).
     """
 
-    scrollRange = range(0, 7) if scrollUp else range(7, 0, -1)
-    step = 1 if scrollUp else -1
-    appendIndex = 7 if scrollUp else 0
-
-    for newRowIndex in range(0, len(newRows)):
-        # copy the information from the second-last row to the last row,
-        # then from the third-last to the second-last and so on
-        for row in scrollRange:
-            copy_row (sense, row + step, row)
-        append_row (sense, appendIndex, newRows[newRowIndex])
-        time.sleep(speed)
-
-
-def scroll_horizontal (sense, scrollLeft, newCols, speed=.1):
+    if frame is None:
+        frame = FrameBuffer.from_display(sense)
+    if scheduler is None:
+        scheduler = FrameScheduler()
+        scheduler.start()
+    else:
+        scheduler.resume()
+
+    last = len(newRows) - 1
+    for i, newRow in enumerate(newRows):
+        frame.shift_vertical (scrollUp, newRow)
+        if i < last and scheduler.is_behind(speed):
+            scheduler.skip (speed)
+        else:
+            frame.commit (sense)
+            scheduler.wait (speed)
+    return frame
+
+
+def scroll_horizontal (sense, scrollLeft, newCols, speed=.1, frame=None, scheduler=None):
     """Scroll the display of the given SenseHAT horizontally left or right
     (defined by scrollLeft: True/False) by the number of columns given in
     newCols. newCols must be an array of arrays that are each length 8.
@@ -35,32 +49,45 @@ def scroll_horizontal (sense, scrollLeft, newCols, speed=.1):
     from the array. They will be appended at the right when scrolling
     left, and at the left when scrolling right).
     Speed is the time the display waits between scrolling steps.
+    frame is a FrameBuffer with the current content of the display;
+    if it is not given, the display is read back once. Each step is
+    drawn into the frame and sent to the display with one set_pixels.
+    scheduler is the FrameScheduler that paces the steps (a new one
+    if not given; a given one continues its timeline, see resume);
+    steps that are already too late are not displayed.
+    Returns the frame (with the content of the display at the end).
     """
 
-    scrollRange = range(0, 7) if scrollLeft else range(7, 0, -1)
-    step = 1 if scrollLeft else -1
-    appendIndex = 7 if scrollLeft else 0
-
-    for newColIndex in range(0, len(newCols)):
-        # copy the information from the second-last col to the last col,
-        # then from the third-last to the second-last and so on
-        for col in scrollRange:
-            copy_col (sense, col + step, col)
-        append_col (sense, appendIndex, newCols[newColIndex])
-        time.sleep(speed)
+    if frame is None:
+        frame = FrameBuffer.from_display(sense)
+    if scheduler is None:
+        scheduler = FrameScheduler()
+        scheduler.start()
+    else:
+        scheduler.resume()
+
+    last = len(newCols) - 1
+    for i, newCol in enumerate(newCols):
+        frame.shift_horizontal (scrollLeft, newCol)
+        if i < last and scheduler.is_behind(speed):
+            scheduler.skip (speed)
+        else:
+            frame.commit (sense)
+            scheduler.wait (speed)
+    return frame
 
 
 def copy_row (sense, fromRow, toRow):
-    """Copy a row from the SenseHAT display to another row.
-    fromRow and toRow are row indices (0..7)
+    """Copy a row from the SenseHAT display (or a FrameBuffer) to
+    another row. fromRow and toRow are row indices (0..7)
     """
     for i in range(8):
         sense.set_pixel(i, toRow, sense.get_pixel(i, fromRow))
 
 
 def copy_col (sense, fromCol, toCol):
-    """Copy a column from the SenseHAT display to another column.
-    fromCol and toCol are column indices (0..7)
+    """Copy a column from the SenseHAT display (or a FrameBuffer) to
+    another column. fromCol and toCol are column indices (0..7)
     """
     for i in range(8):
         sense.set_pixel(toCol, i, sense.get_pixel(fromCol, i))
@@ -68,7 +95,7 @@ def copy_col (sense, fromCol, toCol):
 
 def append_row (sense, toRow, newData):
     """Append data from an 8 element array with color values
-    to a given row on the SenseHAT display.
+    to a given row on the SenseHAT display (or a FrameBuffer).
     toRow must be a row index (0..7).
     newData must be an 8 element array with color tuples.
     """
@@ -78,7 +105,7 @@ def append_row (sense, toRow, newData):
 
 def append_col (sense, toCol, newData):
     """Append data from an 8 element array with color values
-    to a given column on the SenseHAT display.
+    to a given column on the SenseHAT display (or a FrameBuffer).
     toCol must be a row index (0..7).
     newData must be an 8 element array with color tuples.
     """
@@ -100,18 +127,12 @@ def screen2cols (data, fromLeft):
     to an array of columns (8 elements with 8 elements each).
     fromLeft defines if element 0 is left or rightmost column.
     """
-    colRange = range(8) if fromLeft else range(8, 0)
-    cols = [None] * 8
-    for x in colRange:
-        cols[x] = [data[y*8 + x] for y in range(8)]
-    return cols
+    colRange = range(8) if fromLeft else range(7, -1, -1)
+    return [[data[y*8 + x] for y in range(8)] for x in colRange]
 
 
 ### test code ###########################################
 
-_s = SenseHat()
-_s.low_light = False
-
 _n = (0,   0,   0)   # nothing
 _a = (255, 255, 0)   # yellow
 _b = (255, 153, 0)   # orange
@@ -149,33 +170,36 @@ _scrollData = [
 
 
 def _init(i):
-    _s.set_pixels(_testImages[i])
+    s = deviceManager.acquire()
+    s.low_light = False
+    s.set_pixels(_testImages[i])
+    return s
    
 
 def _testVertical():
     print ("in _testVertical")
 
-    a = _init(1)
-    time.sleep(1)
+    s = _init(1)
+    clock.get_clock().sleep(1)
     for i in range(4):
-        scroll_vertical(_s, False, _scrollData)
+        scroll_vertical(s, False, _scrollData)
 
-    time.sleep(2)
+    clock.get_clock().sleep(2)
     for i in range(4):
-        scroll_vertical(_s, True, _scrollData)
+        scroll_vertical(s, True, _scrollData)
 
 
 def _testHorizontal():
     print ("in _testHorizontal ")
 
-    a = _init(1)
-    time.sleep(1)    
+    s = _init(1)
+    clock.get_clock().sleep(1)    
     for i in range(4):
-        scroll_horizontal(_s, False, _scrollData)
+        scroll_horizontal(s, False, _scrollData)
 
-    time.sleep(2)
+    clock.get_clock().sleep(2)
     for i in range(4):
-        scroll_horizontal(_s, True, _scrollData)
+        scroll_horizontal(s, True, _scrollData)
     
 
 
@@ -1,9 +1,11 @@
-#from sense_hat import SenseHat
-from sense_emu import SenseHat
 #import logging
-import time
+import functools
+from . import clock
+from . import deviceManager
 from . import displayUtils
 from .exceptions import DataError
+from .frameBuffer import FrameBuffer
+from .frameScheduler import FrameScheduler
 
 """The fieldScroller will take the current SenseHAT display and a
 second 8x8 fields (as array of 64 elements) and implement a scroll
@@ -13,15 +15,21 @@ To mark the scroll operations, all screens are first displayed with
 a border which shrinks a bit, then the scroll is done to the new screen,
 which is displayed with a shrinked border first, then that border is
 expanded and disappears.
+The whole movement is first compiled into a Transition (all frames
+with their durations, see compileScroll), which is then played on the
+display with one call of set_pixels per frame (see playTransition).
 """
 
 _black = (0, 0, 0)
 defaultBorderColor = (120, 120, 120)
 defaultBorderColors = (defaultBorderColor, defaultBorderColor)
 defaultSpeed = .2
+defaultScrollSpeed = .1
+directions = ('up', 'down', 'left', 'right')
 
 
-def scrollUp (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed):
+def scrollUp (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed,
+        scheduler=None):
     """Scrolls the display up, such that the new screen appears 
     from bottom.
     
@@ -30,13 +38,17 @@ def scrollUp (senseHat, newScreen, borderColors=defaultBorderColors, speed=defau
       one that is scrolled away), second element around new screen. 
       
     - speed is the waiting time between steps (drawing border etc.)
+
+    - scheduler is the FrameScheduler that paces the steps (optional)
+
+    Returns the Transition that was played.
     """
-    # True: scroll vertically. second boolean: direction (scroll up?)
-    _scroll (senseHat, newScreen, borderColors, speed, True, True)
+    return _scroll (senseHat, newScreen, borderColors, speed, 'up', scheduler)
     
 
 
-def scrollDown (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed):
+def scrollDown (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed,
+        scheduler=None):
     """Scrolls the display down, such that the new screen appears 
     from top.
     
@@ -47,12 +59,16 @@ def scrollDown (senseHat, newScreen, borderColors=defaultBorderColors, speed=def
       one that is scrolled away), second element around new screen. 
       
     - speed is the waiting time between steps (drawing border etc.)
+
+    - scheduler is the FrameScheduler that paces the steps (optional)
+
+    Returns the Transition that was played.
     """
-    # True: scroll vertically. second boolean: direction (scroll up?)
-    _scroll (senseHat, newScreen, borderColors, speed, True, False)
+    return _scroll (senseHat, newScreen, borderColors, speed, 'down', scheduler)
 
 
-def scrollLeft (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed):
+def scrollLeft (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed,
+        scheduler=None):
     """Scrolls the display left, such that the new screen appears 
     from right.
     
@@ -61,12 +77,16 @@ def scrollLeft (senseHat, newScreen, borderColors=defaultBorderColors, speed=def
       one that is scrolled away), second element around new screen. 
       
     - speed is the waiting time between steps (drawing border etc.)
+
+    - scheduler is the FrameScheduler that paces the steps (optional)
+
+    Returns the Transition that was played.
     """
-    # False: scroll horizontally. second boolean: direction (scroll left?)
-    _scroll (senseHat, newScreen, borderColors, speed, False, True)
+    return _scroll (senseHat, newScreen, borderColors, speed, 'left', scheduler)
 
 
-def scrollRight (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed):
+def scrollRight (senseHat, newScreen, borderColors=defaultBorderColors, speed=defaultSpeed,
+        scheduler=None):
     """Scrolls the display right, such that the new screen appears 
     from left.
     
@@ -75,12 +95,71 @@ def scrollRight (senseHat, newScreen, borderColors=defaultBorderColors, speed=de
       one that is scrolled away), second element around new screen. 
       
     - speed is the waiting time between steps (drawing border etc.)
+
+    - scheduler is the FrameScheduler that paces the steps (optional)
+
+    Returns the Transition that was played.
     """
-    _scroll (senseHat, newScreen, borderColors, speed, False, False)
+    return _scroll (senseHat, newScreen, borderColors, speed, 'right', scheduler)
+
+
+
+def _scroll (senseHat, newScreen, borderColors, speed, direction, scheduler):
+    """Compile the transition from the current display to newScreen
+    and play it on the display. Returns the transition."""
+    transition = compileScroll (senseHat.get_pixels(), newScreen, direction,
+        borderColors, speed)
+    playTransition (senseHat, transition, scheduler)
+    return transition
+
+
+class Transition (object):
+    """A compiled transition: the complete list of frames (each a tuple
+    of 64 color tuples) and for each frame the time it is displayed.
+    Transitions are immutable, so they can be cached and reused.
+    """
+
+    def __init__ (self, frames, durations):
+        self.frames = tuple(frames)
+        self.durations = tuple(durations)
+
+
+    def total_duration (self):
+        """Return the time the whole transition takes"""
+        return sum(self.durations)
+
+
+    def __len__ (self):
+        return len(self.frames)
+
+
+    def __iter__ (self):
+        """Iterate over (frame, duration) pairs"""
+        return iter(zip(self.frames, self.durations))
+
+
+    def __str__(self):
+        return 'Transition ({} frames, {:.2f} sec)'.format(len(self), self.total_duration())
+
+
+def compileScroll (oldScreen, newScreen, direction, borderColors=defaultBorderColors,
+        speed=defaultSpeed, scrollSpeed=defaultScrollSpeed):
+    """Compile the scroll movement from oldScreen to newScreen into a
+    Transition (all frames and their durations), without touching the
+    display. The same arguments give the same (cached) Transition.
 
+    - oldScreen, newScreen: the data of the screens (64 color tuples each)
 
+    - direction: one of 'up', 'down', 'left', 'right' (as for scrollUp etc.)
 
-def _scroll (senseHat, newScreen, borderColors, speed, vertical, upOrLeft):
+    - borderColors: colors of the borders around old and new screen
+
+    - speed is the waiting time between steps (drawing border etc.)
+
+    - scrollSpeed is the waiting time between the steps of the scrolling
+    """
+    if len(oldScreen) != 64:
+        raise DataError (oldScreen, "screen data must have 64 elements")
 
     if len(newScreen) != 64:
         raise DataError (newScreen, "screen data must have 64 elements")
@@ -88,37 +167,83 @@ def _scroll (senseHat, newScreen, borderColors, speed, vertical, upOrLeft):
     if len(borderColors) != 2:
         raise DataError (borderColors, "borderColors must have exactly 2 elements (colors)")
 
-    bColors = (borderColors, borderColors) if len(borderColors) == 1 else borderColors[0:2]
-    #oldDisplay = senseHat.get_pixels()
+    if direction not in directions:
+        raise DataError (direction, "direction must be one of {}".format(directions))
+
+    return _compileScroll (_frozen(oldScreen), _frozen(newScreen), direction,
+        _frozen(borderColors), speed, scrollSpeed)
+
+
+def clear_cache ():
+    """Forget all compiled transitions (e.g. to measure compiling)"""
+    _compileScroll.cache_clear()
+
+
+def _frozen (colors):
+    """Return the colors as tuple of tuples (hashable, for the cache).
+    Screens that are already frozen (e.g. from GameWindow.get_screen())
+    are returned as they are."""
+    if type(colors) is tuple and all(type(c) is tuple for c in colors):
+        return colors
+    return tuple(tuple(c) for c in colors)
+
+
+@functools.lru_cache(maxsize=32)
+def _compileScroll (oldScreen, newScreen, direction, bColors, speed, scrollSpeed):
+    frame = FrameBuffer(oldScreen)
+    frames = []
+    durations = []
+
+    def addFrame (duration):
+        frames.append(tuple(frame.pixels))
+        durations.append(duration)
+
+    # the old screen stays for one step
+    addFrame (speed)
 
     # draw a border along the edge
-    time.sleep(speed)
-    _draw_border1 (senseHat, bColors[0])
-    
-    # (in memory) copy the new screen data and add a border
-    newWithBorder = newScreen[:]
-    _add_border2 (newWithBorder, bColors[1])  
+    _draw_border1 (frame, bColors[0])
+    addFrame (speed)
 
     # move the border away from the edge to the second row/col
-    time.sleep(speed)
-    _draw_border2 (senseHat, bColors[0])
-
-    # scroll from the current display to the one now in memory
-    time.sleep(speed)
-    if vertical:
-        newRows = displayUtils.screen2rows(newWithBorder, upOrLeft)
-        displayUtils.scroll_vertical (senseHat, upOrLeft, newRows)
+    _draw_border2 (frame, bColors[0])
+    addFrame (speed)
+
+    # (in memory) copy the new screen data and add a border
+    newWithBorder = list(newScreen)
+    _add_border2 (newWithBorder, bColors[1])
+
+    # scroll from the old screen to the new one
+    upOrLeft = direction in ('up', 'left')
+    if direction in ('up', 'down'):
+        for newRow in displayUtils.screen2rows(newWithBorder, upOrLeft):
+            frame.shift_vertical (upOrLeft, newRow)
+            addFrame (scrollSpeed)
     else:
-        newCols = displayUtils.screen2rows(newWithBorder, upOrLeft)
-        displayUtils.scroll_horizontal (senseHat, upOrLeft, newCols)
+        for newCol in displayUtils.screen2cols(newWithBorder, upOrLeft):
+            frame.shift_horizontal (upOrLeft, newCol)
+            addFrame (scrollSpeed)
+    durations[-1] += speed
 
     # move the border from the second row/col towards the edge
-    time.sleep(speed)
-    _undraw_border2 (senseHat, bColors[1], newScreen)
-    
+    _undraw_border2 (frame, bColors[1], newScreen)
+    addFrame (speed)
+
     # remove the border from the edge
-    time.sleep(speed)
-    _undraw_border1 (senseHat, newScreen)
+    _undraw_border1 (frame, newScreen)
+    addFrame (0)
+
+    return Transition (frames, durations)
+
+
+def playTransition (senseHat, transition, scheduler=None):
+    """Play a compiled Transition on the display: each frame is sent
+    with one set_pixels and then displayed for its duration.
+    The frames are paced by the given FrameScheduler (a new one if not
+    given), so frames that are already too late are skipped."""
+    if scheduler is None:
+        scheduler = FrameScheduler()
+    scheduler.play (transition.frames, transition.durations, senseHat.set_pixels)
 
 
 def _add_border2 (screenData, borderColor):
@@ -142,27 +267,37 @@ def _add_border2 (screenData, borderColor):
         screenData[i*8 + 6] = borderColor
     
 
-def _border_move_in (senseHat, color):
+def _border_move_in (senseHat, color, scheduler=None):
     """Adds a border moving in from the edge."""
-    _draw_border1 (senseHat, color)
-    time.sleep(0.05)
-    _draw_border2 (senseHat, color)
-    time.sleep(0.2)
-
-
-def  _border_move_out (senseHat, color, screen):
+    scheduler = scheduler or FrameScheduler()
+    scheduler.start()
+    frame = FrameBuffer.from_display(senseHat)
+    _draw_border1 (frame, color)
+    frame.commit (senseHat)
+    scheduler.wait(0.05)
+    _draw_border2 (frame, color)
+    frame.commit (senseHat)
+    scheduler.wait(0.2)
+
+
+def  _border_move_out (senseHat, color, screen, scheduler=None):
     """Removes the border by moving it towards the edge."""
-    _undraw_border2 (senseHat, color, screen)
-    time.sleep(0.05)
-    _undraw_border1 (senseHat, screen)
-    time.sleep(0.2)
+    scheduler = scheduler or FrameScheduler()
+    scheduler.start()
+    frame = FrameBuffer.from_display(senseHat)
+    _undraw_border2 (frame, color, screen)
+    frame.commit (senseHat)
+    scheduler.wait(0.05)
+    _undraw_border1 (frame, screen)
+    frame.commit (senseHat)
+    scheduler.wait(0.2)
 
 
 def _draw_border1 (senseHat, color):
     """Draw a border around the display (along the edges).
 
     Parameters:
-        senseHat -- the SenseHAT object
+        senseHat -- the SenseHAT object (or a FrameBuffer)
         color -- the color to use
     """
 
@@ -180,7 +315,7 @@ def _draw_border2 (senseHat, color):
     in the given color.
 
     Parameters:
-        senseHat -- the SenseHAT object
+        senseHat -- the SenseHAT object (or a FrameBuffer)
         color -- the color to use
     """
 
@@ -211,7 +346,7 @@ def _undraw_border1 (senseHat, screen):
     screen.
 
     Parameters:
-        senseHat -- the SenseHAT object
+        senseHat -- the SenseHAT object (or a FrameBuffer)
         screen -- the data of the screen to display (format as for SenseHAT)
     """
 
@@ -233,7 +368,7 @@ def _undraw_border2 (senseHat, borderColor, screen):
     and replace the second row with data from screen.
 
     Parameters:
-        senseHat -- the SenseHAT object
+        senseHat -- the SenseHAT object (or a FrameBuffer)
         screen -- the data of the screen to display (format as for SenseHAT)
     """
 
@@ -292,21 +427,21 @@ testImages = [
 
 def _testAll():
     """Call for testing and watch on SenseHAT 
-    (real or emulator, depending on import)"""
+    (real or emulator, depending on the selected backend)"""
 
-    s = SenseHat()
+    s = deviceManager.acquire()
     s.low_light = False
     s.set_pixels(testImages[0])
 
     scrollUp (s, testImages[1], borderColors=(_blue, _green), speed=.5)
 
-    time.sleep(1)
+    clock.get_clock().sleep(1)
     scrollDown (s, testImages[0], (_green, _blue), speed=.3)
 
-    time.sleep(1)
+    clock.get_clock().sleep(1)
     scrollLeft (s, testImages[1], (_red, _green), speed=.2)
 
-    time.sleep(1)
+    clock.get_clock().sleep(1)
     scrollRight (s, testImages[0], (_green, _red), speed=.3)
 
 
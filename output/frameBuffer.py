@@ -0,0 +1,107 @@
+"""The frameBuffer keeps an in-memory copy of the 64 pixels of the
+SenseHAT display. A FrameBuffer has the same pixel methods as the
+SenseHAT (set_pixel, get_pixel, set_pixels, get_pixels, clear), so the
+drawing primitives in displayUtils and fieldScroller can draw into it
+instead of the device. When a frame is complete, commit() sends it to
+the display with one single call of set_pixels.
+"""
+
+from .exceptions import DataError
+
+_black = (0, 0, 0)
+
+
+class FrameBuffer (object):
+    """In-memory frame of 8x8 pixels (format as for SenseHAT: element 0
+    is top left, element 63 is bottom right).
+    """
+
+    def __init__ (self, pixels=None):
+        """Init the frame with the given pixels (64 color tuples),
+        or black if no pixels are given.
+        """
+        if pixels is None:
+            self.pixels = [_black] * 64
+        else:
+            self.set_pixels(pixels)
+
+
+    @classmethod
+    def from_display (cls, sense):
+        """Return a new FrameBuffer with the current content of the
+        display, read back with one single call of get_pixels."""
+        return cls(sense.get_pixels())
+
+
+    def load (self, sense):
+        """Read the current content of the display into this frame
+        (one single call of get_pixels)."""
+        self.set_pixels(sense.get_pixels())
+
+
+    def commit (self, sense):
+        """Send the frame to the display (one single call of set_pixels)."""
+        sense.set_pixels(self.pixels)
+
+
+    def get_pixel (self, x, y):
+        """Return the color of the pixel at x, y"""
+        return self.pixels[y * 8 + x]
+
+
+    def set_pixel (self, x, y, *color):
+        """Set the pixel at x, y. The color can be given as one tuple
+        or as three values r, g, b (like for the SenseHAT)."""
+        self.pixels[y * 8 + x] = tuple(color[0]) if len(color) == 1 else color
+
+
+    def get_pixels (self):
+        """Return a copy of the 64 pixels"""
+        return self.pixels[:]
+
+
+    def set_pixels (self, pixels):
+        """Replace all pixels. pixels must have 64 color values."""
+        if len(pixels) != 64:
+            raise DataError (pixels, "screen data must have 64 elements")
+        self.pixels = [tuple(p) for p in pixels]
+
+
+    def clear (self, *color):
+        """Set all pixels to the given color (black if not given)."""
+        if len(color) == 0:
+            fill = _black
+        else:
+            fill = tuple(color[0]) if len(color) == 1 else color
+        self.pixels = [fill] * 64
+
+
+    def shift_vertical (self, up, newRow):
+        """Move all rows by one up (or down, if up is False) and add
+        newRow (8 color tuples) at the bottom (or top)."""
+        if up:
+            self.pixels = self.pixels[8:] + list(newRow)
+        else:
+            self.pixels = list(newRow) + self.pixels[:56]
+
+
+    def shift_horizontal (self, left, newCol):
+        """Move all columns by one left (or right, if left is False) and
+        add newCol (8 color tuples) at the right (or left)."""
+        p = self.pixels
+        if left:
+            self.pixels = [c for y in range(8)
+                for c in p[y*8 + 1:y*8 + 8] + [newCol[y]]]
+        else:
+            self.pixels = [c for y in range(8)
+                for c in [newCol[y]] + p[y*8:y*8 + 7]]
+
+
+    def __eq__ (self, other):
+        if isinstance(other, FrameBuffer):
+            return self.pixels == other.pixels
+        return NotImplemented
+
+
+    def __str__(self):
+        return 'FrameBuffer ({} distinct colors)'.format(len(set(self.pixels)))
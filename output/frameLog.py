@@ -0,0 +1,326 @@
+"""The frameLog records the frames sent to the display in a compact
+append-only file, and plays them back on any backend.
+
+Format: the header (magic and version), then one record per frame:
+    timestamp   float64, seconds (of the clock) since the log started
+    kind        uint8, 0 = keyframe, 1 = delta
+    newColors   uint8, number of colors added to the palette
+    length      uint16, length of the data
+    colors      newColors * 3 bytes (r, g, b)
+    data        keyframe: pairs (run length, palette index) for all
+                64 pixels; delta: groups (unchanged pixels, changed
+                pixels n, n palette indices) for the changed pixels
+Each keyframe starts a new palette (of at most 256 colors), so a frame
+can be decoded from the last keyframe before it. A keyframe is written
+every keyframeInterval frames (and when the palette is full).
+
+The reader maps the file into memory (mmap) and indexes the records,
+so it can seek to any frame or time quickly.
+
+Record with a FrameLogWriter as recorder of the DisplayDriver:
+    driver.recorder = FrameLogWriter('play.shfl')
+Replay (from the directory above the package, here called games):
+    python -m games.output.frameLog play.shfl --backend sense_emu --max-speed
+"""
+
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import time
+from . import backends
+from . import clock as _clock
+from .exceptions import DataError
+from .frameScheduler import FrameScheduler
+
+_magic = b'SHFL'
+_version = 1
+_header = struct.Struct('<4sB')
+_record = struct.Struct('<dBBH')
+_keyframe = 0
+_delta = 1
+
+
+class FrameLogWriter (object):
+    """Appends frames (64 color tuples) to a frame log file"""
+
+    def __init__ (self, path, keyframeInterval=256, timer=None):
+        """Open (create or overwrite) the log file.
+
+        - keyframeInterval: number of frames between two keyframes
+
+        - timer: function returning the time for the timestamps
+          (default: the time of the process-wide clock)
+        """
+        self.path = path
+        self.keyframeInterval = keyframeInterval
+        self.timer = timer or _clock.get_clock().now
+        self.start = self.timer()
+        self.file = open(path, 'wb')
+        self.file.write(_header.pack(_magic, _version))
+        self.frames = 0
+        self.framesSkipped = 0
+        self.bytesWritten = _header.size
+        self._last = None
+        self._palette = {}
+        self._sinceKeyframe = 0
+
+
+    def write (self, pixels, timestamp=None):
+        """Append a frame (frames equal to the last one are skipped,
+        as all frames after close())"""
+        if self.file.closed:
+            return
+        frame = [tuple(p) for p in pixels]
+        if len(frame) != 64:
+            raise DataError (pixels, "screen data must have 64 elements")
+        if frame == self._last:
+            self.framesSkipped += 1
+            return
+        if timestamp is None:
+            timestamp = self.timer() - self.start
+
+        newColors = [c for c in dict.fromkeys(frame) if c not in self._palette]
+        if (self._last is None or self._sinceKeyframe >= self.keyframeInterval
+                or len(self._palette) + len(newColors) > 256):
+            kind = _keyframe
+            self._palette = {}
+            newColors = list(dict.fromkeys(frame))
+        else:
+            kind = _delta
+        for c in newColors:
+            self._palette[c] = len(self._palette)
+
+        if kind == _keyframe:
+            data = self._encode_keyframe (frame)
+            self._sinceKeyframe = 0
+        else:
+            data = self._encode_delta (frame)
+            self._sinceKeyframe += 1
+        record = (_record.pack(timestamp, kind, len(newColors), len(data))
+            + bytes(v for c in newColors for v in c) + data)
+        self.file.write(record)
+        self.bytesWritten += len(record)
+        self.frames += 1
+        self._last = frame
+
+
+    def _encode_keyframe (self, frame):
+        palette = self._palette
+        data = bytearray()
+        i = 0
+        while i < 64:
+            run = 1
+            while i + run < 64 and frame[i + run] == frame[i]:
+                run += 1
+            data += bytes((run, palette[frame[i]]))
+            i += run
+        return bytes(data)
+
+
+    def _encode_delta (self, frame):
+        palette = self._palette
+        last = self._last
+        data = bytearray()
+        i = 0
+        while i < 64:
+            skip = 0
+            while i + skip < 64 and frame[i + skip] == last[i + skip]:
+                skip += 1
+            i += skip
+            if i == 64:
+                break
+            changed = 0
+            while i + changed < 64 and frame[i + changed] != last[i + changed]:
+                changed += 1
+            data += bytes((skip, changed))
+            data += bytes(palette[c] for c in frame[i:i + changed])
+            i += changed
+        return bytes(data)
+
+
+    def flush (self):
+        self.file.flush()
+
+
+    def close (self):
+        """Close the log file"""
+        if not self.file.closed:
+            self.file.close()
+
+
+    def get_stats (self):
+        """Return the counters as a dictionary"""
+        return {
+            'frames': self.frames,
+            'framesSkipped': self.framesSkipped,
+            'bytesWritten': self.bytesWritten,
+            'bytesPerFrame': self.bytesWritten / self.frames if self.frames else None,
+        }
+
+
+    def __str__(self):
+        return 'FrameLogWriter {sf.path} ({sf.frames} frames, {sf.bytesWritten} bytes)'.format(sf=self)
+
+
+class FrameLogReader (object):
+    """Reads a frame log (memory mapped), with random access to the
+    frames by number or by time"""
+
+    def __init__ (self, path):
+        self.path = path
+        if os.path.getsize(path) < _header.size:
+            raise DataError (path, "not a frame log (too short)")
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+        magic, version = _header.unpack_from(self.data, 0)
+        if magic != _magic or version != _version:
+            self.close()
+            raise DataError (path, "not a frame log (version {})".format(_version))
+        self.offsets = []
+        self.timestamps = []
+        self.keyframes = []
+        self._index ()
+
+
+    def _index (self):
+        """Read the headers of all records (the data is skipped)"""
+        offset = _header.size
+        end = len(self.data)
+        while offset + _record.size <= end:
+            timestamp, kind, newColors, length = _record.unpack_from(self.data, offset)
+            size = _record.size + newColors * 3 + length
+            if offset + size > end:
+                # incomplete last record (e.g. the program was killed)
+                break
+            if kind == _keyframe:
+                self.keyframes.append(len(self.offsets))
+            self.offsets.append(offset)
+            self.timestamps.append(timestamp)
+            offset += size
+
+
+    def __len__ (self):
+        return len(self.offsets)
+
+
+    def duration (self):
+        """Return the time from the first to the last frame"""
+        return self.timestamps[-1] - self.timestamps[0] if self.timestamps else 0.0
+
+
+    def index_at (self, timestamp):
+        """Return the number of the frame displayed at the given time"""
+        return max(bisect.bisect_right(self.timestamps, timestamp) - 1, 0)
+
+
+    def frame (self, index):
+        """Return the frame with the given number (decoded from the last
+        keyframe before it)"""
+        start = self.keyframes[bisect.bisect_right(self.keyframes, index) - 1]
+        for i, (timestamp, frame) in enumerate(self.frames (start), start):
+            if i == index:
+                return frame
+        raise IndexError (index)
+
+
+    def frames (self, start=0):
+        """Yield (timestamp, frame) of the frames from the given number"""
+        if start >= len(self.offsets):
+            return
+        keyframe = self.keyframes[bisect.bisect_right(self.keyframes, start) - 1]
+        frame = None
+        palette = []
+        for i in range(keyframe, len(self.offsets)):
+            frame, palette = self._decode (i, frame, palette)
+            if i >= start:
+                yield self.timestamps[i], frame
+
+
+    def _decode (self, i, frame, palette):
+        data = self.data
+        offset = self.offsets[i]
+        timestamp, kind, newColors, length = _record.unpack_from(data, offset)
+        offset += _record.size
+        if kind == _keyframe:
+            palette = []
+        palette = palette + [tuple(data[offset + 3 * k:offset + 3 * k + 3])
+            for k in range(newColors)]
+        offset += newColors * 3
+        body = data[offset:offset + length]
+        if kind == _keyframe:
+            frame = []
+            for k in range(0, length, 2):
+                frame.extend([palette[body[k + 1]]] * body[k])
+        else:
+            frame = list(frame)
+            pos = 0
+            k = 0
+            while k < length:
+                pos += body[k]
+                changed = body[k + 1]
+                for n in range(changed):
+                    frame[pos + n] = palette[body[k + 2 + n]]
+                pos += changed
+                k += 2 + changed
+        return frame, palette
+
+
+    def close (self):
+        self.data.close()
+        self.file.close()
+
+
+    def __str__(self):
+        return 'FrameLogReader {} ({} frames, {} keyframes, {:.1f} sec)'.format(
+            self.path, len(self), len(self.keyframes), self.duration())
+
+
+def replay (reader, sense, maxSpeed=False, start=0, scheduler=None):
+    """Show the frames of the log on the display (sense), with their
+    original timing, or as fast as possible if maxSpeed.
+    Returns the number of frames shown."""
+    if scheduler is None:
+        scheduler = FrameScheduler()
+    scheduler.start()
+    shown = 0
+    previous = None
+    for timestamp, frame in reader.frames (start):
+        if previous is not None and not maxSpeed:
+            scheduler.wait (timestamp - previous)
+        sense.set_pixels (frame)
+        previous = timestamp
+        shown += 1
+    return shown
+
+
+def main (argv=None):
+    parser = argparse.ArgumentParser(description='Replay a frame log on a display backend')
+    parser.add_argument('log', help='the frame log file')
+    parser.add_argument('--backend', help='device backend (default: selected backend)')
+    parser.add_argument('--max-speed', action='store_true',
+        help='show the frames as fast as possible')
+    parser.add_argument('--start', type=float, default=0.0,
+        help='start at this time (sec) of the log')
+    parser.add_argument('--info', action='store_true',
+        help='only print information about the log')
+    args = parser.parse_args(argv)
+
+    reader = FrameLogReader(args.log)
+    print (reader)
+    if not args.info:
+        sense = backends.create_device(args.backend)
+        start = time.perf_counter()
+        shown = replay (reader, sense, args.max_speed,
+            reader.index_at(reader.timestamps[0] + args.start) if len(reader) else 0)
+        print ('{} frames shown in {:.3f} sec'.format(shown, time.perf_counter() - start))
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""The frameScheduler paces animations on a clock (by default the
+process-wide clock, see clock: the monotonic time, or a virtual time
+in tests). Instead of sleeping a fixed time after each frame (so that
+the real duration of a frame is the sleep time plus the time for
+rendering it), each frame has an absolute deadline: the scheduler
+sleeps only until that deadline, so the animation does not drift. If the animation is behind, frames
+whose display time has already passed can be skipped.
+The scheduler counts frames, skipped frames and overruns, and measures
+the jitter (how late the frames really end compared to their deadline).
+"""
+
+from . import clock as _clock
+
+
+class FrameScheduler (object):
+    """Scheduler with absolute frame deadlines.
+    Use it like this:
+        scheduler.start()
+        for frame in frames:
+            if scheduler.is_behind(duration):
+                scheduler.skip(duration)
+            else:
+                show(frame)
+                scheduler.wait(duration)
+    or simply with scheduler.play(frames, durations, show).
+    wait_async and play_async do the same in asyncio coroutines.
+    """
+
+    def __init__ (self, timer=None, sleep=None, maxLag=.5, clock=None):
+        """Init the scheduler.
+
+        - timer: function returning the current (monotonic) time in seconds
+          (default: the time of the clock)
+
+        - sleep: function to wait for the given number of seconds
+          (default: sleep of the clock)
+
+        - maxLag: if a frame ends later than this after its deadline,
+          the scheduler does not try to catch up, but starts a new
+          timeline from now on
+
+        - clock: the clock (default: the process-wide clock)
+        """
+        self.clock = clock or _clock.get_clock()
+        self.timer = timer or self.clock.now
+        self.sleep = sleep or self.clock.sleep
+        self.maxLag = maxLag
+        self.deadline = None
+        self.reset_stats()
+
+
+    def reset_stats (self):
+        """Set all statistics to 0"""
+        self.frames = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.resyncs = 0
+        self.jitterSum = 0.0
+        self.jitterMax = 0.0
+        self.overrunMax = 0.0
+
+
+    def get_stats (self):
+        """Return the statistics as a dictionary (times in seconds)"""
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'overruns': self.overruns,
+            'resyncs': self.resyncs,
+            'jitterMean': self.jitterSum / self.frames if self.frames else 0.0,
+            'jitterMax': self.jitterMax,
+            'overrunMax': self.overrunMax,
+        }
+
+
+    def start (self):
+        """Start a new timeline: the next frame starts now."""
+        self.deadline = self.timer()
+
+
+    def resume (self):
+        """Continue the current timeline if it is still running (its last
+        deadline is at most maxLag ago), otherwise start a new one.
+        So animations played one after the other on a shared scheduler
+        do not drift."""
+        if self.deadline is None or self.timer() - self.deadline > self.maxLag:
+            self.start()
+
+
+    def is_behind (self, duration):
+        """Return True if a frame of the given duration, starting now,
+        would already be over (so it can be skipped)."""
+        if self.deadline is None:
+            self.start()
+        return self.timer() >= self.deadline + duration
+
+
+    def skip (self, duration):
+        """Skip a frame of the given duration (without waiting)."""
+        if self.deadline is None:
+            self.start()
+        self.deadline += duration
+        self.skipped += 1
+
+
+    def wait (self, duration):
+        """Wait until the end of the current frame, which ends duration
+        seconds after the deadline of the previous frame.
+        Returns how late (in seconds) the frame ended."""
+        delay = self._next_deadline (duration)
+        if delay > 0:
+            self.sleep(delay)
+        return self._frame_done ()
+
+
+    async def wait_async (self, duration):
+        """Same as wait(), but as coroutine (waits with sleep_async of the
+        clock, so other tasks can run in the meantime)."""
+        delay = self._next_deadline (duration)
+        if delay > 0:
+            await self.clock.sleep_async(delay)
+        return self._frame_done ()
+
+
+    def _next_deadline (self, duration):
+        """Move the deadline to the end of the current frame, and return
+        the time until then"""
+        if self.deadline is None:
+            self.start()
+        self.deadline += duration
+        self.frames += 1
+
+        now = self.timer()
+        if now > self.deadline:
+            # rendering took longer than the frame
+            self.overruns += 1
+            self.overrunMax = max(self.overrunMax, now - self.deadline)
+        return self.deadline - now
+
+
+    def _frame_done (self):
+        """Record the statistics for the frame that has just ended"""
+        now = self.timer()
+        late = now - self.deadline
+        self.jitterSum += abs(late)
+        self.jitterMax = max(self.jitterMax, abs(late))
+        if late > self.maxLag:
+            self.resyncs += 1
+            self.deadline = now
+        return late
+
+
+    def play (self, frames, durations, show):
+        """Start a new timeline and show the frames, each for its duration
+        (show is called with the frame). Frames which are already over
+        when it is their turn are skipped, but the last frame is always
+        shown."""
+        self.start()
+        last = len(frames) - 1
+        for i, frame in enumerate(frames):
+            if i < last and self.is_behind(durations[i]):
+                self.skip (durations[i])
+            else:
+                show (frame)
+                self.wait (durations[i])
+
+
+    async def play_async (self, frames, durations, show):
+        """Same as play(), but as coroutine"""
+        self.start()
+        last = len(frames) - 1
+        for i, frame in enumerate(frames):
+            if i < last and self.is_behind(durations[i]):
+                self.skip (durations[i])
+            else:
+                show (frame)
+                await self.wait_async (durations[i])
+
+
+    def __str__(self):
+        return 'FrameScheduler ({sf.frames} frames, {sf.skipped} skipped, {sf.overruns} overruns)'.format(sf=self)
@@ -0,0 +1,169 @@
+"""Devices that can be used instead of a SenseHAT when there is no
+display (e.g. for tests and benchmarks). They have the methods of the
+SenseHAT that are used by the games:
+- NullSenseHat does nothing at all (zero cost), the display stays black
+- RecordingSenseHat keeps the pixels in memory and records all calls
+Both have a HeadlessStick as joystick, on which events can be pushed.
+"""
+
+from collections import namedtuple
+import threading
+import time
+
+_black = (0, 0, 0)
+
+# same fields as the InputEvent of the SenseHAT
+InputEvent = namedtuple('InputEvent', ('timestamp', 'direction', 'action'))
+
+
+class HeadlessStick (object):
+    """Joystick without hardware: events are pushed by the program."""
+
+    def __init__ (self):
+        self._events = []
+        self._condition = threading.Condition()
+
+
+    def push (self, direction, action='pressed'):
+        """Add an event, as if the joystick was used"""
+        with self._condition:
+            self._events.append(InputEvent(time.time(), direction, action))
+            self._condition.notify_all()
+
+
+    def _wait (self, timeout=None):
+        """Wait until there is an event (or the timeout is over).
+        Returns True if there is an event."""
+        with self._condition:
+            return bool(self._condition.wait_for(lambda: self._events, timeout))
+
+
+    def get_events (self):
+        """Return (and remove) all events since the last call"""
+        with self._condition:
+            events = self._events
+            self._events = []
+        return events
+
+
+    def wait_for_event (self, emptybuffer=False):
+        """Wait for an event and return it"""
+        with self._condition:
+            if emptybuffer:
+                self._events = []
+            self._condition.wait_for(lambda: self._events)
+            return self._events.pop(0)
+
+
+
+class NullSenseHat (object):
+    """Device that does nothing: drawing is ignored, the display is
+    always black."""
+
+    def __init__ (self):
+        self.low_light = False
+        self.rotation = 0
+        self.stick = HeadlessStick()
+
+
+    def set_pixel (self, x, y, *color):
+        pass
+
+
+    def get_pixel (self, x, y):
+        return [0, 0, 0]
+
+
+    def set_pixels (self, pixels):
+        pass
+
+
+    def get_pixels (self):
+        return [[0, 0, 0] for i in range(64)]
+
+
+    def clear (self, *color):
+        pass
+
+
+    def show_message (self, text, *args, **kwargs):
+        pass
+
+
+    def show_letter (self, letter, *args, **kwargs):
+        pass
+
+
+    def __str__(self):
+        return 'NullSenseHat'
+
+
+
+class RecordingSenseHat (object):
+    """Device that keeps the pixels in memory (like the display would)
+    and records all calls: the number of calls per method in counts,
+    and (if keepLog is True) the calls themselves in log, as tuples
+    (method name, arguments)."""
+
+    def __init__ (self, keepLog=True):
+        self.keepLog = keepLog
+        self.low_light = False
+        self.rotation = 0
+        self.stick = HeadlessStick()
+        self.pixels = [_black] * 64
+        self.reset()
+
+
+    def reset (self):
+        """Forget all recorded calls"""
+        self.counts = {}
+        self.log = []
+
+
+    def _record (self, name, *args):
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if self.keepLog:
+            self.log.append((name, args))
+
+
+    def set_pixel (self, x, y, *color):
+        color = tuple(color[0]) if len(color) == 1 else color
+        self._record ('set_pixel', x, y, color)
+        self.pixels[y * 8 + x] = color
+
+
+    def get_pixel (self, x, y):
+        self._record ('get_pixel', x, y)
+        return list(self.pixels[y * 8 + x])
+
+
+    def set_pixels (self, pixels):
+        self._record ('set_pixels')
+        self.pixels = [tuple(p) for p in pixels]
+
+
+    def get_pixels (self):
+        self._record ('get_pixels')
+        return [list(p) for p in self.pixels]
+
+
+    def clear (self, *color):
+        self._record ('clear')
+        if len(color) == 0:
+            fill = _black
+        else:
+            fill = tuple(color[0]) if len(color) == 1 else color
+        self.pixels = [fill] * 64
+
+
+    def show_message (self, text, *args, **kwargs):
+        self._record ('show_message', text)
+        self.pixels = [_black] * 64
+
+
+    def show_letter (self, letter, *args, **kwargs):
+        self._record ('show_letter', letter)
+
+
+    def __str__(self):
+        return 'RecordingSenseHat ({} calls)'.format(sum(self.counts.values()))
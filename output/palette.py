@@ -0,0 +1,122 @@
+"""The palette module generates named color gradients (rainbow, color
+ramps, the colors of the countdown, ...) once and keeps them: the same
+kind, number of steps and brightness give the same tuple of colors, so
+animations can index a palette instead of computing colors for each
+pixel. A palette of 64 colors can be sent to the display as it is
+(see to_screen).
+"""
+
+import colorsys
+import functools
+from .exceptions import DataError
+
+# colors of the countdown (from the last second to the first)
+countdownColors = (
+    (255,   0,   0),  # 1 = red
+    (255,  30,   0),  # 2 = red-orange
+    (255,  82,   0),  # 3 = yellow-orange
+    (255, 255,   0),  # 4 = yellow
+    (  0, 255,   0),  # 5 = green
+    (  0, 140,   0),  # 6 = dark green
+    (  0,  82,  82),  # 7 = blue-green
+    (  0,   0, 255),  # 8 = blue
+    (  0,   0,  82),  # 9 = navy
+    (140,   0, 164),  #10 = indigo
+)
+
+
+def _rainbow (f):
+    r, g, b = colorsys.hls_to_rgb(f, 0.5, 1)
+    return (r * 255, g * 255, b * 255)
+
+
+# kind -> color stops (evenly spaced), or function of the position
+# (0 <= f < 1) that returns the color
+_kinds = {
+    'red': ((0, 0, 0), (255, 0, 0)),
+    'yellow': ((0, 0, 0), (255, 255, 0)),
+    'green': ((0, 0, 0), (0, 255, 0)),
+    'blue': ((0, 0, 0), (0, 0, 255)),
+    'violet': ((0, 0, 0), (255, 0, 255)),
+    'red2green': ((0, 255, 0), (255, 0, 0)),
+    'green2blue': ((0, 0, 255), (0, 255, 0)),
+    'blue2red': ((255, 0, 0), (0, 0, 255)),
+    'countdown': countdownColors,
+    'rainbow': _rainbow,
+}
+
+
+def register (kind, source):
+    """Add a kind of palette: source is a tuple of color stops or a
+    function of the position 0 <= f < 1 that returns the color"""
+    _kinds[kind] = source
+    _palette.cache_clear()
+
+
+def kinds ():
+    """Return the names of the kinds of palettes"""
+    return sorted(_kinds)
+
+
+def get_palette (kind, steps=64, brightness=1.0):
+    """Return the palette (a tuple of steps color tuples) of the given
+    kind, with the colors scaled by brightness (0..1). It is computed
+    only once for the same arguments."""
+    if kind not in _kinds:
+        raise DataError (kind, "kind must be one of {}".format(kinds()))
+    if steps < 1:
+        raise DataError (steps, "steps must be at least 1")
+    return _palette (kind, steps, brightness)
+
+
+def get_color (kind, i, steps=256):
+    """Return the color number i of the palette of the given kind and
+    number of steps (i wraps around, so any integer can be used)"""
+    return get_palette (kind, steps)[i % steps]
+
+
+@functools.lru_cache(maxsize=64)
+def _palette (kind, steps, brightness):
+    source = _kinds[kind]
+    colors = []
+    for i in range(steps):
+        if callable(source):
+            color = source (i / steps)
+        else:
+            color = _sample (source, i / (steps - 1) if steps > 1 else 0.0)
+        colors.append(tuple(min(255, max(0, round(c * brightness))) for c in color))
+    return tuple(colors)
+
+
+def _sample (stops, f):
+    """Return the color at the position f (0..1) between the stops"""
+    pos = f * (len(stops) - 1)
+    i = min(int(pos), len(stops) - 2)
+    frac = pos - i
+    return tuple(a + (b - a) * frac for a, b in zip(stops[i], stops[i + 1]))
+
+
+def interpolate (colors, steps):
+    """Return the colors with steps-1 interpolated colors between each
+    two of them (a lookup table, computed once for the same arguments)"""
+    return _interpolate (tuple(tuple(c) for c in colors), steps)
+
+
+@functools.lru_cache(maxsize=32)
+def _interpolate (colors, steps):
+    lut = []
+    for c1, c2 in zip(colors, colors[1:]):
+        for i in range(steps):
+            lut.append(tuple(round(a + (b - a) * i / steps) for a, b in zip(c1, c2)))
+    lut.append(colors[-1])
+    return tuple(lut)
+
+
+def to_screen (colors, columnMajor=False):
+    """Return a palette of 64 colors as screen data for set_pixels
+    (row by row, or column by column if columnMajor)"""
+    if len(colors) != 64:
+        raise DataError (colors, "a screen needs a palette of 64 colors")
+    if columnMajor:
+        return [colors[x * 8 + y] for y in range(8) for x in range(8)]
+    return list(colors)
@@ -1,12 +1,8 @@
-#from sense_hat import SenseHat
-from sense_emu import SenseHat
 #import logging
-import time
+from . import clock
+from . import deviceManager
 
 
-s = SenseHat()
-s.low_light = False
-
 green = (0, 255, 0)
 yellow = (255, 255, 0)
 blue = (0, 0, 255)
@@ -47,7 +43,10 @@ testImages = [
 ]
 
 def init(i):
+    s = deviceManager.acquire()
+    s.low_light = False
     s.set_pixels(testImages[i])
+    return s
 
 def scroll_vertical (sense, scrollUp, newRows):
     """Scroll the display of the given SenseHAT vertically up or down
@@ -70,7 +69,7 @@ def scroll_vertical (sense, scrollUp, newRows):
             _copyRow (sense, row + step, row)
         #time.sleep(0.03)
         _appendRow (sense, appendIndex, newRows[newRowIndex])
-        time.sleep(0.1)
+        clock.get_clock().sleep(0.1)
 
 def _copyRow (sense, fromRow, toRow):
     # if the values can be read and written separately:
@@ -91,8 +90,8 @@ def test():
 
 
 if __name__ == "__main__":
-    a = init(1)
-    time.sleep(1)
+    s = init(1)
+    clock.get_clock().sleep(1)
     data = [
         [n, n, n, b, f, b, n, n],
         [n, n, b, f, b, n, n, n],
@@ -102,6 +101,6 @@ if __name__ == "__main__":
     for i in range(4):
         scroll_vertical(s, False, data)
 
-    time.sleep(2)
+    clock.get_clock().sleep(2)
     for i in range(4):
         scroll_vertical(s, True, data)
@@ -0,0 +1,184 @@
+"""The textScroller scrolls text messages over the display, like
+SenseHAT.show_message, but the work is done only once:
+- the font (5x7 pixels, the classic LCD font, with umlauts) is
+  rasterized into a glyph cache when it is needed for the first time
+- a message is rendered into a strip of pixel columns, and the strip
+  into the frames of the scrolling; both are cached by text and colors
+- playing a message only pushes the frames (one set_pixels each),
+  paced by a FrameScheduler. It can block, run in a thread or run as
+  a coroutine (asyncio).
+"""
+
+import functools
+import threading
+from .frameScheduler import FrameScheduler
+
+defaultTextColour = (255, 255, 255)
+defaultBackColour = (0, 0, 0)
+defaultScrollSpeed = .1
+
+# 5 columns per character, bit 0 is the top row
+_font = {
+    ' ': (0x00, 0x00, 0x00, 0x00, 0x00), '!': (0x00, 0x00, 0x5F, 0x00, 0x00),
+    '"': (0x00, 0x07, 0x00, 0x07, 0x00), '#': (0x14, 0x7F, 0x14, 0x7F, 0x14),
+    '$': (0x24, 0x2A, 0x7F, 0x2A, 0x12), '%': (0x23, 0x13, 0x08, 0x64, 0x62),
+    '&': (0x36, 0x49, 0x56, 0x20, 0x50), "'": (0x00, 0x05, 0x03, 0x00, 0x00),
+    '(': (0x00, 0x1C, 0x22, 0x41, 0x00), ')': (0x00, 0x41, 0x22, 0x1C, 0x00),
+    '*': (0x14, 0x08, 0x3E, 0x08, 0x14), '+': (0x08, 0x08, 0x3E, 0x08, 0x08),
+    ',': (0x00, 0x50, 0x30, 0x00, 0x00), '-': (0x08, 0x08, 0x08, 0x08, 0x08),
+    '.': (0x00, 0x60, 0x60, 0x00, 0x00), '/': (0x20, 0x10, 0x08, 0x04, 0x02),
+    '0': (0x3E, 0x51, 0x49, 0x45, 0x3E), '1': (0x00, 0x42, 0x7F, 0x40, 0x00),
+    '2': (0x42, 0x61, 0x51, 0x49, 0x46), '3': (0x21, 0x41, 0x45, 0x4B, 0x31),
+    '4': (0x18, 0x14, 0x12, 0x7F, 0x10), '5': (0x27, 0x45, 0x45, 0x45, 0x39),
+    '6': (0x3C, 0x4A, 0x49, 0x49, 0x30), '7': (0x01, 0x71, 0x09, 0x05, 0x03),
+    '8': (0x36, 0x49, 0x49, 0x49, 0x36), '9': (0x06, 0x49, 0x49, 0x29, 0x1E),
+    ':': (0x00, 0x36, 0x36, 0x00, 0x00), ';': (0x00, 0x56, 0x36, 0x00, 0x00),
+    '<': (0x08, 0x14, 0x22, 0x41, 0x00), '=': (0x14, 0x14, 0x14, 0x14, 0x14),
+    '>': (0x00, 0x41, 0x22, 0x14, 0x08), '?': (0x02, 0x01, 0x51, 0x09, 0x06),
+    '@': (0x32, 0x49, 0x79, 0x41, 0x3E), 'A': (0x7E, 0x11, 0x11, 0x11, 0x7E),
+    'B': (0x7F, 0x49, 0x49, 0x49, 0x36), 'C': (0x3E, 0x41, 0x41, 0x41, 0x22),
+    'D': (0x7F, 0x41, 0x41, 0x22, 0x1C), 'E': (0x7F, 0x49, 0x49, 0x49, 0x41),
+    'F': (0x7F, 0x09, 0x09, 0x09, 0x01), 'G': (0x3E, 0x41, 0x49, 0x49, 0x7A),
+    'H': (0x7F, 0x08, 0x08, 0x08, 0x7F), 'I': (0x00, 0x41, 0x7F, 0x41, 0x00),
+    'J': (0x20, 0x40, 0x41, 0x3F, 0x01), 'K': (0x7F, 0x08, 0x14, 0x22, 0x41),
+    'L': (0x7F, 0x40, 0x40, 0x40, 0x40), 'M': (0x7F, 0x02, 0x0C, 0x02, 0x7F),
+    'N': (0x7F, 0x04, 0x08, 0x10, 0x7F), 'O': (0x3E, 0x41, 0x41, 0x41, 0x3E),
+    'P': (0x7F, 0x09, 0x09, 0x09, 0x06), 'Q': (0x3E, 0x41, 0x51, 0x21, 0x5E),
+    'R': (0x7F, 0x09, 0x19, 0x29, 0x46), 'S': (0x46, 0x49, 0x49, 0x49, 0x31),
+    'T': (0x01, 0x01, 0x7F, 0x01, 0x01), 'U': (0x3F, 0x40, 0x40, 0x40, 0x3F),
+    'V': (0x1F, 0x20, 0x40, 0x20, 0x1F), 'W': (0x3F, 0x40, 0x38, 0x40, 0x3F),
+    'X': (0x63, 0x14, 0x08, 0x14, 0x63), 'Y': (0x07, 0x08, 0x70, 0x08, 0x07),
+    'Z': (0x61, 0x51, 0x49, 0x45, 0x43), '[': (0x00, 0x7F, 0x41, 0x41, 0x00),
+    '\\': (0x02, 0x04, 0x08, 0x10, 0x20), ']': (0x00, 0x41, 0x41, 0x7F, 0x00),
+    '^': (0x04, 0x02, 0x01, 0x02, 0x04), '_': (0x40, 0x40, 0x40, 0x40, 0x40),
+    '`': (0x00, 0x01, 0x02, 0x04, 0x00), 'a': (0x20, 0x54, 0x54, 0x54, 0x78),
+    'b': (0x7F, 0x48, 0x44, 0x44, 0x38), 'c': (0x38, 0x44, 0x44, 0x44, 0x20),
+    'd': (0x38, 0x44, 0x44, 0x48, 0x7F), 'e': (0x38, 0x54, 0x54, 0x54, 0x18),
+    'f': (0x08, 0x7E, 0x09, 0x01, 0x02), 'g': (0x0C, 0x52, 0x52, 0x52, 0x3E),
+    'h': (0x7F, 0x08, 0x04, 0x04, 0x78), 'i': (0x00, 0x44, 0x7D, 0x40, 0x00),
+    'j': (0x20, 0x40, 0x44, 0x3D, 0x00), 'k': (0x7F, 0x10, 0x28, 0x44, 0x00),
+    'l': (0x00, 0x41, 0x7F, 0x40, 0x00), 'm': (0x7C, 0x04, 0x18, 0x04, 0x78),
+    'n': (0x7C, 0x08, 0x04, 0x04, 0x78), 'o': (0x38, 0x44, 0x44, 0x44, 0x38),
+    'p': (0x7C, 0x14, 0x14, 0x14, 0x08), 'q': (0x08, 0x14, 0x14, 0x18, 0x7C),
+    'r': (0x7C, 0x08, 0x04, 0x04, 0x08), 's': (0x48, 0x54, 0x54, 0x54, 0x20),
+    't': (0x04, 0x3F, 0x44, 0x40, 0x20), 'u': (0x3C, 0x40, 0x40, 0x20, 0x7C),
+    'v': (0x1C, 0x20, 0x40, 0x20, 0x1C), 'w': (0x3C, 0x40, 0x30, 0x40, 0x3C),
+    'x': (0x44, 0x28, 0x10, 0x28, 0x44), 'y': (0x0C, 0x50, 0x50, 0x50, 0x3C),
+    'z': (0x44, 0x64, 0x54, 0x4C, 0x44), '{': (0x00, 0x08, 0x36, 0x41, 0x00),
+    '|': (0x00, 0x00, 0x7F, 0x00, 0x00), '}': (0x00, 0x41, 0x36, 0x08, 0x00),
+    '~': (0x08, 0x04, 0x08, 0x10, 0x08),
+    'Ä': (0x7D, 0x12, 0x11, 0x12, 0x7D), 'Ö': (0x3D, 0x42, 0x42, 0x42, 0x3D),
+    'Ü': (0x3D, 0x40, 0x40, 0x40, 0x3D), 'ä': (0x20, 0x55, 0x54, 0x55, 0x78),
+    'ö': (0x38, 0x45, 0x44, 0x45, 0x38), 'ü': (0x3C, 0x41, 0x40, 0x21, 0x7C),
+}
+
+# rasterized font: character -> columns of 8 booleans (top to bottom),
+# built at the first use (under the lock, show_message may run in threads)
+_glyphs = None
+_glyphsLock = threading.Lock()
+
+
+def get_glyph (char):
+    """Return the rasterized glyph of the character (a tuple of columns,
+    each a tuple of 8 booleans, top row first). Unknown characters are
+    shown as '?'. The whole font is rasterized at the first call."""
+    glyphs = _glyphs or _rasterize ()
+    glyph = glyphs.get(char)
+    if glyph is None:
+        glyph = glyphs['?']
+    return glyph
+
+
+def _rasterize ():
+    """Rasterize the font (only once, also if called by several threads)"""
+    global _glyphs
+    with _glyphsLock:
+        if _glyphs is None:
+            glyphs = {}
+            for c, columns in _font.items():
+                # the glyphs are 7 pixels high: leave the top row empty
+                glyphs[c] = tuple(tuple(row > 0 and bool(col & (1 << (row - 1)))
+                    for row in range(8)) for col in columns)
+            _glyphs = glyphs
+    return _glyphs
+
+
+def render_strip (text, textColour=defaultTextColour, backColour=defaultBackColour):
+    """Return the text as a strip of pixel columns (each 8 color tuples,
+    top to bottom), with an empty screen before and after it, so that
+    the scrolling starts and ends with an empty display."""
+    return _render_strip (text, tuple(textColour), tuple(backColour))
+
+
+@functools.lru_cache(maxsize=64)
+def _render_strip (text, textColour, backColour):
+    empty = (backColour,) * 8
+    strip = [empty] * 8
+    for char in text:
+        for column in get_glyph (char):
+            strip.append(tuple(textColour if on else backColour for on in column))
+        strip.append(empty)
+    strip.extend([empty] * 8)
+    return tuple(strip)
+
+
+def compile_message (text, textColour=defaultTextColour, backColour=defaultBackColour):
+    """Return the frames of the scrolling text (each a tuple of 64 color
+    tuples). The same text and colors give the same (cached) frames."""
+    return _compile_message (text, tuple(textColour), tuple(backColour))
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_message (text, textColour, backColour):
+    strip = _render_strip (text, textColour, backColour)
+    return tuple(tuple(strip[start + x][y] for y in range(8) for x in range(8))
+        for start in range(len(strip) - 7))
+
+
+def show_message (sense, text_string, scroll_speed=defaultScrollSpeed,
+        text_colour=defaultTextColour, back_colour=defaultBackColour,
+        scheduler=None, block=True):
+    """Scroll the text over the display (arguments as for
+    SenseHAT.show_message). The frames are taken from the cache.
+
+    - scheduler: the FrameScheduler that paces the frames (a new one if
+      not given)
+
+    - block: if False, the text is scrolled in a new thread, which is
+      returned (e.g. to join() it)
+    """
+    frames = compile_message (text_string, text_colour, back_colour)
+    if scheduler is None:
+        scheduler = FrameScheduler()
+    if block:
+        scheduler.play (frames, [scroll_speed] * len(frames), sense.set_pixels)
+        return None
+    thread = threading.Thread(target=scheduler.play, name='show_message',
+        args=(frames, [scroll_speed] * len(frames), sense.set_pixels))
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+async def show_message_async (sense, text_string, scroll_speed=defaultScrollSpeed,
+        text_colour=defaultTextColour, back_colour=defaultBackColour,
+        scheduler=None):
+    """Same as show_message(), but as coroutine (for asyncio)"""
+    frames = compile_message (text_string, text_colour, back_colour)
+    if scheduler is None:
+        scheduler = FrameScheduler()
+    await scheduler.play_async (frames, [scroll_speed] * len(frames), sense.set_pixels)
+
+
+def _test ():
+    from . import deviceManager
+    sense = deviceManager.acquire()
+    show_message (sense, "Grüezi! 1+1=2", text_colour=(255, 255, 0))
+    thread = show_message (sense, "no wait", block=False)
+    print ("scrolling in {}".format(thread.name))
+    thread.join()
+    deviceManager.release()
+
+
+if __name__ == "__main__":
+    _test ()
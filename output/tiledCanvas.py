@@ -0,0 +1,216 @@
+"""The tiledCanvas treats a rectangle of screens (tiles of 8x8 pixels,
+e.g. the games of a GameWindowGrid) as one large virtual canvas, and
+the display as a viewport on it that can pan by single pixels in any
+direction (also diagonally, and around the edges if wrap is set).
+The tiles are rendered only when they are needed for the first time
+(or when their version has changed) and kept in a tile cache. When the
+viewport pans by one pixel, only the newly exposed row and/or column
+is read from the tiles; the rest of the frame is shifted.
+"""
+
+from .exceptions import DataError
+from .frameBuffer import FrameBuffer
+from .frameScheduler import FrameScheduler
+
+
+class TiledCanvas (object):
+    """Virtual canvas of (tilesW * 8) x (tilesH * 8) pixels with a
+    viewport of 8x8 pixels.
+    """
+
+    def __init__ (self, tilesW, tilesH, tileSource, versionSource=None, wrap=False):
+        """Init the canvas. The viewport is at the top left tile.
+
+        - tilesW, tilesH: number of tiles in x and y direction
+
+        - tileSource: function (tx, ty) that returns the screen of the
+          tile at tx, ty (64 color tuples)
+
+        - versionSource: function (tx, ty) that returns the version of
+          the tile; the tile is rendered again when it changes (optional,
+          without it, tiles are only rendered again after invalidate())
+
+        - wrap: if True, the viewport can pan over the edges of the
+          canvas to the other side
+        """
+        self.tilesW = tilesW
+        self.tilesH = tilesH
+        self.width = tilesW * 8
+        self.height = tilesH * 8
+        self.tileSource = tileSource
+        self.versionSource = versionSource
+        self.wrap = wrap
+        self.tiles = {}
+        self.viewX = 0
+        self.viewY = 0
+        self.frame = None
+        # position and tile versions of the frame (see _frame_key)
+        self._frameKey = None
+        self.reset_stats()
+
+
+    def reset_stats (self):
+        """Set all counters to 0"""
+        self.tilesRendered = 0
+        self.pixelsRead = 0
+        self.steps = 0
+
+
+    def get_stats (self):
+        """Return the counters as a dictionary"""
+        return {
+            'tilesRendered': self.tilesRendered,
+            'tilesCached': len(self.tiles),
+            'pixelsRead': self.pixelsRead,
+            'steps': self.steps,
+        }
+
+
+    def get_tile (self, tx, ty):
+        """Return the screen of the tile at tx, ty (from the cache, it
+        is rendered if necessary)"""
+        version = self.versionSource (tx, ty) if self.versionSource else None
+        entry = self.tiles.get((tx, ty))
+        if entry is None or entry[0] != version:
+            screen = self.tileSource (tx, ty)
+            if len(screen) != 64:
+                raise DataError (screen, "screen data must have 64 elements")
+            entry = (version, tuple(tuple(p) for p in screen))
+            self.tiles[(tx, ty)] = entry
+            self.tilesRendered += 1
+        return entry[1]
+
+
+    def invalidate (self, tx=None, ty=None):
+        """Remove the tile at tx, ty (or all tiles) from the cache"""
+        if tx is None:
+            self.tiles = {}
+        else:
+            self.tiles.pop((tx, ty), None)
+        self._frameKey = None
+
+
+    def get_pixel (self, x, y):
+        """Return the color of the pixel x, y of the canvas (wrapped
+        around if wrap is set)"""
+        if self.wrap:
+            x %= self.width
+            y %= self.height
+        self.pixelsRead += 1
+        return self.get_tile (x // 8, y // 8)[(y % 8) * 8 + x % 8]
+
+
+    def _row (self, y):
+        return [self.get_pixel (self.viewX + x, y) for x in range(8)]
+
+
+    def _column (self, x):
+        return [self.get_pixel (x, self.viewY + y) for y in range(8)]
+
+
+    def can_pan (self, dx, dy):
+        """Return True if the viewport can move by dx, dy pixels"""
+        if self.wrap:
+            return True
+        return (0 <= self.viewX + dx <= self.width - 8
+            and 0 <= self.viewY + dy <= self.height - 8)
+
+
+    def _frame_key (self, x, y):
+        """Return the position x, y with the versions of the (up to 4)
+        tiles under the viewport there"""
+        if self.versionSource is None:
+            return (x, y)
+        tiles = {((x + dx) % self.width // 8, (y + dy) % self.height // 8)
+            for dx in (0, 7) for dy in (0, 7)}
+        return (x, y, tuple(sorted((t, self.versionSource (*t)) for t in tiles)))
+
+
+    def move_to (self, x, y):
+        """Put the viewport at x, y (top left pixel) and render the whole
+        frame, unless the frame is already there and its tiles have not
+        changed. Returns the frame (a FrameBuffer)."""
+        if self.wrap:
+            x %= self.width
+            y %= self.height
+        elif not (0 <= x <= self.width - 8 and 0 <= y <= self.height - 8):
+            raise DataError ((x, y), "viewport must be inside the canvas")
+        key = self._frame_key (x, y)
+        if self.frame is not None and key == self._frameKey:
+            return self.frame
+        self.viewX = x
+        self.viewY = y
+        self.frame = FrameBuffer([p for row in range(8) for p in self._row (y + row)])
+        self._frameKey = key
+        return self.frame
+
+
+    def pan (self, dx, dy):
+        """Move the viewport by dx, dy pixels (each -1, 0 or 1, so also
+        diagonally). Only the newly exposed column and/or row is read
+        from the tiles. Returns the frame, or None if the viewport would
+        leave the canvas (and wrap is not set)."""
+        if dx not in (-1, 0, 1) or dy not in (-1, 0, 1):
+            raise DataError ((dx, dy), "dx and dy must be -1, 0 or 1")
+        if not self.can_pan (dx, dy):
+            return None
+        if self.frame is None:
+            self.move_to (self.viewX, self.viewY)
+
+        if dx != 0:
+            self.viewX += dx
+            # new column at the right (panning right) or left
+            self.frame.shift_horizontal (dx > 0,
+                self._column (self.viewX + (7 if dx > 0 else 0)))
+        if dy != 0:
+            self.viewY += dy
+            self.frame.shift_vertical (dy > 0,
+                self._row (self.viewY + (7 if dy > 0 else 0)))
+        if self.wrap:
+            self.viewX %= self.width
+            self.viewY %= self.height
+        self._frameKey = self._frame_key (self.viewX, self.viewY)
+        self.steps += 1
+        return self.frame
+
+
+    def pan_to (self, x, y, sense, speed=.05, scheduler=None):
+        """Pan the viewport pixel by pixel to x, y, showing each step on
+        the display (sense). Both directions move at the same time, so
+        the path is diagonal first. With wrap, the shorter way around
+        is taken. Returns the number of steps."""
+        if scheduler is None:
+            scheduler = FrameScheduler()
+        if self.frame is None:
+            self.move_to (self.viewX, self.viewY)
+        distX = self._distance (self.viewX, x, self.width)
+        distY = self._distance (self.viewY, y, self.height)
+        steps = max(abs(distX), abs(distY))
+        scheduler.start()
+        for i in range(steps):
+            dx = _sign(distX) if i < abs(distX) else 0
+            dy = _sign(distY) if i < abs(distY) else 0
+            self.pan (dx, dy)
+            if i < steps - 1 and scheduler.is_behind(speed):
+                scheduler.skip(speed)
+                continue
+            self.frame.commit (sense)
+            scheduler.wait(speed)
+        return steps
+
+
+    def _distance (self, start, end, size):
+        dist = end - start
+        if self.wrap:
+            dist %= size
+            if dist > size // 2:
+                dist -= size
+        return dist
+
+
+    def __str__(self):
+        return 'TiledCanvas of {sf.tilesW}x{sf.tilesH} tiles, viewport at {sf.viewX}/{sf.viewY}'.format(sf=self)
+
+
+def _sign (value):
+    return (value > 0) - (value < 0)
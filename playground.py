@@ -1,6 +1,6 @@
 # where I test a lot of things
 import logging
-from threading import Timer
+from .core.timerWheel import TimerWheel
 
 
 class PixelCountdown(object):
@@ -34,14 +34,16 @@ class PixelCountdown(object):
     ]
 
 
-    def __init__(self):
-        """init the countdown with default pixel positions (4 pixels)"""
+    def __init__(self, wheel):
+        """init the countdown with default pixel positions (4 pixels),
+        the updates run on the timers of the given TimerWheel"""
 #        self.__init__(defaultPixels)
         #TODO nicht möglich mehrere Konstruktoren zu haben?
         #def __init__(self, pixels):
         #"""init the countdown with pixel positions (a list of (x, y) tuples)"""
         #self.pixels = pixels
         self.pixels = self.defaultPixels
+        self.wheel = wheel
         self.initColors()
         self.t = 0
 
@@ -82,9 +84,8 @@ class PixelCountdown(object):
             print("expired!")
             return
 
-        # TODO set timer to update after 1 sec
-        t = Timer(3.0, self.update)
-        t.start() # after 3 seconds, update will be called again
+        # after 3 seconds, update will be called again
+        self.wheel.schedule(3.0, self.update)
 
         oldPixel = self.t // self.numColors;
         self.t -= 1
@@ -98,9 +99,7 @@ class PixelCountdown(object):
         # display current pixel in current color
         self.showPixel(self.pixels[self.curPixel], self.colors[self.curColor])
 
-        # TODO set timer after onTime: self.blink()
-        t2 = Timer(3 * self.onTime, self.blink)
-        t2.start()
+        self.wheel.schedule(3 * self.onTime, self.blink)
 
 
     def blink(self):
@@ -138,11 +137,12 @@ class PixelCountdown(object):
         self.update()
 
 
-cnt = PixelCountdown()
-
 # Initialize
 def init():
     print ("in init")
+    wheel = TimerWheel()
+    wheel.start_thread()
+    cnt = PixelCountdown(wheel)
     cnt.state()
 
 
@@ -14,10 +14,10 @@ class Cat(Pet):
 
 class SimonOnTurtle(SimonSays, SimonTurtle):
 
-    def __init__(self, length):
+    def __init__(self, length, batched=False):
         SimonSays.__init__(self, length)
         print('simonSays length:', self.size)
-        SimonTurtle.__init__(self)
+        SimonTurtle.__init__(self, batched)
 
     def onRestart(self):
         """Reset screen on restart
@@ -0,0 +1,276 @@
+"""SimonSays on the SenseHAT, as a game in a GameWindowGrid.
+The four colors are the four quadrants of the screen, and they are
+said by the joystick directions (clockwise):
+    up: blue (top left)         right: green (top right)
+    down: yellow (bottom right) left: red (bottom left)
+All frames (each quadrant lit, correct, wrong, solved, ...) are rendered
+once and then only sent to the display, one set_pixels per frame, so
+the sequence can be played fast.
+"""
+
+import functools
+import logging
+from .simonsays import SimonSays
+from ..core.game import GameWindow
+from ..output.frameScheduler import FrameScheduler
+
+# joystick direction -> color number (in the order of the quadrants)
+directions = {'up': 0, 'right': 1, 'down': 2, 'left': 3}
+
+# colors of the quadrants (as the colors of SimonTurtle)
+colors = ((0, 0, 255), (0, 255, 0), (255, 255, 0), (255, 0, 0))
+
+# top left corners (x, y) of the quadrants
+_quadrants = ((0, 0), (4, 0), (4, 4), (0, 4))
+
+_off = (0, 0, 0)
+_white = (255, 255, 255)
+
+
+class SimonFrames(object):
+    """The frames of the game (tuples of 64 color tuples):
+    - lit[c]: quadrant c bright, the others dimmed
+    - idle: all quadrants dimmed (waiting for the player)
+    - dark: all off (between two colors that are said)
+    - correct: idle with a white center (round solved)
+    - wrong: a red cross (wrong color)
+    - solved: all quadrants bright (game solved)
+    """
+
+    def __init__(self, colors, dim):
+        dimmed = tuple(tuple(round(v * dim) for v in c) for c in colors)
+        self.lit = tuple(self._quadrants([colors[i] if i == c else dimmed[i]
+            for i in range(4)]) for c in range(4))
+        self.idle = self._quadrants(dimmed)
+        self.dark = (_off,) * 64
+        self.correct = tuple(_white if 3 <= i % 8 <= 4 and 3 <= i // 8 <= 4 else p
+            for i, p in enumerate(self.idle))
+        self.wrong = tuple(colors[3] if i % 8 == i // 8 or i % 8 == 7 - i // 8 else _off
+            for i in range(64))
+        self.solved = self._quadrants(colors)
+
+    @staticmethod
+    def _quadrants(quadrantColors):
+        screen = [_off] * 64
+        for (qx, qy), color in zip(_quadrants, quadrantColors):
+            for y in range(qy, qy + 4):
+                for x in range(qx, qx + 4):
+                    screen[y * 8 + x] = color
+        return tuple(screen)
+
+    def __str__(self):
+        return 'SimonFrames ({} colors)'.format(len(self.lit))
+
+
+@functools.lru_cache(maxsize=8)
+def _simonFrames(colors, dim):
+    return SimonFrames(colors, dim)
+
+
+class SimonSense(SimonSays, GameWindow):
+    """SimonSays as GameWindow: while the game waits for the colors of
+    the player, it uses the joystick directions (see handle_input), so
+    the navigation in the grid is only possible before the game is
+    started, while the sequence is played, and after it is over.
+    The middle button resumes the game: it plays the sequence again (the
+    player starts again from its first color), or starts a new game
+    after a wrong color.
+    Everything the game shows is collected as frames with durations and
+    then played by the FrameScheduler (so also on asyncio, see
+    handle_input_async).
+    """
+
+    def __init__(self, name, length=8, scheduler=None, speed=1.0, dim=.2):
+        """Init the game.
+
+        - name: the name of the window
+
+        - length: the length of the sequence to solve the game
+
+        - scheduler: the FrameScheduler (default: a new one)
+
+        - speed: factor for the speed of playing (2.0: twice as fast)
+
+        - dim: brightness of the quadrants that are not lit (0..1)
+        """
+        SimonSays.__init__(self, length, quiet=True)
+        self.scheduler = scheduler or FrameScheduler()
+        self.sayDuration = .5 / speed
+        self.pauseDuration = .15 / speed
+        self.echoDuration = .2 / speed
+        self.feedbackDuration = .6 / speed
+        self.frames = _simonFrames(colors, dim)
+        GameWindow.__init__(self, name)
+
+    def _init_game(self):
+        """Init game"""
+        self.listening = False
+        self.waiting = False
+        self.failed = False
+        self.won = False
+        self.pending = []
+
+    def get_name(self):
+        """ Return the name of the game"""
+        return self.name
+
+    def _render_screen(self):
+        """ Return the data for the (current) display of the game."""
+        if self.won:
+            return self.frames.solved
+        if self.failed:
+            return self.frames.wrong
+        return self.frames.idle
+
+    def get_border_color(self):
+        """ Color for the border (used when scrolling)"""
+        return (255, 160, 0)
+
+    def _start_game(self):
+        """Start the game: play the first round"""
+        self.restart()
+        self._playPending()
+
+    async def _start_game_async(self):
+        self.restart()
+        await self._playPendingAsync()
+
+    def _continue_game(self):
+        """Play the sequence again, or start again after a wrong color"""
+        self._replay()
+        self._playPending()
+
+    async def _continue_game_async(self):
+        self._replay()
+        await self._playPendingAsync()
+
+    def _replay(self):
+        if self.failed:
+            self.restart()
+        else:
+            self.matched = 0
+            self._say()
+
+    def is_solved(self):
+        """Return true if the game is solved"""
+        return self.won
+
+    def handle_input(self, direction):
+        """Hear the color of the direction, if the game is waiting for
+        the player (returns True then)"""
+        if not self._hearDirection(direction):
+            return False
+        self._playPending()
+        return True
+
+    async def handle_input_async(self, direction):
+        if not self._hearDirection(direction):
+            return False
+        await self._playPendingAsync()
+        return True
+
+    def _hearDirection(self, direction):
+        if not self.listening or direction not in directions:
+            return False
+        color = directions[direction]
+        self.pending.append((self.frames.lit[color], self.echoDuration))
+        self.hearColor(color)
+        return True
+
+    def _takePending(self):
+        """Return the frames and durations to play (all pending frames,
+        then the screen of the game, which stays on the display).
+        The game listens to the player only after they are played."""
+        self.listening = False
+        frames = [f for f, d in self.pending] + [self.get_screen()]
+        durations = [d for f, d in self.pending] + [0]
+        self.pending = []
+        return frames, durations
+
+    def _playPending(self):
+        frames, durations = self._takePending()
+        self.scheduler.play(frames, durations, self.sense.set_pixels)
+        self.listening = self.waiting
+
+    async def _playPendingAsync(self):
+        frames, durations = self._takePending()
+        await self.scheduler.play_async(frames, durations, self.sense.set_pixels)
+        self.listening = self.waiting
+
+    def _setState(self, waiting, failed=False, won=False):
+        self.waiting = waiting
+        self.failed = failed
+        self.won = won
+        self.invalidate_screen()
+
+    def onRestart(self):
+        """New game (overwritten method from SimonSays)"""
+        self._setState(False)
+
+    def beforeSayingColors(self):
+        """Show a dark screen before the colors
+        (overwritten method from SimonSays)"""
+        self.waiting = False
+        self.pending.append((self.frames.dark, self.feedbackDuration))
+
+    def sayColor(self, colorNum):
+        """Light the quadrant of the color
+        (overwritten method from SimonSays)"""
+        self.pending.append((self.frames.lit[colorNum], self.sayDuration))
+        self.pending.append((self.frames.dark, self.pauseDuration))
+
+    def beforeHearingColors(self):
+        """Wait for the colors of the player
+        (overwritten method from SimonSays)"""
+        self._setState(True)
+
+    def roundSolved(self):
+        """(overwritten method from SimonSays)"""
+        self.pending.append((self.frames.correct, self.feedbackDuration))
+
+    def wrongColor(self):
+        """The game is lost (overwritten method from SimonSays)"""
+        logging.info('{}: wrong color after {} of {}'.format(self.name, self.matched, self.curLen))
+        self._setState(False, failed=True)
+
+    def gameSolved(self):
+        """(overwritten method from SimonSays)"""
+        self._setState(False, won=True)
+
+    def __str__(self):
+        return 'SimonSense "{sf.name}" (final length {sf.size}, current length {sf.curLen})'.format(sf=self)
+
+
+def _testAuto(length=8):
+    """play a game with the correct directions (as fast as possible)"""
+    names = dict((c, d) for d, c in directions.items())
+    game = SimonSense('Simon', length, speed=50)
+    game.resume_game()
+    while not game.is_solved():
+        for i in range(game.curLen):
+            game.handle_input(names[game.solution[i]])
+    print('{} solved, {}'.format(game, game.scheduler))
+    game.close()
+
+
+def _test():
+    """SimonSense and an other game in a grid, played with the joystick"""
+    from ..core.game import GameWindowGrid
+    from ..core.joystick import JoystickDispatcher
+    from ..dummyGame import DummyGame
+
+    grid = GameWindowGrid(2, 1)
+    grid.set_game(0, 0, SimonSense('Simon', 6, grid.scheduler))
+    grid.set_game(1, 0, DummyGame('Dummy'))
+    grid.start()
+    dispatcher = JoystickDispatcher(grid)
+    try:
+        dispatcher.run()
+    finally:
+        print('Have {}'.format(dispatcher))
+        grid.close()
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.DEBUG)
+    _test()
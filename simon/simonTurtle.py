@@ -1,9 +1,22 @@
 import turtle
 import logging
+from ..output.frameScheduler import FrameScheduler
 
 class SimonTurtle(object):
     """Class for the display of SimonSays with the turtle.
     To use the class, overwrite the hook method  receivedColor(colorNum)
+    The squares for the colors (slots) and the lines of text are items
+    on the canvas, created once and then only changed (recolored, hidden,
+    new text), so the number of canvas items stays the same however many
+    rounds are played.
+    The turtle itself does not draw anymore (also not in the default,
+    not batched mode); it only shows the current position.
+    In batched mode, the screen is updated once per step (the tracer is
+    off), so showing a color takes the same (short) time for any length
+    of the sequence.
+    Each color that is said (showColor) stays for sayDuration, then the
+    slot is empty for pauseDuration, paced by the FrameScheduler (on the
+    clock, see output.clock), so the player can see the sequence.
     """
 
     #constants
@@ -16,46 +29,73 @@ class SimonTurtle(object):
     colors = ['blue', 'green' , 'yellow', 'red']
     font = ('Arial', 12, 'normal')
     align = 'left'  # or 'center' or 'right'
-
-
-    def __init__(self):
+    anchors = {'left': 'sw', 'center': 's', 'right': 'se'}
+    # positions of the lines of text
+    lines = {
+        'title': (baseX, baseYTop + 3 * spaceY),
+        'legend': (baseX, baseYTop + 2 * spaceY),
+        'saying': (baseX + sizeXY + spaceX, baseYTop),
+        'turn': (baseX, baseYBtm - spaceY),
+        'result': (baseX, baseYBtm - 2 * spaceY),
+    }
+
+
+    def __init__(self, batched=False, slotCount=10, screen=None, pen=None,
+            scheduler=None, sayDuration=.8, pauseDuration=.2):
+        """Init the display: slotCount slots of the bottom row are created
+        at once (more are created when a longer sequence is played).
+        The screen and the pen (the turtle) can be given, e.g. to run
+        without a display (default: turtle.Screen() and the turtle).
+        The said colors are paced by the scheduler (default: a new
+        FrameScheduler)."""
         # global variables
         self.curPos = 0
         self.isTopRow = True
-        self.screen = turtle.Screen()
+        self.batched = batched
+        self.scheduler = scheduler or FrameScheduler()
+        self.sayDuration = sayDuration
+        self.pauseDuration = pauseDuration
+        self.screen = screen or turtle.Screen()
+        self.pen = pen or turtle
+        if batched:
+            self.screen.tracer(0)
+            self.pen.hideturtle()
+        self.pen.penup()
+        self.canvas = self.screen.getcanvas()
+        # canvas items of the slots: position (x, y) -> item
+        self.slots = {}
+        self._slot()
+        self.isTopRow = False
+        for i in range(slotCount):
+            self.curPos = i
+            self._slot()
+        # canvas items of the lines of text: name -> item
+        self.texts = {}
+        for name, (x, y) in self.lines.items():
+            self.texts[name] = self.canvas.create_text(x - 1, -y, text='',
+                anchor=self.anchors[self.align], fill='black', font=self.font)
         self.reset()
 
     def reset(self):
         """reset display to be ready for a new game"""
         self.curPos = 0
         self.isTopRow = True
-        turtle.clear()
-        turtle.penup()
-        turtle.setpos((self.baseX, self.baseYTop + 3 * self.spaceY))
-        turtle.write("Neues Rätsel bereit", move=False, align=self.align, font=self.font)
-        turtle.setpos((self.baseX, self.baseYTop + 2 * self.spaceY))
-        turtle.write("0: blau, 1: grün, 2: gelb, 3: rot", move=False, align=self.align, font=self.font)
-        self.screen = turtle.Screen()
+        for name in self.texts:
+            self._write(name, '')
+        self._write('title', "Neues Rätsel bereit")
+        self._write('legend', "0: blau, 1: grün, 2: gelb, 3: rot")
+        self._hideSlots()
+        self._gotoPos()
+        self._update()
+
+    def _write (self, name, text, color='black'):
+        """replace the text of the line with the given name"""
+        self.canvas.itemconfigure(self.texts[name], text=text, fill=color)
 
     def _clearGameArea(self):
         """clear game area (display and solution - to be ready for the next round)"""
-        turtle.setpos((self.baseX, self.baseYBtm))
-        turtle.color('white', 'white')
-        turtle.pensize(width=1)
-        turtle.pendown()
-        turtle.begin_fill()
-        width = 10 * (self.sizeXY + self.spaceX)
-        height = self.sizeXY * 2 + self.spaceY
-        turtle.forward(width)
-        turtle.left(90)
-        turtle.forward(height)
-        turtle.left(90)
-        turtle.forward(width)
-        turtle.left(90)
-        turtle.forward(height)
-        turtle.left(90)
-        turtle.end_fill()
-        turtle.penup()
+        self._hideSlots()
+        self._write('turn', '')
 
     def _pos2XY(self):
         """calculates x/y-position from posNum and isTopRow"""
@@ -64,24 +104,54 @@ class SimonTurtle(object):
         return (x, y)
 
     def _paintColor (self, color, borderColor='black'):
-        """paint a square of size sizeXY at the current position, with the given color"""
-        turtle.color(borderColor, color)
-        turtle.pensize(width=1)
-        turtle.pendown()
-        turtle.begin_fill()
-        for i in range(4):
-            turtle.forward(self.sizeXY)
-            turtle.left(90)
-        turtle.end_fill()
-        turtle.penup()
+        """paint the slot at the current position with the given color"""
+        self.canvas.itemconfigure(self._slot(), fill=color, outline=borderColor,
+            state='normal')
+
+    def _slot (self):
+        """return the canvas item of the slot at the current position
+        (it is created the first time)"""
+        key = self._pos2XY()
+        item = self.slots.get(key)
+        if item is None:
+            x, y = key
+            # canvas coordinates: y is down
+            item = self.canvas.create_polygon(x, -y, x + self.sizeXY, -y,
+                x + self.sizeXY, -y - self.sizeXY, x, -y - self.sizeXY,
+                fill='white', outline='white', width=1, state='hidden')
+            self.slots[key] = item
+        return item
+
+    def _hideSlots (self):
+        """hide the colors of all slots"""
+        for item in self.slots.values():
+            self.canvas.itemconfigure(item, state='hidden')
+
+    def _update (self):
+        """show all changes of this step on the screen (batched mode)"""
+        if self.batched:
+            self.screen.update()
+
+    def _showFor (self, duration):
+        """show all changes on the screen (also if not batched), and
+        wait until they have been visible for duration"""
+        self.screen.update()
+        self.scheduler.wait(duration)
 
     def _gotoPos (self):
-        """moves the turtle to the position defined by posNum and isTopRow"""
-        turtle.setpos(self._pos2XY())
+        """moves the turtle to the position defined by posNum and isTopRow
+        (the turtle only shows the position, it is hidden in batched mode)"""
+        if not self.batched:
+            self.pen.setpos(self._pos2XY())
 
     def showColor (self, colorNum):
-        """show the given color at the current position"""
+        """say the given color: show it at the current position for
+        sayDuration, then hide it for pauseDuration (so the same color
+        twice is seen twice). Returns when both are over."""
         self._paintColor(self.colors[colorNum])
+        self._showFor(self.sayDuration)
+        self.canvas.itemconfigure(self._slot(), state='hidden')
+        self._showFor(self.pauseDuration)
 
     def _nextPos (self):
         """moves the internal variables and the turtle to the next output position"""
@@ -110,14 +180,13 @@ class SimonTurtle(object):
         self.receivedColor(3)
 
     def showColorAndMove(self, colorNum):
-        self.showColor (colorNum)
+        self._paintColor(self.colors[colorNum])
         self._nextPos()
+        self._update()
 
     def startSaying(self):
         """Display message to the user to be attentive"""
-        turtle.setpos((self.baseX + self.sizeXY + self.spaceX, self.baseYTop))
-        turtle.color('black')
-        turtle.write("Merk dir die Farben!", move=False, align=self.align, font=self.font)
+        self._write('saying', "Merk dir die Farben!")
         self._clearGameArea()
 
         self.isTopRow = True
@@ -128,15 +197,16 @@ class SimonTurtle(object):
         self.screen.onkey(None, "1")
         self.screen.onkey(None, "2")
         self.screen.onkey(None, "3")
+        self._update()
+        self.scheduler.start()
 
     def startListening(self):
-        """Make ready to receive input from the user and display it"""
+        """Make ready to receive input from the user and display it
+        (the said colors are over: showColor returns after them)"""
         # cover last displayed color
-        self._paintColor ('white', 'white')
+        self.canvas.itemconfigure(self._slot(), state='hidden')
         # message to user
-        turtle.setpos((self.baseX, self.baseYBtm - self.spaceY))
-        turtle.color('black')
-        turtle.write("Du bist dran", move=True, align=self.align, font=self.font)
+        self._write('turn', "Du bist dran")
         self.isTopRow = False
         self.curPos = 0
         self._gotoPos()
@@ -145,20 +215,18 @@ class SimonTurtle(object):
         self.screen.onkey(self._recvdCol2Go, "2")
         self.screen.onkey(self._recvdCol3Go, "3")
         self.screen.listen()
+        self._update()
 
     def roundSolved(self):
-        #turtle.setpos((self.baseX + self.sizeXY + self.spaceX, self.baseYTop))
-        turtle.color('black')
-        turtle.write("Richtig!", move=False, align=self.align, font=self.font)
+        self._write('turn', "Richtig!")
+        self._update()
 
     def writeResult(self, ok):
-        turtle.setpos((self.baseX, self.baseYBtm - 2 * self.spaceY))
         if ok:
-            turtle.color('darkgreen')
-            turtle.write('Sehr gut!', font=self.font)
+            self._write('result', 'Sehr gut!', 'darkgreen')
         else:
-            turtle.color('red')
-            turtle.write('Das war falsch! Spiel abgebrochen', font=self.font)
+            self._write('result', 'Das war falsch! Spiel abgebrochen', 'red')
+        self._update()
 
     def __str__(self):
         return 'SimonTurtle (curPos {sf.curPos}, isTopRow {sf.isTopRow})'.format(sf=self)
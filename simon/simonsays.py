@@ -1,7 +1,6 @@
 # state machine module
 
 import logging
-from transitions import Machine
 from random import Random
 
 
@@ -12,6 +11,12 @@ class SimonSays(object):
     - call simon.restart() to start the game (this will start 'saying')
     - listen to user input and give it (as a number from 0..3) to simon using  simon.hearColor(the number)
     See also example in  test().
+    The input is checked against the solution with a simple counter of
+    the colors that were heard correctly. With useMachine=True, a state
+    machine (transitions.Machine, states correct0, correct1, etc.) is
+    built for each round instead, as in earlier versions.
+    The default hook methods print what happens; with quiet=True they
+    print nothing (e.g. for simulations, see simulator).
     Subclasses should overwrite:
     - onRestart()
     - beforeSayingColors()
@@ -23,25 +28,30 @@ class SimonSays(object):
     """
 
 
-    def __init__(self, length):
-        """init a SimonSays game with the given maximal length"""
+    def __init__(self, length, useMachine=False, quiet=False, rand=None):
+        """init a SimonSays game with the given maximal length
+        (useMachine, quiet: see class description). The solutions are
+        drawn from rand (a random.Random, default: a new one seeded by
+        the system), so they can be reproduced with a seeded Random."""
         self.size = length
+        self.useMachine = useMachine
+        self.quiet = quiet
+        self.rand = rand or Random()
         self._reset()
 
     def _randomSolution(self, size):
-        r = Random()
-        r.seed()
         sol = []
         for i in range(size):
-            sol.append(r.randint(0, 3))
+            sol.append(self.rand.randint(0, 3))
         return sol
 
     def _reset(self):
         """reset internal variables (new solution)"""
         logging.debug('restart')
         self.solution = self._randomSolution(self.size)
-        logging.info ("solution is: {}".format(self.solution))
+        logging.info ("solution is: %s", self.solution)
         self.curLen = 0
+        self.matched = 0
 
     def restart(self):
         """start or restart the game (with a new solution)"""
@@ -51,30 +61,32 @@ class SimonSays(object):
 
     def onRestart(self):
         """ maybe do something when a new game is started"""
-        print("neue Lösung bereit (Länge: {})".format(self.size))
+        self._output("neue Lösung bereit (Länge: {})", self.size)
         # TODO we want to plug-in our own method for displaying the "colors"
 
     def _nextRound(self):
         """start the next round ('saying' something which is 1 longer than before)"""
         logging.debug('nextRound')
         self.curLen += 1
-        self._initMachine (self.curLen)
+        self.matched = 0
+        if self.useMachine:
+            self._initMachine (self.curLen)
         self._say()
 
     def beforeSayingColors(self):
         """ maybe do something before saying the 'colors'"""
-        print("Pass auf! Hier kommt's:")
+        self._output("Pass auf! Hier kommt's:")
         # TODO we want to plug-in our own method for displaying the "colors"
 
     def beforeHearingColors(self):
         """ maybe do something to start 'listening' to the 'colors'"""
-        print("Jetzt bist du dran")
+        self._output("Jetzt bist du dran")
         # TODO we want to plug-in our own method for starting to listen
 
 
     def sayColor (self, color):
         """display one color - this method should be given / plugged in by the class using SimonSays"""
-        print('- ', color)
+        self._output('-  {}', color)
         # TODO we want to plug-in our own method for displaying the "colors"
 
     def _say(self):
@@ -87,19 +99,39 @@ class SimonSays(object):
 
     def hearColor(self, color):
         """simon hears the other player say a color (0..3)"""
-        logging.debug('hear color: {}'.format(color))
-        print("hearing color ", color)
-        res = self.trigger('gotColor' + str(color))
+        logging.debug('hear color: %s', color)
+        self._output("hearing color  {}", color)
+        if self.useMachine:
+            res = self.trigger('gotColor' + str(color))
+        else:
+            res = self._match(color)
         if not res:
             self.wrongColor()
         return res
 
+    def _match(self, color):
+        """compare the color with the next color of the solution
+        (instead of the state machine)"""
+        if self.matched >= self.curLen or color != self.solution[self.matched]:
+            return False
+        self.matched += 1
+        if self.matched == self.curLen:
+            self._solved()
+        return True
+
+    def getState(self):
+        """return the current state: 'correct' and the number of colors
+        heard correctly in this round (as the states of the machine)"""
+        if self.useMachine:
+            return self.state
+        return 'correct' + str(self.matched)
+
     def roundSolved(self):
-        print("------ richtig --------")
+        self._output("------ richtig --------")
         # TODO we want to plug-in our own method for displaying "roundSolved"
 
     def wrongColor(self):
-        print("-----!!! falsch !!!-----------")
+        self._output("-----!!! falsch !!!-----------")
         # TODO we want to plug-in our own method for displaying "wrong"
 
     def _solved(self):
@@ -112,12 +144,20 @@ class SimonSays(object):
 
     def gameSolved(self):
         """the game has been solved up to the maximal length"""
-        print("------- >>> du bist super! <<<-------")
+        self._output("------- >>> du bist super! <<<-------")
         # TODO we want to plug-in our own method for what to do when game is solved
 
 
+    def _output(self, text, *args):
+        """print the text (used by the default hooks), unless quiet;
+        the args are formatted into it only when it is printed"""
+        if self.quiet:
+            return
+        print(text.format(*args) if args else text)
+
     def _initMachine(self, size):
         """init state-machine: states correct0, correct1, etc. up to size"""
+        from transitions import Machine
         logging.debug('initMachine, size: {}'.format(size))
         self.states = ["correct" + str(i) for i in range(size+1)]
         logging.debug('states are: {}'.format(self.states))
@@ -149,7 +189,7 @@ def _testAuto(testlen):
         # we know the solution... - say numbers up to current length
         for i in range(simon.curLen):
             simon.hearColor(simon.solution[i])
-            print('[testout] state: ', simon.state)
+            print('[testout] state: ', simon.getState())
 
 
 def _test():
@@ -0,0 +1,202 @@
+"""Headless simulation of many SimonSays games, to tune the lengths of
+the sequences offline. The games run without turtle and without output
+(quiet SimonSays), on a pool of processes, against a player model:
+- perfect: always repeats the sequence correctly
+- random: says random colors
+- forgetful: remembers at most memory colors, and makes a mistake with
+  the probability errorRate for each color
+The results (games per second, distribution of the rounds reached, cost
+per round) are printed as JSON.
+
+Run it from the directory above the package (here called games), e.g.:
+    python -m games.simon.simulator --games 10000 --length 12 --player forgetful
+"""
+
+import argparse
+import json
+import multiprocessing
+import time
+from random import Random
+from .simonsays import SimonSays
+
+
+class PerfectPlayer(object):
+    """Always repeats the sequence correctly"""
+
+    def nextColor(self, said, index, rand):
+        return said[index]
+
+
+class RandomPlayer(object):
+    """Says random colors"""
+
+    def nextColor(self, said, index, rand):
+        return rand.randint(0, 3)
+
+
+class ForgetfulPlayer(object):
+    """Remembers at most memory colors (guesses the others) and makes a
+    mistake with the probability errorRate for each color"""
+
+    def __init__(self, memory=7, errorRate=.02):
+        self.memory = memory
+        self.errorRate = errorRate
+
+    def nextColor(self, said, index, rand):
+        if index >= self.memory or rand.random() < self.errorRate:
+            return rand.randint(0, 3)
+        return said[index]
+
+
+players = {
+    'perfect': PerfectPlayer,
+    'random': RandomPlayer,
+    'forgetful': ForgetfulPlayer,
+}
+
+
+class SimulatedSimon(SimonSays):
+    """Quiet SimonSays that records what it says and how the game ends"""
+
+    def __init__(self, length, useMachine=False, rand=None):
+        self.said = []
+        self.failed = False
+        self.solved = False
+        SimonSays.__init__(self, length, useMachine=useMachine, quiet=True, rand=rand)
+
+    def beforeSayingColors(self):
+        self.said = []
+
+    def sayColor(self, color):
+        self.said.append(color)
+
+    def wrongColor(self):
+        self.failed = True
+
+    def gameSolved(self):
+        self.solved = True
+
+
+def playGame(length, player, rand, useMachine=False, solutionRand=None):
+    """Play one game with the player model (rand: for the player,
+    solutionRand: for the solution); return the number of rounds
+    reached, whether the game was solved and the number of inputs"""
+    simon = SimulatedSimon(length, useMachine, solutionRand)
+    simon.restart()
+    inputs = 0
+    while not (simon.failed or simon.solved):
+        said = simon.said
+        for index in range(len(said)):
+            inputs += 1
+            if not simon.hearColor(player.nextColor(said, index, rand)):
+                break
+    return simon.curLen, simon.solved, inputs
+
+
+def _playBatch(args):
+    """Play a batch of games (in a worker process); return the rounds
+    reached per game, the number of solved games and inputs and the
+    time used"""
+    length, games, playerName, playerArgs, seed, useMachine = args
+    player = players[playerName](**playerArgs)
+    rand = Random(seed)
+    solutionRand = Random(rand.getrandbits(32))
+    rounds = []
+    solved = 0
+    inputs = 0
+    start = time.perf_counter()
+    for i in range(games):
+        reached, ok, n = playGame(length, player, rand, useMachine, solutionRand)
+        rounds.append(reached)
+        solved += ok
+        inputs += n
+    return rounds, solved, inputs, time.perf_counter() - start
+
+
+def simulate(games, length, playerName='forgetful', playerArgs=None,
+        processes=None, batchSize=200, seed=None, useMachine=False):
+    """Play the games on a pool of processes and return the statistics
+    as a dictionary"""
+    playerArgs = playerArgs or {}
+    if playerName not in players:
+        raise ValueError('unknown player model {}, available: {}'.format(
+            playerName, sorted(players)))
+    seeds = Random(seed)
+    batches = []
+    left = games
+    while left > 0:
+        n = min(batchSize, left)
+        batches.append((length, n, playerName, playerArgs,
+            seeds.getrandbits(32), useMachine))
+        left -= n
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_playBatch, batches)
+    seconds = time.perf_counter() - start
+
+    rounds = {}
+    solved = 0
+    inputs = 0
+    cpuSeconds = 0.0
+    for batchRounds, batchSolved, batchInputs, batchSeconds in results:
+        for reached in batchRounds:
+            rounds[reached] = rounds.get(reached, 0) + 1
+        solved += batchSolved
+        inputs += batchInputs
+        cpuSeconds += batchSeconds
+    roundsTotal = sum(r * n for r, n in rounds.items())
+    return {
+        'games': games,
+        'length': length,
+        'player': playerName,
+        'playerArgs': playerArgs,
+        'matcher': 'machine' if useMachine else 'counter',
+        'processes': processes or multiprocessing.cpu_count(),
+        'seconds': seconds,
+        'gamesPerSec': games / seconds if seconds else None,
+        'solved': solved,
+        'roundsReached': dict(sorted(rounds.items())),
+        'roundsMean': roundsTotal / games if games else 0.0,
+        'inputs': inputs,
+        'costPerRound': cpuSeconds / roundsTotal if roundsTotal else None,
+        'costPerInput': cpuSeconds / inputs if inputs else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--games', type=int, default=1000,
+        help='number of games to play')
+    parser.add_argument('--length', type=int, default=10,
+        help='length of the solution')
+    parser.add_argument('--player', default='forgetful', choices=sorted(players),
+        help='player model (default: forgetful)')
+    parser.add_argument('--memory', type=int, default=7,
+        help='colors the forgetful player can remember')
+    parser.add_argument('--error-rate', type=float, default=.02,
+        help='probability of a mistake of the forgetful player')
+    parser.add_argument('--processes', type=int,
+        help='number of processes (default: number of CPUs)')
+    parser.add_argument('--seed', type=int, help='seed for reproducible runs')
+    parser.add_argument('--machine', action='store_true',
+        help='use the state machine instead of the counter')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    args = parser.parse_args(argv)
+
+    playerArgs = {}
+    if args.player == 'forgetful':
+        playerArgs = {'memory': args.memory, 'errorRate': args.error_rate}
+    results = simulate(args.games, args.length, args.player, playerArgs,
+        args.processes, seed=args.seed, useMachine=args.machine)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
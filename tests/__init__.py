@@ -0,0 +1,6 @@
+"""Unit tests, on the headless backends (see output/headlessHat) and
+with a VirtualClock where time matters, so they need no SenseHAT.
+
+Run them from the directory above the package (here called games):
+    python -m unittest discover -s games/tests -t .
+"""
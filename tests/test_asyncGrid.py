@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+from ..core.asyncGrid import AsyncGridRuntime
+from ..core.game import GameWindow, GameWindowGrid
+from ..output import backends
+from ..output.clock import VirtualClock
+from ..output.frameScheduler import FrameScheduler
+
+
+class _BlockingGame (GameWindow):
+    """draws in _start_game() (in the executor) until it is stopped"""
+
+    def _init_game (self):
+        self.running = False
+        self.frames = 0
+
+    def _start_game (self):
+        self.running = True
+        while not self.stopRequested.wait(.001):
+            self.frames += 1
+        self.running = False
+
+
+class AsyncGridTest (unittest.TestCase):
+
+    def setUp (self):
+        backends.set_backend('recording')
+        self.grid = GameWindowGrid(2, 1, FrameScheduler(clock=VirtualClock()))
+        self.game = _BlockingGame('A')
+        self.grid.set_game(0, 0, self.game)
+        self.grid.set_game(1, 0, GameWindow('B'))
+        self.runtime = AsyncGridRuntime(self.grid)
+
+    def tearDown (self):
+        self.grid.close()
+        backends.set_backend(None)
+
+    def test_blocking_game_is_stopped_before_the_transition (self):
+        async def play ():
+            self.runtime._resume(self.game)
+            while self.game.frames == 0:
+                await asyncio.sleep(.001)
+            self.assertTrue(self.game.running)
+            self.assertTrue(await self.runtime.go('right'))
+            # the worker thread has returned, and draws no more
+            self.assertFalse(self.game.running)
+            frames = self.game.frames
+            await asyncio.sleep(.01)
+            self.assertEqual(self.game.frames, frames)
+            await self.runtime._stop_game()
+        asyncio.run(play())
+        self.assertEqual(self.grid.posX, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from ..output.colorPipeline import ColorPipeline
+from ..output.displayDriver import DisplayDriver
+from ..output.headlessHat import RecordingSenseHat
+
+red = (255, 0, 0)
+grey = (48, 48, 48)
+
+
+class _Recorder (object):
+
+    def __init__ (self):
+        self.frames = []
+
+    def write (self, frame):
+        self.frames.append(frame)
+
+
+class DiffTest (unittest.TestCase):
+
+    def setUp (self):
+        self.device = RecordingSenseHat()
+        self.driver = DisplayDriver(self.device)
+
+    def test_first_commit_writes_all (self):
+        self.driver.set_pixels([red] * 64)
+        self.assertEqual(self.device.counts, {'set_pixels': 1})
+        self.assertEqual(self.device.pixels, [red] * 64)
+
+    def test_unchanged_frame_is_not_written (self):
+        self.driver.set_pixels([red] * 64)
+        self.device.reset()
+        self.driver.set_pixels([red] * 64)
+        self.assertEqual(self.device.counts, {})
+        self.assertEqual(self.driver.writesSkipped, 1)
+
+    def test_few_changes_are_single_pixels (self):
+        self.driver.set_pixels([red] * 64)
+        self.device.reset()
+        self.driver.set_pixel(2, 3, grey)
+        self.assertEqual(self.device.counts, {'set_pixel': 1})
+        self.assertEqual(self.device.pixels[3 * 8 + 2], grey)
+
+    def test_many_changes_are_one_frame (self):
+        self.driver.set_pixels([red] * 64)
+        self.device.reset()
+        self.driver.set_pixels([grey] * 8 + [red] * 56)
+        self.assertEqual(self.device.counts, {'set_pixels': 1})
+
+    def test_invalidate_writes_all_again (self):
+        self.driver.set_pixels([red] * 64)
+        self.driver.show_message('x')
+        self.device.reset()
+        self.driver.set_pixels([red] * 64)
+        self.assertEqual(self.device.counts, {'set_pixels': 1})
+
+    def test_list_colors (self):
+        self.driver.set_pixels([[255, 0, 0]] * 64)
+        self.assertEqual(self.driver.get_pixel(0, 0), red)
+
+    def test_recorder_gets_changed_frames (self):
+        self.driver.recorder = _Recorder()
+        self.driver.set_pixels([red] * 64)
+        self.driver.set_pixels([red] * 64)
+        self.driver.set_pixel(0, 0, grey)
+        self.assertEqual(len(self.driver.recorder.frames), 2)
+
+
+class PipelineTest (unittest.TestCase):
+
+    def test_quantize (self):
+        pipeline = ColorPipeline()
+        self.assertEqual(pipeline.apply_color((255, 255, 255)), (248, 252, 248))
+        self.assertEqual(pipeline.apply_color((250, 1, 2)), pipeline.apply_color((255, 0, 0)))
+
+    def test_list_colors (self):
+        pipeline = ColorPipeline()
+        self.assertEqual(pipeline.apply([[255, 0, 0]] * 64), [(248, 0, 0)] * 64)
+        self.assertEqual(pipeline.apply_color([255, 0, 0]), (248, 0, 0))
+
+    def test_gamma_is_applied_once (self):
+        device = RecordingSenseHat()
+        driver = DisplayDriver(device, pipeline=ColorPipeline(gamma=2.2))
+        driver.set_pixels([(128, 128, 128)] * 64)
+        shown = device.pixels[1]
+        for x in range(8):
+            driver.set_pixel(x, 0, red)
+        self.assertEqual(device.pixels[63], shown)
+        self.assertEqual(driver.get_pixel(7, 7), (128, 128, 128))
+
+    def test_soft_low_light_is_applied_once (self):
+        device = RecordingSenseHat()
+        driver = DisplayDriver(device, pipeline=ColorPipeline(softLowLight=True))
+        driver.set_pixels([grey] * 64)
+        driver.low_light = True
+        dimmed = device.pixels[1]
+        self.assertNotEqual(dimmed, (0, 0, 0))
+        driver.set_pixel(0, 0, red)
+        self.assertEqual(device.pixels[1], dimmed)
+        driver.low_light = False
+        self.assertEqual(device.pixels[1], grey)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ..output import clock
+from ..output.displayDriver import DisplayDriver
+from ..output.exceptions import DataError
+from ..output.frameLog import FrameLogReader, FrameLogWriter, replay
+from ..output.frameScheduler import FrameScheduler
+from ..output.headlessHat import RecordingSenseHat
+
+
+def _frames (count):
+    """frames with a moving pixel and many colors"""
+    frames = []
+    for i in range(count):
+        frame = [(0, 0, (i * 7) % 256)] * 64
+        frame[i % 64] = (255, i % 256, 0)
+        frames.append(frame)
+    return frames
+
+
+class FrameLogTest (unittest.TestCase):
+
+    def setUp (self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'test.shfl')
+
+    def tearDown (self):
+        shutil.rmtree(self.dir)
+
+    def write (self, frames, **kwargs):
+        writer = FrameLogWriter(self.path, **kwargs)
+        for i, frame in enumerate(frames):
+            writer.write(frame, timestamp=i * .1)
+        writer.close()
+        return writer
+
+    def test_round_trip (self):
+        frames = _frames(300)
+        writer = self.write(frames, keyframeInterval=50)
+        reader = FrameLogReader(self.path)
+        self.assertEqual(len(reader), 300)
+        self.assertEqual(len(reader.keyframes), 6)
+        self.assertEqual([f for t, f in reader.frames()],
+            [[tuple(p) for p in f] for f in frames])
+        self.assertAlmostEqual(reader.duration(), 29.9)
+        self.assertLess(writer.bytesWritten, 300 * 64 * 3)
+        reader.close()
+
+    def test_random_access (self):
+        frames = _frames(120)
+        self.write(frames, keyframeInterval=16)
+        reader = FrameLogReader(self.path)
+        self.assertEqual(reader.frame(77), frames[77])
+        self.assertEqual(reader.index_at(5.05), 50)
+        self.assertEqual([f for t, f in reader.frames(118)], frames[118:])
+        reader.close()
+
+    def test_equal_frames_are_skipped (self):
+        frame = _frames(1)[0]
+        writer = self.write([frame, frame, frame])
+        self.assertEqual((writer.frames, writer.framesSkipped), (1, 2))
+
+    def test_incomplete_record_is_ignored (self):
+        self.write(_frames(10))
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        reader = FrameLogReader(self.path)
+        self.assertEqual(len(reader), 9)
+        reader.close()
+
+    def test_not_a_frame_log (self):
+        for content in (b'', b'SH', b'NOTAFRAMELOG'):
+            with open(self.path, 'wb') as f:
+                f.write(content)
+            with self.assertRaises(DataError):
+                FrameLogReader(self.path)
+
+    def test_recorder_of_driver_on_virtual_clock (self):
+        with clock.use_clock(clock.VirtualClock()) as virtual:
+            writer = FrameLogWriter(self.path)
+            driver = DisplayDriver(RecordingSenseHat(), recorder=writer)
+            for frame in _frames(5):
+                driver.set_pixels(frame)
+                virtual.sleep(2)
+            writer.close()
+        reader = FrameLogReader(self.path)
+        self.assertEqual(reader.timestamps, [0.0, 2.0, 4.0, 6.0, 8.0])
+        reader.close()
+
+    def test_replay (self):
+        frames = _frames(20)
+        self.write(frames)
+        reader = FrameLogReader(self.path)
+        device = RecordingSenseHat()
+        virtual = clock.VirtualClock()
+        shown = replay(reader, device, scheduler=FrameScheduler(clock=virtual))
+        self.assertEqual(shown, 20)
+        self.assertEqual(device.pixels, frames[-1])
+        self.assertAlmostEqual(virtual.now(), 1.9)
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+from ..output.clock import VirtualClock
+from ..output.frameScheduler import FrameScheduler
+
+
+class _SlowClock (VirtualClock):
+    """a virtual clock where showing a frame takes renderTime"""
+
+    def __init__ (self, renderTime):
+        VirtualClock.__init__(self)
+        self.renderTime = renderTime
+
+    def show (self, frame):
+        self.advance(self.renderTime)
+
+
+class FrameSchedulerTest (unittest.TestCase):
+
+    def test_frames_end_at_their_deadlines (self):
+        clock = VirtualClock()
+        scheduler = FrameScheduler(clock=clock)
+        shown = []
+        scheduler.play([1, 2, 3], [.1, .2, .3], lambda f: shown.append((f, clock.now())))
+        self.assertEqual([f for f, t in shown], [1, 2, 3])
+        self.assertAlmostEqual(shown[2][1], .3)
+        self.assertAlmostEqual(clock.now(), .6)
+        self.assertEqual(scheduler.get_stats()['overruns'], 0)
+
+    def test_no_drift (self):
+        # rendering takes time, but the frames still end on the deadlines
+        clock = _SlowClock(.004)
+        scheduler = FrameScheduler(clock=clock)
+        scheduler.play(list(range(100)), [.01] * 100, clock.show)
+        self.assertAlmostEqual(clock.now(), 1.0)
+        self.assertEqual(scheduler.skipped, 0)
+
+    def test_frames_behind_are_skipped (self):
+        clock = _SlowClock(.025)
+        scheduler = FrameScheduler(clock=clock, maxLag=10)
+        shown = []
+        def show (frame):
+            shown.append(frame)
+            clock.show(frame)
+        scheduler.play(list(range(10)), [.01] * 10, show)
+        self.assertGreater(scheduler.skipped, 0)
+        self.assertEqual(len(shown) + scheduler.skipped, 10)
+        # the last frame is always shown
+        self.assertEqual(shown[-1], 9)
+
+    def test_resync_after_max_lag (self):
+        clock = VirtualClock()
+        scheduler = FrameScheduler(clock=clock, maxLag=.5)
+        scheduler.start()
+        clock.advance(2)
+        scheduler.wait(.1)
+        self.assertEqual(scheduler.resyncs, 1)
+        # a new timeline from now on
+        scheduler.wait(.1)
+        self.assertAlmostEqual(clock.now(), 2.1)
+
+    def test_resume (self):
+        clock = VirtualClock()
+        scheduler = FrameScheduler(clock=clock, maxLag=.5)
+        scheduler.resume()
+        scheduler.wait(.1)
+        # a little later: the timeline continues
+        clock.advance(.05)
+        scheduler.resume()
+        scheduler.wait(.1)
+        self.assertAlmostEqual(clock.now(), .2)
+        # idle for longer than maxLag: a new timeline
+        clock.advance(1)
+        scheduler.resume()
+        scheduler.wait(.1)
+        self.assertAlmostEqual(clock.now(), 1.3)
+
+    def test_play_async (self):
+        clock = VirtualClock()
+        scheduler = FrameScheduler(clock=clock)
+        shown = []
+        asyncio.run(scheduler.play_async([1, 2], [.5, .5], shown.append))
+        self.assertEqual(shown, [1, 2])
+        self.assertAlmostEqual(clock.now(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
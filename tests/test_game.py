@@ -0,0 +1,35 @@
+import unittest
+from ..core.exceptions import DataError
+from ..core.game import GameWindow, GameWindowGrid
+from ..output import backends
+from ..output.clock import VirtualClock
+from ..output.frameScheduler import FrameScheduler
+
+
+class PanTest (unittest.TestCase):
+
+    def setUp (self):
+        backends.set_backend('recording')
+        self.grid = GameWindowGrid(2, 2, FrameScheduler(clock=VirtualClock()))
+        for x in range(2):
+            for y in range(2):
+                self.grid.set_game(x, y, GameWindow('{},{}'.format(x, y)))
+
+    def tearDown (self):
+        self.grid.close()
+        backends.set_backend(None)
+
+    def test_pan_diagonally (self):
+        self.assertTrue(self.grid.pan(1, 1))
+        self.assertEqual((self.grid.posX, self.grid.posY), (1, 1))
+        self.assertFalse(self.grid.pan(1, 0))
+
+    def test_invalid_steps (self):
+        for dx, dy in ((0, 0), (2, 0), (0, -3)):
+            with self.assertRaises(DataError):
+                self.grid.pan(dx, dy)
+        self.assertEqual((self.grid.posX, self.grid.posY), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from ..core.game import GameWindow, GameWindowGrid
+from ..core.joystick import JoystickDispatcher
+from ..output import backends
+from ..output.clock import VirtualClock
+from ..output.frameScheduler import FrameScheduler
+from ..output.headlessHat import HeadlessStick, InputEvent
+
+
+class CoalesceTest (unittest.TestCase):
+
+    def setUp (self):
+        self.dispatcher = JoystickDispatcher(None, stick=HeadlessStick(),
+            debounceTime=.05, repeatDelay=.5)
+
+    def coalesce (self, *events):
+        return self.dispatcher.coalesce([InputEvent(t, d, a) for t, d, a in events])
+
+    def test_bounce_is_debounced (self):
+        result = self.coalesce((0.0, 'up', 'pressed'), (0.01, 'up', 'released'),
+            (0.02, 'up', 'pressed'), (0.03, 'up', 'released'))
+        self.assertEqual([e.timestamp for e in result], [0.0])
+        self.assertEqual(self.dispatcher.coalesced, 3)
+
+    def test_presses_after_debounce_time (self):
+        result = self.coalesce((0.0, 'up', 'pressed'), (0.01, 'up', 'released'),
+            (0.1, 'up', 'pressed'))
+        self.assertEqual([e.timestamp for e in result], [0.0, 0.1])
+
+    def test_directions_are_independent (self):
+        result = self.coalesce((0.0, 'up', 'pressed'), (0.01, 'left', 'pressed'))
+        self.assertEqual([e.direction for e in result], ['up', 'left'])
+
+    def test_held_repeats_after_repeat_delay (self):
+        result = self.coalesce((0.0, 'up', 'pressed'), (0.2, 'up', 'held'),
+            (0.6, 'up', 'held'), (0.8, 'up', 'held'), (1.2, 'up', 'held'))
+        self.assertEqual([e.timestamp for e in result], [0.0, 0.6, 1.2])
+
+    def test_events_split_over_calls (self):
+        self.coalesce((0.0, 'up', 'pressed'), (0.01, 'up', 'released'))
+        self.assertEqual(self.coalesce((0.02, 'up', 'pressed')), [])
+
+
+class _InputGame (GameWindow):
+    """uses 'up' itself"""
+
+    def _init_game (self):
+        self.inputs = []
+
+    def handle_input (self, direction):
+        if direction != 'up':
+            return False
+        self.inputs.append(direction)
+        return True
+
+
+class DispatchTest (unittest.TestCase):
+
+    def setUp (self):
+        backends.set_backend('recording')
+        self.grid = GameWindowGrid(2, 1, FrameScheduler(clock=VirtualClock()))
+        self.game = _InputGame('A')
+        self.grid.set_game(0, 0, self.game)
+        self.grid.set_game(1, 0, GameWindow('B'))
+        self.dispatcher = JoystickDispatcher(self.grid, stick=HeadlessStick())
+
+    def tearDown (self):
+        self.grid.close()
+        backends.set_backend(None)
+
+    def test_game_gets_input_first (self):
+        self.dispatcher.stick.push('up')
+        self.dispatcher.run_once(0)
+        self.assertEqual(self.game.inputs, ['up'])
+        self.assertEqual((self.grid.posX, self.grid.posY), (0, 0))
+
+    def test_navigation (self):
+        self.dispatcher.stick.push('right')
+        self.assertEqual(self.dispatcher.run_once(0), 1)
+        self.assertEqual(self.grid.posX, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from .. import colors
+from ..output import backends
+from ..output import palette
+from ..output.exceptions import DataError
+
+
+class PaletteTest (unittest.TestCase):
+
+    def test_get_color_wraps_around (self):
+        self.assertEqual(palette.get_color('red', 300), palette.get_color('red', 44))
+
+    def test_invalid_steps (self):
+        for steps in (0, -1):
+            with self.assertRaises(DataError):
+                palette.get_color('red', 1, steps)
+
+    def test_unknown_kind (self):
+        with self.assertRaises(DataError):
+            palette.get_palette('plaid')
+
+
+class ListColorsTest (unittest.TestCase):
+
+    def setUp (self):
+        backends.set_backend('recording')
+
+    def tearDown (self):
+        if colors._s is not None:
+            colors._s = None
+            colors.deviceManager.release()
+        backends.set_backend(None)
+
+    def test_kind_and_function (self):
+        colors.listColors('green')
+        # column by column: the second pixel of the first row is color 8
+        self.assertEqual(tuple(colors._sense().get_pixels()[1]),
+            palette.get_palette('green', 64)[8])
+        colors.listColors(lambda i: (0, i, 0))
+        self.assertEqual(tuple(colors._sense().get_pixels()[1]), (0, 33, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import random
+import turtle
+import unittest
+from ..output.clock import VirtualClock
+from ..output.frameScheduler import FrameScheduler
+from ..simon import simonTurtle
+
+
+class _StubCanvas (object):
+    """canvas without display: keeps the items and their options"""
+
+    def __init__ (self):
+        self.items = {}
+        self.lastItem = 0
+
+    def _create (self, kind, coords, options):
+        self.lastItem += 1
+        self.items[self.lastItem] = dict(options, kind=kind, coords=coords)
+        return self.lastItem
+
+    def create_polygon (self, *coords, **options):
+        return self._create('polygon', coords, options)
+
+    def create_text (self, *coords, **options):
+        return self._create('text', coords, options)
+
+    def itemconfigure (self, item, **options):
+        self.items[item].update(options)
+
+    def find_all (self):
+        return tuple(self.items)
+
+
+class _StubScreen (object):
+    """turtle screen without display, with a _StubCanvas"""
+
+    def __init__ (self):
+        self.canvas = _StubCanvas()
+        self.updates = 0
+
+    def getcanvas (self):
+        return self.canvas
+
+    def update (self):
+        self.updates += 1
+
+    def tracer (self, *args):
+        pass
+
+    def onkey (self, fun, key):
+        pass
+
+    def listen (self):
+        pass
+
+
+class _StubPen (object):
+    """turtle without display"""
+
+    def hideturtle (self):
+        pass
+
+    def penup (self):
+        pass
+
+    def setpos (self, pos):
+        self.pos = pos
+
+
+class _TimedScreen (_StubScreen):
+    """records the time of each update, and the color of the item
+    shown (None if hidden)"""
+
+    def __init__ (self, clock):
+        _StubScreen.__init__(self)
+        self.clock = clock
+        self.item = None
+        self.shown = []
+
+    def update (self):
+        _StubScreen.update(self)
+        if self.item is not None:
+            options = self.canvas.items[self.item]
+            color = options['fill'] if options['state'] == 'normal' else None
+            self.shown.append((round(self.clock.now(), 6), color))
+
+
+def _soak (rounds, length, batched, screen=None, pen=None):
+    """play many rounds (with a restart after each sequence of the given
+    length) on a virtual clock, and check that the number of canvas items
+    does not grow after the first game. Without a screen, it runs on a
+    _StubScreen. Returns the number of canvas items."""
+    if screen is None:
+        screen = _StubScreen()
+        pen = _StubPen()
+    st = simonTurtle.SimonTurtle(batched, screen=screen, pen=pen,
+        scheduler=FrameScheduler(clock=VirtualClock()))
+    canvas = screen.getcanvas()
+    itemCount = None
+    for r in range(rounds):
+        curLen = r % length + 1
+        if curLen == 1:
+            st.reset()
+        st.startSaying()
+        for i in range(curLen):
+            st.showColor(random.randrange(4))
+        st.startListening()
+        for i in range(curLen):
+            st.showColorAndMove(random.randrange(4))
+        if curLen == length:
+            st.writeResult(random.random() < .5)
+        else:
+            st.roundSolved()
+        if r == length - 1:
+            itemCount = len(canvas.find_all())
+        assert itemCount is None or len(canvas.find_all()) == itemCount, \
+            'round {}: {} canvas items instead of {}'.format(r, len(canvas.find_all()), itemCount)
+    return itemCount
+
+
+def _tk_root ():
+    """Return a Tk root window, or None if there is no display"""
+    try:
+        return turtle.TK.Tk()
+    except turtle.TK.TclError:
+        return None
+
+
+class SoakTest (unittest.TestCase):
+
+    def test_item_count_stays_flat_batched (self):
+        # 1 top slot, 12 bottom slots (sequences of 12), 5 lines of text
+        self.assertEqual(_soak(3000, 12, batched=True), 18)
+
+    def test_item_count_stays_flat (self):
+        self.assertEqual(_soak(3000, 12, batched=False), 18)
+
+    def test_item_count_on_turtle_screen (self):
+        # the stub canvas above only counts the items of SimonTurtle;
+        # a real TurtleScreen also has the items of the turtle
+        root = _tk_root()
+        if root is None:
+            self.skipTest('no display: the items are only counted on the stub canvas')
+        try:
+            canvas = turtle.TK.Canvas(root, width=1000, height=600)
+            screen = turtle.TurtleScreen(canvas)
+            screen.delay(0)
+            for batched in (True, False):
+                pen = turtle.RawTurtle(screen)
+                pen.speed(0)
+                before = len(canvas.find_all())
+                self.assertEqual(_soak(100, 12, batched, screen, pen) - before, 18)
+                screen.clear()
+                screen.delay(0)
+        finally:
+            root.destroy()
+
+    def test_colors_are_shown_over_time (self):
+        for batched in (True, False):
+            clock = VirtualClock()
+            screen = _TimedScreen(clock)
+            st = simonTurtle.SimonTurtle(batched, screen=screen, pen=_StubPen(),
+                scheduler=FrameScheduler(clock=clock), sayDuration=.5, pauseDuration=.1)
+            st.startSaying()
+            screen.item = st._slot()
+            for color in (2, 2, 1):
+                st.showColor(color)
+            # each color stays .5 sec, then the slot is empty for .1 sec
+            self.assertEqual(screen.shown, [(0, 'yellow'), (.5, None),
+                (.6, 'yellow'), (1.1, None), (1.2, 'green'), (1.7, None)])
+            st.startListening()
+            self.assertAlmostEqual(clock.now(), 1.8)
+            self.assertEqual(screen.canvas.items[screen.item]['state'], 'hidden')
+
+    def test_colors_of_player_are_shown (self):
+        screen = _StubScreen()
+        items = screen.canvas.items
+        st = simonTurtle.SimonTurtle(True, screen=screen, pen=_StubPen(),
+            scheduler=FrameScheduler(clock=VirtualClock()))
+        st.startSaying()
+        st.showColor(2)
+        st.startListening()
+        first = st._slot()
+        st.showColorAndMove(1)
+        self.assertEqual((items[first]['fill'], items[first]['state']), ('green', 'normal'))
+        self.assertEqual(items[st.texts['turn']]['text'], 'Du bist dran')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from random import Random
+from ..simon.simonsays import SimonSays
+from ..simon import simulator
+
+
+class SeedTest (unittest.TestCase):
+
+    def test_solution_from_seeded_random (self):
+        a = SimonSays(20, quiet=True, rand=Random(7))
+        b = SimonSays(20, quiet=True, rand=Random(7))
+        self.assertEqual(a.solution, b.solution)
+
+    def test_batch_is_reproducible (self):
+        batch = (8, 200, 'forgetful', {}, 42, False)
+        first = simulator._playBatch(batch)
+        second = simulator._playBatch(batch)
+        self.assertEqual(first[:3], second[:3])
+
+    def test_simulate_is_reproducible (self):
+        results = [simulator.simulate(400, 8, seed=42, processes=2)
+            for i in range(2)]
+        self.assertEqual(results[0]['solved'], results[1]['solved'])
+        self.assertEqual(results[0]['roundsReached'], results[1]['roundsReached'])
+
+
+if __name__ == "__main__":
+    unittest.main()
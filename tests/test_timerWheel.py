@@ -0,0 +1,164 @@
+import threading
+import unittest
+from ..core.timerWheel import TimerWheel
+from ..countdown import CountdownTable, PixelCountdown, SensePixelCountdown
+from ..output import backends
+from ..output import deviceManager
+from ..output.clock import VirtualClock
+
+red = (255, 0, 0)
+green = (0, 255, 0)
+off = (0, 0, 0)
+
+
+class TimerWheelTest (unittest.TestCase):
+
+    def setUp (self):
+        self.clock = VirtualClock()
+        self.wheel = TimerWheel(tickLength=.01, slots=16, clock=self.clock)
+        self.calls = []
+
+    def call (self, name):
+        self.calls.append((name, round(self.clock.now(), 3)))
+
+    def test_timers_run_in_order_of_deadline (self):
+        self.wheel.schedule(.5, self.call, 'b')
+        self.wheel.schedule(.2, self.call, 'a')
+        # further away than one turn of the wheel (16 * .01 sec)
+        self.wheel.schedule(3.0, self.call, 'c')
+        self.assertEqual(self.wheel.run_until_idle(), 3)
+        self.assertEqual(self.calls, [('a', .2), ('b', .5), ('c', 3.0)])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel (self):
+        t = self.wheel.schedule(.2, self.call, 'a')
+        self.wheel.schedule(.3, self.call, 'b')
+        t.cancel()
+        self.wheel.run_until_idle()
+        self.assertEqual(self.calls, [('b', .3)])
+        self.assertTrue(t.cancelled)
+
+    def test_callback_schedules_next (self):
+        def tick (n):
+            self.call(n)
+            if n < 5:
+                self.wheel.schedule(1, tick, n + 1)
+        self.wheel.schedule(1, tick, 1)
+        self.wheel.run_until_idle()
+        self.assertEqual([t for n, t in self.calls], [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_limit (self):
+        self.wheel.schedule(1, self.call, 'a')
+        self.wheel.schedule(5, self.call, 'b')
+        self.wheel.run_until_idle(limit=2)
+        self.assertEqual(self.calls, [('a', 1.0)])
+        self.assertEqual(self.clock.now(), 2)
+
+    def test_run_on_virtual_clock (self):
+        done = threading.Event()
+        self.wheel.schedule(100, self.call, 'a')
+        self.wheel.schedule(200, done.set)
+        self.wheel.start_thread()
+        # 200 seconds of virtual time pass at once
+        self.assertTrue(done.wait(5))
+        self.wheel.stop()
+        self.assertEqual(self.calls, [('a', 100.0)])
+
+
+class CountdownTableTest (unittest.TestCase):
+
+    def setUp (self):
+        self.pixels = ((0, 0), (1, 0))
+        self.table = CountdownTable(self.pixels, (red, green), off)
+
+    def test_max_duration (self):
+        self.assertEqual(self.table.maxDuration, 4)
+
+    def test_initial (self):
+        self.assertEqual(self.table.initial(3), [((0, 0), green), ((1, 0), green)])
+        self.assertEqual(self.table.initial(2), [((0, 0), green), ((1, 0), red)])
+        self.assertEqual(self.table.initial(1), [((0, 0), green), ((1, 0), off)])
+
+    def test_deltas (self):
+        # from 3 to 2: the second pixel goes to the next color
+        self.assertEqual(self.table.deltas[2], (((1, 0), red),))
+        # from 2 to 1: the second pixel is off, the first changes
+        self.assertEqual(self.table.deltas[1], (((1, 0), off), ((0, 0), green)))
+        self.assertEqual(self.table.blinks[1], (0, 0))
+
+
+class _RecordingCountdown (PixelCountdown):
+
+    def __init__ (self, *args, **kwargs):
+        self.screen = {}
+        self.hasExpired = False
+        PixelCountdown.__init__(self, *args, **kwargs)
+
+    def showPixel (self, pixel, color):
+        self.screen[pixel] = color
+
+    def clearPixel (self, pixel):
+        self.screen[pixel] = off
+
+    def expired (self):
+        self.hasExpired = True
+
+
+class CountdownOnWheelTest (unittest.TestCase):
+
+    def test_countdown_runs_in_virtual_time (self):
+        clock = VirtualClock()
+        wheel = TimerWheel(clock=clock)
+        countdown = _RecordingCountdown(wheel=wheel)
+        countdown.start(25)
+        self.assertFalse(countdown.hasExpired)
+        wheel.run_until_idle()
+        self.assertTrue(countdown.hasExpired)
+        self.assertAlmostEqual(clock.now(), 25, places=6)
+        self.assertEqual(countdown.t, 0)
+        for pixel in countdown.pixels[1:]:
+            self.assertEqual(countdown.screen[pixel], countdown.offColor)
+
+    def test_cancel (self):
+        clock = VirtualClock()
+        wheel = TimerWheel(clock=clock)
+        countdown = _RecordingCountdown(wheel=wheel)
+        countdown.start(25)
+        # the first second is counted at once, then one each second
+        wheel.run_until_idle(limit=10.5)
+        countdown.cancel()
+        wheel.run_until_idle()
+        self.assertFalse(countdown.hasExpired)
+        self.assertEqual(countdown.t, 14)
+
+    def test_cancel_from_other_thread (self):
+        clock = VirtualClock()
+        wheel = TimerWheel(clock=clock)
+        countdown = _RecordingCountdown(wheel=wheel)
+        countdown.start(25)
+        thread = threading.Thread(target=countdown.cancel)
+        with wheel.lock:
+            # the tick holds the lock: cancel() waits for it
+            thread.start()
+            countdown._tick(clock.now() + 1)
+        thread.join()
+        self.assertEqual(countdown._timers, [])
+        wheel.run_until_idle()
+        self.assertEqual(countdown.t, 23)
+        self.assertFalse(countdown.hasExpired)
+
+    def test_close_releases_the_display (self):
+        backends.set_backend('recording')
+        try:
+            refCount = deviceManager.get_manager().refCount
+            countdown = SensePixelCountdown(wheel=TimerWheel(clock=VirtualClock()))
+            countdown.start(5)
+            countdown.close()
+            self.assertIsNone(countdown.sense)
+            self.assertEqual(deviceManager.get_manager().refCount, refCount)
+        finally:
+            backends.set_backend(None)
+
+
+if __name__ == "__main__":
+    unittest.main()